@@ -0,0 +1,371 @@
+"""
+Concurrent HTTP driver for the POS API benchmarks.
+
+Scenarios call the hot whitelisted methods of the app against a running site, authenticated
+with an API key/secret, and report throughput, latency percentiles and response size. A
+profile pass calls each read scenario once in-process to count its SQL queries and time the
+JSON serialization. Results can be stored as a baseline and later runs compared against it.
+"""
+
+import json
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import frappe
+import requests
+from frappe.utils import add_days, flt, today
+from werkzeug.wrappers import Response
+
+from gormsolutions_mobile_app.benchmarks.seed import (
+    BENCH_INVOICE_PREFIX,
+    BENCH_PREFIX,
+    BENCH_STATEMENT_CUSTOMER,
+    HISTORY_DAYS,
+)
+from gormsolutions_mobile_app.custom_api.idempotency import is_error_response
+from gormsolutions_mobile_app.custom_api.pagination import encode_cursor
+from gormsolutions_mobile_app.custom_api.statement.customer_statement import get_customer_statement_page
+
+API_PREFIX = "gormsolutions_mobile_app.custom_api."
+DEFAULT_REQUESTS = 200
+DEFAULT_CONCURRENCY = 8
+DEFAULT_TOLERANCE = 0.2
+
+INVOICE_PAGE_SIZES = (20, 100, 500)
+DEEP_OFFSETS = (10_000, 100_000)
+BATCH_SIZES = {10: None, 100: 20, 1000: 3}  # invoices per batch: max requests (None = --requests)
+PRINT_FORMATS = ("html", "text", "escpos")
+STATEMENT_PAGE_SIZE = 500
+
+
+def build_scenarios():
+    """
+    Benchmark scenarios with request parameters drawn from the seeded data.
+
+    Returns:
+        list: {"name", "method", "http_method", "writes", "params": callable() -> dict,
+            "headers", "max_requests" (or None), "units" (records per call)}
+    """
+    item_codes = frappe.get_all("Item", filters={"name": ["like", f"{BENCH_PREFIX}%"]}, pluck="name", page_length=1000)
+    customers = frappe.get_all("Customer", filters={"name": ["like", f"{BENCH_PREFIX}%"]}, pluck="name", page_length=1000)
+    if not item_codes or not customers:
+        frappe.throw("No benchmark data found, run bench seed-pos-benchmark first.")
+    invoices = frappe.get_all("Sales Invoice", filters={"name": ["like", f"{BENCH_INVOICE_PREFIX}%"]}, pluck="name", page_length=1000)
+
+    current_date = today()
+    year_ago = add_days(current_date, -365)
+    month_ago = add_days(current_date, -30)
+
+    def sale_items():
+        return [
+            {"item_code": item_code, "qty": random.randint(1, 5), "rate": flt(random.uniform(1, 100), 2)}
+            for item_code in random.sample(item_codes, 3)
+        ]
+
+    def sale():
+        return {"customer_name": random.choice(customers), "paid_amount": 0, "items": sale_items()}
+
+    def scenario(name, method, params, http_method="GET", writes=False, headers=None, max_requests=None, units=1):
+        return {
+            "name": name, "method": API_PREFIX + method, "http_method": http_method, "writes": writes,
+            "params": params, "headers": headers or {}, "max_requests": max_requests, "units": units,
+        }
+
+    scenarios = [
+        scenario("get_item_details", "item.get_item_details",
+            lambda: {"limit": 50, "offset": random.randrange(0, 1000, 50)}),
+        scenario("get_item_by_code", "item.get_item_by_code",
+            lambda: {"code": random.choice(item_codes)}),
+        scenario("get_invoice_details", "invoice.get_invoice_details",
+            lambda: {"limit": 50, "offset": 0}),
+        scenario("create_invoice", "invoice.create_invoice",
+            sale,
+            http_method="POST", writes=True),
+        scenario("create_invoice_async", "invoice.create_invoice",
+            lambda: {**sale(), "async_submit": 1},
+            http_method="POST", writes=True),
+        scenario("create_gas_invoice", "gas_api.gas_invoice.create_gas_invoice",
+            lambda: {"customer": random.choice(customers), "items": sale_items()},
+            http_method="POST", writes=True),
+        scenario("receive_payment", "payment_entry.receive_payment",
+            lambda: {"party": random.choice(customers), "mode_of_payment": "Cash", "paid_amount": 100, "posting_date": current_date},
+            http_method="POST", writes=True),
+        scenario("customer_statement", "statement.customer_statement.get_customers",
+            lambda: {"customer": random.choice(customers), "from_date": year_ago, "to_date": current_date}),
+        scenario("sales_invoice_statement", "statement.statement.get_sales_invoice_details_and_payments",
+            lambda: {"customer": random.choice(customers), "from_date": year_ago, "to_date": current_date}),
+        scenario("stock_entry_ledger", "transaction_report.stock_report.fetch_stock_entry_ledger_data",
+            lambda: {"from_date": month_ago, "to_date": current_date}),
+    ]
+
+    # Query count of the invoice list per page size: the profile pass should show it flat
+    for page_size in INVOICE_PAGE_SIZES:
+        scenarios.append(scenario(f"invoice_list_{page_size}", "invoice.get_invoice_details",
+            lambda page_size=page_size: {"limit": page_size, "offset": 0}))
+
+    # Deep pages, offset against keyset; skipped when the data set is smaller than the offset
+    for offset in DEEP_OFFSETS:
+        key = frappe.get_all("Item", fields=["modified", "name"], order_by="modified desc, name desc", start=offset, page_length=1)
+        if not key:
+            continue
+        cursor = encode_cursor([key[0].modified, key[0].name])
+        scenarios.append(scenario(f"item_offset_{offset // 1000}k", "item.get_item_details",
+            lambda offset=offset: {"limit": 50, "offset": offset}))
+        scenarios.append(scenario(f"item_cursor_{offset // 1000}k", "item.get_item_details",
+            lambda cursor=cursor: {"limit": 50, "cursor": cursor}))
+
+    # Payload size of a 10k-item catalogue per response format
+    catalogue = {"limit": 10_000, "offset": 0}
+    scenarios.extend([
+        scenario("catalogue_10k_json", "item.get_item_details_offline", lambda: catalogue, max_requests=20),
+        scenario("catalogue_10k_columnar", "item.get_item_details_offline",
+            lambda: {**catalogue, "format": "columnar"}, max_requests=20),
+        scenario("catalogue_10k_msgpack", "item.get_item_details_offline",
+            lambda: {**catalogue, "format": "columnar"}, headers={"Accept": "application/msgpack"}, max_requests=20),
+    ])
+
+    for batch_size, max_requests in BATCH_SIZES.items():
+        scenarios.append(scenario(f"create_invoices_batch_{batch_size}", "invoice.create_invoices_batch",
+            lambda batch_size=batch_size: {"invoices": [sale() for _ in range(batch_size)]},
+            http_method="POST", writes=True, max_requests=max_requests, units=batch_size))
+
+    scenarios.extend(build_long_statement_scenarios(scenario))
+
+    # Render time and size per receipt format; invoices are picked at random so most calls miss the render cache
+    if invoices:
+        for print_format in PRINT_FORMATS:
+            scenarios.append(scenario(f"print_invoice_{print_format}", "print_invoice.print_invoice",
+                lambda print_format=print_format: {"invoice_id": random.choice(invoices), "format": print_format}))
+
+    return scenarios
+
+
+def build_long_statement_scenarios(scenario):
+    """
+    Statement of the seeded long-history customer (about 50k lines at scale 1): in full, and as
+    the first page and a page halfway through of the paged endpoint.
+    """
+    if not frappe.db.exists("Customer", BENCH_STATEMENT_CUSTOMER):
+        return []
+
+    params = {"customer": BENCH_STATEMENT_CUSTOMER, "from_date": add_days(today(), -HISTORY_DAYS), "to_date": today()}
+
+    # Walk to the middle of the statement once, in-process, for the cursor of the deep page
+    line_count = frappe.db.count("Payment Entry", {"party": BENCH_STATEMENT_CUSTOMER}) + frappe.db.count(
+        "GL Entry", {"party": BENCH_STATEMENT_CUSTOMER, "is_opening": "Yes"}
+    )
+    if frappe.db.table_exists("Customer Document"):
+        line_count += frappe.db.sql("""
+            SELECT COUNT(*)
+            FROM `tabFuel Sales Items` sii
+            JOIN `tabCustomer Document` cd ON cd.name = sii.parent
+            WHERE cd.customer = %s
+        """, BENCH_STATEMENT_CUSTOMER)[0][0]
+    cursor = None
+    read = 0
+    while read < line_count // 2:
+        page = get_customer_statement_page(**params, cursor=cursor, limit=5000)
+        read += len(page["lines"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    frappe.db.rollback()
+
+    scenarios = [
+        scenario("customer_statement_50k", "statement.customer_statement.get_customers",
+            lambda: params, max_requests=20, units=line_count),
+        scenario("customer_statement_50k_page", "statement.customer_statement.get_customer_statement_page",
+            lambda: {**params, "limit": STATEMENT_PAGE_SIZE}, units=STATEMENT_PAGE_SIZE),
+    ]
+    if cursor:
+        scenarios.append(scenario("customer_statement_50k_deep_page", "statement.customer_statement.get_customer_statement_page",
+            lambda: {**params, "cursor": cursor, "limit": STATEMENT_PAGE_SIZE}, units=STATEMENT_PAGE_SIZE))
+    return scenarios
+
+
+def run(base_url, api_key, api_secret, scenarios, requests_per_scenario=DEFAULT_REQUESTS, concurrency=DEFAULT_CONCURRENCY):
+    """
+    Run every scenario with `concurrency` parallel clients.
+
+    Returns:
+        dict: scenario name -> {"requests", "errors", "seconds", "throughput", "units_per_s",
+            "mean_bytes", "mean_ms", "p50_ms", "p95_ms", "p99_ms"}
+    """
+    headers = {"Authorization": f"token {api_key}:{api_secret}", "Accept": "application/json"}
+    local = threading.local()
+
+    def call(scenario, params):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+            local.session.headers.update(headers)
+
+        url = f"{base_url.rstrip('/')}/api/method/{scenario['method']}"
+        started = time.perf_counter()
+        if scenario["http_method"] == "POST":
+            response = local.session.post(url, json=params, headers=scenario["headers"], timeout=600)
+        else:
+            response = local.session.get(url, params=params, headers=scenario["headers"], timeout=120)
+        elapsed = time.perf_counter() - started
+
+        # Bytes on the wire (after gzip); requests has already decompressed `content`
+        size = int(response.headers.get("Content-Length") or len(response.content))
+
+        failed = response.status_code >= 400
+        if not failed and response.headers.get("Content-Type", "").startswith("application/json"):
+            try:
+                failed = is_error_response(response.json().get("message"))
+            except ValueError:
+                failed = True
+        return elapsed, failed, size
+
+    results = {}
+    for scenario in scenarios:
+        count = min(requests_per_scenario, scenario["max_requests"] or requests_per_scenario)
+        params = [scenario["params"]() for _ in range(count)]
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            calls = list(pool.map(lambda p: call(scenario, p), params))
+        seconds = time.perf_counter() - started
+
+        latencies = sorted(elapsed for elapsed, failed, size in calls)
+        results[scenario["name"]] = {
+            "requests": len(calls),
+            "errors": sum(1 for elapsed, failed, size in calls if failed),
+            "seconds": round(seconds, 3),
+            "throughput": round(len(calls) / seconds, 2) if seconds else 0,
+            "units_per_s": round(len(calls) * scenario["units"] / seconds, 2) if seconds else 0,
+            "mean_bytes": round(sum(size for elapsed, failed, size in calls) / len(calls)) if calls else 0,
+            "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0,
+            "p50_ms": round(percentile(latencies, 0.5) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        }
+
+    return results
+
+
+def profile(scenarios, user):
+    """
+    Call each read scenario once in-process as `user`, counting SQL queries and rows, and timing
+    the call and the JSON serialization of its result separately.
+
+    Endpoints that build their own HTTP response (format=columnar, escpos) serialize inside the
+    call, so their serialize_ms is 0 and the time is part of call_ms.
+
+    Returns:
+        dict: scenario name -> {"queries", "rows", "call_ms", "serialize_ms", "bytes"}
+    """
+    db = frappe.db
+    sql = db.sql
+    counts = frappe._dict(queries=0, rows=0)
+
+    def counted_sql(*args, **kwargs):
+        result = sql(*args, **kwargs)
+        counts.queries += 1
+        if isinstance(result, (list, tuple)):
+            counts.rows += len(result)
+        return result
+
+    results = {}
+    frappe.set_user(user)
+    db.sql = counted_sql
+    try:
+        for scenario in scenarios:
+            if scenario["writes"]:
+                continue
+
+            counts.queries = counts.rows = 0
+            started = time.perf_counter()
+            try:
+                result = frappe.call(scenario["method"], **scenario["params"]())
+            except Exception:
+                # Already counted as errors by the HTTP pass
+                frappe.db.rollback()
+                continue
+            call_seconds = time.perf_counter() - started
+
+            if isinstance(result, Response):
+                serialize_seconds, size = 0, len(result.get_data())
+            else:
+                started = time.perf_counter()
+                size = len(frappe.as_json({"message": result}, indent=None, separators=(",", ":")).encode())
+                serialize_seconds = time.perf_counter() - started
+
+            results[scenario["name"]] = {
+                "queries": counts.queries,
+                "rows": counts.rows,
+                "call_ms": round(call_seconds * 1000, 2),
+                "serialize_ms": round(serialize_seconds * 1000, 2),
+                "bytes": size,
+            }
+            frappe.db.rollback()
+    finally:
+        db.__dict__.pop("sql", None)
+        frappe.set_user("Administrator")
+
+    return results
+
+
+def percentile(values, quantile):
+    """Nearest-rank percentile of already sorted `values`."""
+    if not values:
+        return 0
+    return values[max(0, math.ceil(quantile * len(values)) - 1)]
+
+
+def get_baseline_path():
+    # Baselines depend on the machine and data set, so they live with the site
+    return frappe.get_site_path("pos_benchmark_baseline.json")
+
+
+def save_baseline(results, path=None):
+    with open(path or get_baseline_path(), "w") as f:
+        json.dump(results, f, indent=1, sort_keys=True)
+
+
+def load_baseline(path=None):
+    try:
+        with open(path or get_baseline_path()) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Regressions against `baseline`: p95 latency above, or throughput below, the baseline by more
+    than `tolerance` (a fraction), and any scenario whose error or SQL query count went up.
+
+    Returns:
+        list: human-readable regression messages (empty when there are none).
+    """
+    regressions = []
+    for name, result in results.items():
+        base = (baseline or {}).get(name)
+        if not base:
+            continue
+
+        if result["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {result['p95_ms']} ms vs baseline {base['p95_ms']} ms")
+        if result["throughput"] < base["throughput"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {result['throughput']}/s vs baseline {base['throughput']}/s")
+        if result["errors"] > base["errors"]:
+            regressions.append(f"{name}: {result['errors']} errors vs baseline {base['errors']}")
+        if "queries" in result and "queries" in base and result["queries"] > base["queries"]:
+            regressions.append(f"{name}: {result['queries']} queries vs baseline {base['queries']}")
+
+    return regressions
+
+
+def format_results(results):
+    columns = ("requests", "errors", "throughput", "units_per_s", "mean_ms", "p50_ms", "p95_ms", "p99_ms",
+        "mean_bytes", "queries", "rows", "call_ms", "serialize_ms")
+    width = max([len("scenario")] + [len(name) for name in results])
+    lines = ["scenario".ljust(width) + "".join(column.rjust(13) for column in columns)]
+    for name, result in results.items():
+        lines.append(name.ljust(width) + "".join(str(result.get(column, "-")).rjust(13) for column in columns))
+    return "\n".join(lines)
@@ -0,0 +1,405 @@
+"""
+Seed a local site with a realistic data volume for the POS API benchmarks.
+
+Everything created here is named with the BENCH prefix so `clear` can remove it again.
+Bulk tables (items, prices, bins, customers, GL and stock ledger rows, sales invoices, statement lines) are written with
+`frappe.db.bulk_insert`; tree doctypes (Warehouse, Item Group) go through the ORM.
+"""
+
+import random
+
+import frappe
+from frappe.utils import add_days, cint, flt, getdate, now, today
+
+from gormsolutions_mobile_app.custom_api.search_index import rebuild_search_index
+from gormsolutions_mobile_app.custom_api.statement.gl_daily_balance import rebuild_gl_daily_balance
+
+BENCH_PREFIX = "BENCH"
+BENCH_ITEM_GROUP = "BENCH Items"
+BENCH_PRICE_LIST = "Standard Selling"
+BENCH_INVOICE_PREFIX = f"{BENCH_PREFIX}-SI-"
+BENCH_STATEMENT_CUSTOMER = f"{BENCH_PREFIX}-CUST-STATEMENT"
+BULK_CHUNK_SIZE = 10_000
+
+# Volumes at scale 1
+ITEMS = 50_000
+WAREHOUSES = 200
+CUSTOMERS = 5_000
+GL_ENTRIES = 1_500_000
+STOCK_LEDGER_ENTRIES = 500_000
+BINS_PER_ITEM = 4
+SALES_INVOICES = 20_000
+ITEMS_PER_INVOICE = 3
+STATEMENT_LINES = 50_000
+HISTORY_DAYS = 730
+
+
+def seed(scale=1.0, user=None, company=None):
+    """
+    Create the benchmark data set. `scale` multiplies every volume (0.01 gives a quick smoke
+    run); `user` gets the User Permissions the POS endpoints expect.
+    """
+    random.seed(42)
+    company = company or frappe.defaults.get_global_default("company")
+    if not company:
+        frappe.throw("Set a default company before seeding benchmark data.")
+
+    ctx = get_seed_context(company)
+
+    def volume(count):
+        return max(1, int(count * flt(scale)))
+
+    warehouses = seed_warehouses(ctx, volume(WAREHOUSES))
+    item_codes = seed_items(ctx, volume(ITEMS))
+    customers = seed_customers(ctx, volume(CUSTOMERS))
+    seed_item_prices(ctx, item_codes)
+    seed_bins(ctx, item_codes, warehouses)
+    seed_gl_entries(ctx, customers, volume(GL_ENTRIES))
+    seed_stock_ledger_entries(ctx, item_codes, warehouses, volume(STOCK_LEDGER_ENTRIES))
+    seed_sales_invoices(ctx, customers, item_codes, warehouses[0], volume(SALES_INVOICES), user or ctx.user)
+    statement_lines = seed_statement_customer(ctx, item_codes, volume(STATEMENT_LINES))
+
+    if user:
+        seed_user_permissions(ctx, user, warehouses)
+
+    frappe.db.commit()
+
+    # Keep the GL rollup and the search index in step with the bulk-inserted rows
+
+    rebuild_gl_daily_balance()
+    rebuild_search_index()
+    frappe.db.commit()
+
+    return {
+        "warehouses": len(warehouses),
+        "items": len(item_codes),
+        "customers": len(customers),
+        "gl_entries": volume(GL_ENTRIES),
+        "stock_ledger_entries": volume(STOCK_LEDGER_ENTRIES),
+        "sales_invoices": volume(SALES_INVOICES),
+        "statement_lines": statement_lines,
+    }
+
+
+def clear():
+    """Remove everything created by `seed`."""
+    parent_field = {"User Permission": "for_value", "Sales Invoice Item": "parent", "Fuel Sales Items": "parent",
+        "Party Balance Checkpoint": "party"}
+    for doctype in ("GL Entry", "Stock Ledger Entry", "Sales Invoice Item", "Sales Invoice", "Fuel Sales Items",
+            "Customer Document", "Payment Entry", "Party Balance Checkpoint", "Bin", "Item Price", "Item", "Customer",
+            "User Permission"):
+        if not frappe.db.table_exists(doctype):
+            continue
+        field = parent_field.get(doctype, "name")
+        frappe.db.sql(f"DELETE FROM `tab{doctype}` WHERE `{field}` LIKE %s", (f"{BENCH_PREFIX}%",))
+
+    for warehouse in frappe.get_all("Warehouse", filters={"name": ["like", f"{BENCH_PREFIX}%"]}, pluck="name"):
+        frappe.delete_doc("Warehouse", warehouse, force=True, ignore_permissions=True)
+    if frappe.db.exists("Item Group", BENCH_ITEM_GROUP):
+        frappe.delete_doc("Item Group", BENCH_ITEM_GROUP, force=True, ignore_permissions=True)
+
+    rebuild_gl_daily_balance()
+    rebuild_search_index()
+    frappe.db.commit()
+
+
+def get_seed_context(company):
+    company_doc = frappe.get_cached_doc("Company", company)
+    expense_account = frappe.db.get_value(
+        "Account", {"company": company, "account_type": "Expense Account", "is_group": 0}, "name"
+    )
+    return frappe._dict({
+        "company": company,
+        "currency": company_doc.default_currency,
+        "receivable_account": company_doc.default_receivable_account,
+        "cash_account": company_doc.default_cash_account,
+        "income_account": company_doc.default_income_account,
+        "expense_account": expense_account or company_doc.default_expense_account,
+        "cost_center": company_doc.cost_center,
+        "parent_warehouse": frappe.db.get_value("Warehouse", {"company": company, "is_group": 1, "parent_warehouse": ["in", ["", None]]}, "name"),
+        "now": now(),
+        "user": frappe.session.user,
+    })
+
+
+def standard_values(ctx, docstatus=0):
+    """creation, modified, owner, modified_by, docstatus"""
+    return (ctx.now, ctx.now, ctx.user, ctx.user, docstatus)
+
+
+STANDARD_FIELDS = ["creation", "modified", "owner", "modified_by", "docstatus"]
+
+
+def bulk_insert(doctype, fields, rows):
+    frappe.db.bulk_insert(doctype, fields + STANDARD_FIELDS, rows, ignore_duplicates=True, chunk_size=BULK_CHUNK_SIZE)
+    frappe.db.commit()
+
+
+def seed_warehouses(ctx, count):
+    warehouses = []
+    for i in range(1, count + 1):
+        warehouse_name = f"{BENCH_PREFIX} Warehouse {i:04d}"
+        name = frappe.db.get_value("Warehouse", {"warehouse_name": warehouse_name, "company": ctx.company})
+        if not name:
+            name = frappe.get_doc({
+                "doctype": "Warehouse",
+                "warehouse_name": warehouse_name,
+                "company": ctx.company,
+                "parent_warehouse": ctx.parent_warehouse,
+            }).insert(ignore_permissions=True).name
+        warehouses.append(name)
+
+    frappe.db.commit()
+    return warehouses
+
+
+def seed_items(ctx, count):
+    if not frappe.db.exists("Item Group", BENCH_ITEM_GROUP):
+        frappe.get_doc({
+            "doctype": "Item Group",
+            "item_group_name": BENCH_ITEM_GROUP,
+            "parent_item_group": frappe.db.get_value("Item Group", {"parent_item_group": ["in", ["", None]]}, "name"),
+        }).insert(ignore_permissions=True)
+
+    item_codes = [f"{BENCH_PREFIX}-ITEM-{i:06d}" for i in range(1, count + 1)]
+    bulk_insert(
+        "Item",
+        ["name", "item_code", "item_name", "item_group", "stock_uom", "is_stock_item", "disabled"],
+        ((code, code, f"Bench Item {code[-6:]}", BENCH_ITEM_GROUP, "Nos", 1, 0) + standard_values(ctx) for code in item_codes)
+    )
+    return item_codes
+
+
+def seed_customers(ctx, count):
+    customer_group = frappe.db.get_value("Customer Group", {"parent_customer_group": ["in", ["", None]]}, "name")
+    territory = frappe.db.get_value("Territory", {"parent_territory": ["in", ["", None]]}, "name")
+
+    customers = [f"{BENCH_PREFIX}-CUST-{i:05d}" for i in range(1, count + 1)]
+    bulk_insert(
+        "Customer",
+        ["name", "customer_name", "customer_type", "customer_group", "territory"],
+        ((name, name, "Company", customer_group, territory) + standard_values(ctx) for name in customers)
+    )
+    return customers
+
+
+def seed_item_prices(ctx, item_codes):
+    bulk_insert(
+        "Item Price",
+        ["name", "item_code", "item_name", "price_list", "price_list_rate", "currency", "uom", "selling"],
+        (
+            (f"{BENCH_PREFIX}-IP-{code}", code, code, BENCH_PRICE_LIST, flt(random.uniform(1, 500), 2), ctx.currency, "Nos", 1)
+            + standard_values(ctx)
+            for code in item_codes
+        )
+    )
+
+
+def seed_bins(ctx, item_codes, warehouses):
+    def rows():
+        for i, code in enumerate(item_codes):
+            for j in range(min(BINS_PER_ITEM, len(warehouses))):
+                warehouse = warehouses[(i + j) % len(warehouses)]
+                qty = random.randint(0, 500)
+                yield (f"{BENCH_PREFIX}-BIN-{i:06d}-{j}", code, warehouse, qty, qty, "Nos") + standard_values(ctx)
+
+    bulk_insert("Bin", ["name", "item_code", "warehouse", "actual_qty", "projected_qty", "stock_uom"], rows())
+
+
+def random_posting_date(start):
+    return add_days(start, random.randint(0, HISTORY_DAYS))
+
+
+def seed_gl_entries(ctx, customers, count):
+    start = add_days(getdate(today()), -HISTORY_DAYS)
+
+    def rows():
+        # Balanced pairs: sales (debtor / income) and, for every fourth voucher, an expense
+        for i in range(0, count, 2):
+            posting_date = random_posting_date(start)
+            amount = flt(random.uniform(10, 5000), 2)
+            voucher_no = f"{BENCH_PREFIX}-SINV-{i // 2:07d}"
+            customer = random.choice(customers)
+            common = (posting_date, ctx.cost_center, "Sales Invoice", voucher_no, ctx.company, "No", 0)
+            yield (f"{BENCH_PREFIX}-GLE-{i:08d}", ctx.receivable_account, "Customer", customer, amount, 0) + common + standard_values(ctx, 1)
+            account = ctx.expense_account if i % 8 == 0 else ctx.income_account
+            yield (f"{BENCH_PREFIX}-GLE-{i + 1:08d}", account, None, None, 0, amount) + common + standard_values(ctx, 1)
+
+    bulk_insert(
+        "GL Entry",
+        ["name", "account", "party_type", "party", "debit", "credit", "posting_date", "cost_center",
+            "voucher_type", "voucher_no", "company", "is_opening", "is_cancelled"],
+        rows()
+    )
+
+
+def seed_stock_ledger_entries(ctx, item_codes, warehouses, count):
+    start = add_days(getdate(today()), -HISTORY_DAYS)
+
+    def rows():
+        for i in range(count):
+            purchase = i % 3 == 0
+            qty = random.randint(1, 50)
+            yield (
+                f"{BENCH_PREFIX}-SLE-{i:08d}",
+                random.choice(item_codes),
+                random.choice(warehouses),
+                random_posting_date(start),
+                "12:00:00",
+                qty if purchase else -qty,
+                flt(random.uniform(1, 300), 2),
+                "Purchase Invoice" if purchase else "Sales Invoice",
+                f"{BENCH_PREFIX}-{'PINV' if purchase else 'SINV'}-{i:07d}",
+                ctx.company,
+                0,
+            ) + standard_values(ctx, 1)
+
+    bulk_insert(
+        "Stock Ledger Entry",
+        ["name", "item_code", "warehouse", "posting_date", "posting_time", "actual_qty", "valuation_rate",
+            "voucher_type", "voucher_no", "company", "is_cancelled"],
+        rows()
+    )
+
+
+def seed_sales_invoices(ctx, customers, item_codes, warehouse, count, owner):
+    """
+    Submitted invoices owned by the API user, for the invoice list and print scenarios. Only the
+    invoice and item rows are written: there are no ledger postings behind them.
+    """
+    start = add_days(getdate(today()), -HISTORY_DAYS)
+    standard = (ctx.now, ctx.now, owner, owner, 1)
+    invoices = []
+    items = []
+    for i in range(1, count + 1):
+        name = f"{BENCH_INVOICE_PREFIX}{i:07d}"
+        customer = random.choice(customers)
+        total = 0
+        for idx in range(1, ITEMS_PER_INVOICE + 1):
+            item_code = random.choice(item_codes)
+            qty = random.randint(1, 5)
+            rate = flt(random.uniform(1, 500), 2)
+            total += qty * rate
+            items.append((
+                f"{name}-{idx}", name, "Sales Invoice", "items", idx, item_code, item_code, qty, qty, "Nos", "Nos", 1,
+                rate, flt(qty * rate, 2), ctx.income_account, ctx.cost_center, warehouse,
+            ) + standard)
+
+        posting_date = random_posting_date(start)
+        invoices.append((
+            name, customer, customer, ctx.company, posting_date, "12:00:00", posting_date, ctx.currency, 1,
+            ctx.receivable_account, flt(total, 2), flt(total, 2), flt(total, 2), flt(total, 2), 0, flt(total, 2), "Unpaid",
+            warehouse,
+        ) + standard)
+
+    bulk_insert(
+        "Sales Invoice",
+        ["name", "customer", "customer_name", "company", "posting_date", "posting_time", "due_date", "currency",
+            "conversion_rate", "debit_to", "total", "net_total", "grand_total", "base_grand_total", "paid_amount",
+            "outstanding_amount", "status", "set_warehouse"],
+        invoices
+    )
+    bulk_insert(
+        "Sales Invoice Item",
+        ["name", "parent", "parenttype", "parentfield", "idx", "item_code", "item_name", "qty", "stock_qty", "uom",
+            "stock_uom", "conversion_factor", "rate", "amount", "income_account", "cost_center", "warehouse"],
+        items
+    )
+
+
+def seed_statement_customer(ctx, item_codes, count):
+    """
+    One customer with about `count` statement lines, for the long-statement scenarios. Every five
+    lines are a Customer Document with three fuel lines, a Payment Entry and an opening GL Entry,
+    the three sources the customer statement merges. Sites without the Customer Document doctype
+    get the payments and GL lines only.
+
+    Returns:
+        int: number of statement lines written.
+    """
+    start = add_days(getdate(today()), -HISTORY_DAYS)
+    customer_group = frappe.db.get_value("Customer Group", {"parent_customer_group": ["in", ["", None]]}, "name")
+    territory = frappe.db.get_value("Territory", {"parent_territory": ["in", ["", None]]}, "name")
+    bulk_insert(
+        "Customer",
+        ["name", "customer_name", "customer_type", "customer_group", "territory"],
+        [(BENCH_STATEMENT_CUSTOMER, BENCH_STATEMENT_CUSTOMER, "Company", customer_group, territory) + standard_values(ctx)]
+    )
+
+    has_documents = frappe.db.table_exists("Customer Document")
+    items_field = has_documents and next(
+        (df.fieldname for df in frappe.get_meta("Customer Document").get_table_fields() if df.options == "Fuel Sales Items"),
+        None
+    )
+
+    documents = []
+    fuel_items = []
+    payments = []
+    gl_entries = []
+    for i in range(max(1, count // 5)):
+        posting_date = random_posting_date(start)
+        if items_field:
+            name = f"{BENCH_PREFIX}-CD-{i:07d}"
+            documents.append((name, BENCH_STATEMENT_CUSTOMER, posting_date, f"{BENCH_PREFIX}-INV-{i:07d}", ctx.cost_center)
+                + standard_values(ctx, 1))
+            for idx in range(1, 4):
+                qty = random.randint(10, 200)
+                rate = flt(random.uniform(150, 200), 2)
+                fuel_items.append((
+                    f"{name}-{idx}", name, "Customer Document", items_field, idx, random.choice(item_codes),
+                    f"KDA {random.randint(100, 999)}X", f"{BENCH_PREFIX}-ORD-{i:07d}-{idx}", qty, rate, flt(qty * rate, 2),
+                ) + standard_values(ctx, 1))
+
+        amount = flt(random.uniform(1000, 50000), 2)
+        payments.append((
+            f"{BENCH_PREFIX}-PE-{i:07d}", "Receive", "Customer", BENCH_STATEMENT_CUSTOMER, posting_date, amount, amount,
+            1, 1, ctx.company, ctx.receivable_account, ctx.cash_account, ctx.cost_center,
+        ) + standard_values(ctx, 1))
+
+        gl_entries.append((
+            f"{BENCH_PREFIX}-GLE-STMT-{i:07d}", ctx.receivable_account, "Customer", BENCH_STATEMENT_CUSTOMER,
+            flt(random.uniform(10, 5000), 2), 0, posting_date, ctx.cost_center, "Sales Invoice",
+            f"{BENCH_PREFIX}-SINV-STMT-{i:07d}", ctx.company, "Yes", 0,
+        ) + standard_values(ctx, 1))
+
+    if documents:
+        bulk_insert("Customer Document", ["name", "customer", "posting_date", "invoice_no", "station"], documents)
+        bulk_insert(
+            "Fuel Sales Items",
+            ["name", "parent", "parenttype", "parentfield", "idx", "item_code", "number_plate", "order_number", "qty",
+                "rate", "amount"],
+            fuel_items
+        )
+    bulk_insert(
+        "Payment Entry",
+        ["name", "payment_type", "party_type", "party", "posting_date", "paid_amount", "received_amount",
+            "source_exchange_rate", "target_exchange_rate", "company", "paid_from", "paid_to", "cost_center"],
+        payments
+    )
+    bulk_insert(
+        "GL Entry",
+        ["name", "account", "party_type", "party", "debit", "credit", "posting_date", "cost_center",
+            "voucher_type", "voucher_no", "company", "is_opening", "is_cancelled"],
+        gl_entries
+    )
+
+    return len(fuel_items) + len(payments) + len(gl_entries)
+
+
+def seed_user_permissions(ctx, user, warehouses):
+    """Give `user` the POS context the endpoints resolve: warehouses, price list, cost center, payment mode."""
+    permissions = [("Warehouse", warehouses[0], 1), ("Price List", BENCH_PRICE_LIST, 0), ("Cost Center", ctx.cost_center, 0)]
+    permissions.extend(("Warehouse", warehouse, 0) for warehouse in warehouses[1:4])
+    if frappe.db.exists("Mode of Payment", "Cash"):
+        permissions.append(("Mode of Payment", "Cash", 0))
+
+    for allow, for_value, is_default in permissions:
+        if not frappe.db.exists("User Permission", {"user": user, "allow": allow, "for_value": for_value}):
+            frappe.get_doc({
+                "doctype": "User Permission",
+                "user": user,
+                "allow": allow,
+                "for_value": for_value,
+                "is_default": cint(is_default),
+                "apply_to_all_doctypes": 1,
+            }).insert(ignore_permissions=True)
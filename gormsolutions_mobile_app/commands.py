@@ -0,0 +1,133 @@
+import click
+from frappe.commands import get_site, pass_context
+
+
+@click.command("rebuild-gl-daily-balance")
+@pass_context
+def rebuild_gl_daily_balance(context):
+	"""Rebuild the GL Daily Balance rollup from GL Entry"""
+	import frappe
+
+	from gormsolutions_mobile_app.custom_api.statement.gl_daily_balance import rebuild_gl_daily_balance
+
+	site = get_site(context)
+	frappe.init(site=site)
+	frappe.connect()
+	try:
+		rows = rebuild_gl_daily_balance()
+		frappe.db.commit()
+		click.echo(f"GL Daily Balance rebuilt: {rows} rows")
+	finally:
+		frappe.destroy()
+
+
+@click.command("rebuild-pos-search-index")
+@click.option("--doctype", "doctypes", multiple=True, help="Only rebuild these doctypes (Item, Customer)")
+@pass_context
+def rebuild_pos_search_index(context, doctypes):
+	"""Rebuild the POS Search Token index of items and customers"""
+	import frappe
+
+	from gormsolutions_mobile_app.custom_api.search_index import rebuild_search_index
+
+	site = get_site(context)
+	frappe.init(site=site)
+	frappe.connect()
+	try:
+		counts = rebuild_search_index(doctypes or None)
+		click.echo(", ".join(f"{doctype}: {count}" for doctype, count in counts.items()))
+	finally:
+		frappe.destroy()
+
+
+@click.command("seed-pos-benchmark")
+@click.option("--scale", default=1.0, type=float, help="Multiplier for the data volumes (1 = 50k items, 2M ledger rows)")
+@click.option("--user", help="API user to give the POS User Permissions to")
+@click.option("--company", help="Company to seed (default: the default company)")
+@pass_context
+def seed_pos_benchmark(context, scale, user=None, company=None):
+	"""Seed the site with benchmark data for the POS API"""
+	import frappe
+
+	from gormsolutions_mobile_app.benchmarks.seed import seed
+
+	site = get_site(context)
+	frappe.init(site=site)
+	frappe.connect()
+	try:
+		counts = seed(scale=scale, user=user, company=company)
+		click.echo(", ".join(f"{key}: {value}" for key, value in counts.items()))
+	finally:
+		frappe.destroy()
+
+
+@click.command("clear-pos-benchmark")
+@pass_context
+def clear_pos_benchmark(context):
+	"""Remove the benchmark data created by seed-pos-benchmark"""
+	import frappe
+
+	from gormsolutions_mobile_app.benchmarks.seed import clear
+
+	site = get_site(context)
+	frappe.init(site=site)
+	frappe.connect()
+	try:
+		clear()
+	finally:
+		frappe.destroy()
+
+
+@click.command("run-pos-benchmark")
+@click.option("--url", required=True, help="Base URL of the site, e.g. http://localhost:8000")
+@click.option("--api-key", required=True)
+@click.option("--api-secret", required=True)
+@click.option("--requests", "requests_per_scenario", default=200, type=int, help="Requests per scenario")
+@click.option("--concurrency", default=8, type=int, help="Parallel clients")
+@click.option("--scenario", "scenario_names", multiple=True, help="Only run these scenarios")
+@click.option("--read-only", is_flag=True, default=False, help="Skip the scenarios that create documents")
+@click.option("--save-baseline", is_flag=True, default=False, help="Store the results as the new baseline")
+@click.option("--tolerance", default=0.2, type=float, help="Allowed regression against the baseline (fraction)")
+@click.option("--skip-profile", is_flag=True, default=False, help="Skip the in-process query count and serialization pass")
+@pass_context
+def run_pos_benchmark(context, url, api_key, api_secret, requests_per_scenario, concurrency, scenario_names,
+		read_only, save_baseline, tolerance, skip_profile):
+	"""Drive the hot POS API endpoints concurrently and compare with the stored baseline"""
+	import sys
+
+	import frappe
+
+	from gormsolutions_mobile_app.benchmarks import driver
+
+	site = get_site(context)
+	frappe.init(site=site)
+	frappe.connect()
+	try:
+		scenarios = [
+			scenario for scenario in driver.build_scenarios()
+			if (not scenario_names or scenario["name"] in scenario_names) and not (read_only and scenario["writes"])
+		]
+		results = driver.run(url, api_key, api_secret, scenarios, requests_per_scenario, concurrency)
+		if not skip_profile:
+			user = frappe.db.get_value("User", {"api_key": api_key}) or "Administrator"
+			for name, values in driver.profile(scenarios, user).items():
+				results[name].update(values)
+		click.echo(driver.format_results(results))
+
+		if save_baseline:
+			driver.save_baseline(results)
+			click.echo(f"Baseline saved to {driver.get_baseline_path()}")
+			return
+
+		regressions = driver.compare(results, driver.load_baseline(), tolerance)
+	finally:
+		frappe.destroy()
+
+	if regressions:
+		click.echo("Regressions against baseline:")
+		for regression in regressions:
+			click.echo(f"  {regression}")
+		sys.exit(1)
+
+
+commands = [rebuild_gl_daily_balance, rebuild_pos_search_index, seed_pos_benchmark, clear_pos_benchmark, run_pos_benchmark]
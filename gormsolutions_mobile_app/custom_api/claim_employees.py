@@ -23,8 +23,10 @@ def get_employees_and_claim_types():
 import frappe
 from frappe import _
 
+from gormsolutions_mobile_app.custom_api.response_format import format_response
+
 @frappe.whitelist(allow_guest=True)
-def get_employees_claim_types_and_cost_centers():
+def get_employees_claim_types_and_cost_centers(format=None):
     # Fetch employees from the Employee doctype
     employees = frappe.get_all("Employee", fields=["name", "employee_name", "department"])
     
@@ -43,8 +45,8 @@ def get_employees_claim_types_and_cost_centers():
     if not cost_centers:
         frappe.throw(_("No cost centers found where Is Group = 0"))
     
-    return {
+    return format_response({
         "employees": employees,
         "expense_claim_types": claim_types,
         "cost_centers": cost_centers
-    }
+    }, format)
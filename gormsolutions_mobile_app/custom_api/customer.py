@@ -1,18 +1,39 @@
+import hashlib
+
 import frappe
 
+from gormsolutions_mobile_app.custom_api.pagination import get_page, is_cursor_mode
+from gormsolutions_mobile_app.custom_api.response_format import etag_matches, format_response, not_modified
+from gormsolutions_mobile_app.custom_api.search_index import get_ranked_page, search_names
+
+CUSTOMER_PRICING_CACHE_KEY = "gormsolutions_customer_pricing_snapshot"
+
 @frappe.whitelist(allow_guest=True)
-def get_customer_details(limit,offset,search=None):
+def get_customer_details(limit,offset=None,search=None,cursor=None):
+    filters=[
+    ['disabled','=','No']]
+
+    fields=['name','customer_name', 'mobile_no','email_id']
+
+    # Search words match prefixes of the customer ID, name and mobile number (see search_index).
+    # Opt-in keyset pagination on (modified, name); see pagination.is_cursor_mode
+    if is_cursor_mode(cursor):
+        if search:
+            # Keyset pages keep (modified, name) order and cover the best SEARCH_CANDIDATE_LIMIT matches
+            candidates = search_names('Customer', search)
+            if not candidates:
+                return {'data': [], 'next_cursor': None}
+            filters.append(['name','in',candidates])
+        return get_page('Customer', fields, filters, limit, cursor, get_list=frappe.db.get_list)
+
     if search:
-        filters=[
-        ['disabled','=','No'] ,
-        ['customer_name','like','%'+search+'%']]
-    else:
-        filters=[
-        ['disabled','=','No']]
+        # Best matches first; ranked candidates are fetched until the page is full
+        return get_ranked_page('Customer', search, 'name', offset, limit,
+            lambda names: frappe.db.get_list('Customer', filters=filters + [['name','in',names]], fields=fields, page_length=len(names)))
 
     customer_details = frappe.db.get_list('Customer',
     filters = filters,
-    fields=['name','customer_name', 'mobile_no','email_id'],
+    fields=fields,
     
     start=offset,
     page_length=limit
@@ -33,56 +54,77 @@ def create_customer(customer_name,mobile_no,email_id=None):
     return doc.name
 
 @frappe.whitelist(allow_guest=True)
-def get_customers_and_pricing_rules():
-    # Fetch all customers
-    customers = frappe.get_all('Customer', fields=['name', 'customer_group','customer_name', 'mobile_no','email_id'])
-
-    # Prepare result
+def get_customers_and_pricing_rules(format=None):
+    """
+    Fetch all customers with the rates and item codes of their pricing rules.
+
+    The result is built once and cached until a Customer or Pricing Rule changes. Responses
+    carry an ETag, so a device that sends it back in If-None-Match gets a 304 instead of the
+    full list when nothing has changed.
+    """
+    snapshot = frappe.cache().get_value(CUSTOMER_PRICING_CACHE_KEY, generator=build_customer_pricing_snapshot)
+
+    if not frappe.request:
+        return snapshot["data"]
+
+    if etag_matches(snapshot["etag"], frappe.get_request_header("If-None-Match")):
+        return not_modified(snapshot["etag"])
+
+    return format_response(snapshot["data"], format, headers={"ETag": snapshot["etag"]})
+
+
+def build_customer_pricing_snapshot():
+    """Build the customers-with-pricing-rules list in one joined query, plus its ETag."""
+    rows = frappe.db.sql("""
+        SELECT
+            c.name AS customer,
+            c.mobile_no,
+            c.email_id,
+            c.customer_group,
+            pr.name AS pricing_rule,
+            pr.rate,
+            pric.item_code
+        FROM `tabCustomer` c
+        LEFT JOIN `tabPricing Rule` pr ON pr.customer = c.name
+        LEFT JOIN `tabPricing Rule Item Code` pric
+            ON pric.parent = pr.name AND pric.parenttype = 'Pricing Rule'
+        ORDER BY c.modified DESC, c.name, pr.name, pric.idx
+    """, as_dict=True)
+
+    # Group the flat rows back into customer -> pricing rules -> items
     result = []
-
-    for customer in customers:
-        # Fetch the pricing rules associated with this customer (if any)
-        pricing_rules = frappe.get_all('Pricing Rule', filters={'customer': customer['name']}, fields=['name', 'rate'])
-
-        # Initialize the customer data
-        customer_info = {
-            'customer': customer['name'],
-            'mobile_no': customer['mobile_no'],
-            'email_id': customer['email_id'],
-            'customer_group': customer['customer_group'],
-            'pricing_rules': []
-        }
-
-        for pricing_rule in pricing_rules:
-            # Fetch the items related to this pricing rule from the Pricing Rule Item Code child table
-            pricing_rule_items = frappe.get_all('Pricing Rule Item Code', filters={'parent': pricing_rule['name']}, fields=['item_code'])
-
-            pricing_rule_info = {
-                'rate': pricing_rule['rate'],  # Rate from the Pricing Rule
-                'items': []
+    customers = {}
+    pricing_rules = {}
+    for row in rows:
+        customer_info = customers.get(row.customer)
+        if not customer_info:
+            customer_info = customers[row.customer] = {
+                'customer': row.customer,
+                'mobile_no': row.mobile_no,
+                'email_id': row.email_id,
+                'customer_group': row.customer_group,
+                'pricing_rules': []
             }
+            result.append(customer_info)
 
-            # Add items to the pricing rule info
-            for item in pricing_rule_items:
-                pricing_rule_info['items'].append({
-                    'item_code': item['item_code']
-                })
+        if not row.pricing_rule:
+            continue
 
-            # Add pricing rule info to customer data
+        pricing_rule_info = pricing_rules.get(row.pricing_rule)
+        if not pricing_rule_info:
+            pricing_rule_info = pricing_rules[row.pricing_rule] = {
+                'rate': row.rate,  # Rate from the Pricing Rule
+                'items': []
+            }
             customer_info['pricing_rules'].append(pricing_rule_info)
 
-        # Add the customer info to the result
-        result.append(customer_info)
+        if row.item_code:
+            pricing_rule_info['items'].append({'item_code': row.item_code})
 
-    return result
+    etag = '"{}"'.format(hashlib.md5(frappe.as_json(result).encode()).hexdigest())
+    return {"data": result, "etag": etag}
 
-# Fetch customers and their pricing rules with items
-customers_pricing_rules = get_customers_and_pricing_rules()
 
-# Print the result
-for customer_info in customers_pricing_rules:
-    print(f"Customer: {customer_info['customer']}")
-    print(f"Customer Group: {customer_info['customer_group']}")
-    
-    for pricing_rule in customer_info['pricing_rules']:
-        print(f"  Pricing Rule Rate: {pricing_rule['rate']}")
+def clear_customer_pricing_snapshot(doc=None, method=None):
+    """doc_events handler for Customer and Pricing Rule changes."""
+    frappe.cache().delete_value(CUSTOMER_PRICING_CACHE_KEY)
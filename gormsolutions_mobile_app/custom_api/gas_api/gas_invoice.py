@@ -3,47 +3,23 @@ from frappe.model.document import Document
 from frappe.exceptions import PermissionError
 from datetime import datetime, timedelta
 
+from gormsolutions_mobile_app.custom_api.idempotency import idempotent
+from gormsolutions_mobile_app.custom_api.pos_context import get_pos_context
+
 @frappe.whitelist(allow_guest=True)
+@idempotent
 def create_gas_invoice(customer, items, include_payments=None, mode_of_payment=None):
     try:
-        # Get the current user 
-        current_user = frappe.session.user
-
-        # Get permitted cost centers for the current user
-        cost_center_permitted = frappe.get_all(
-            "User Permission",
-            filters={"user": current_user, "allow": "Cost Center"},
-            fields=["for_value"]
-        )
+        # Resolve the current user's permitted cost center, warehouses and price list
+        pos_context = get_pos_context()
 
         # Default cost center to use (fetched from permissions)
-        default_cost_centers = cost_center_permitted[0]['for_value'] if cost_center_permitted else None
-
-        # Fetch User Permission records for 'Warehouse' allowed for the current user
-        fallback_warehouse = frappe.get_all(
-            'User Permission',
-            filters={'user': current_user, 'allow': 'Warehouse',"is_default":1},
-            fields=['for_value']
-        )
-
-        # Determine the fallback warehouse value
-        fallback_warehouse = fallback_warehouse[0]['for_value'] if fallback_warehouse else None
-
-        # Fetch allowed Price List
-        price_list_permissions = frappe.get_all(
-            "User Permission",
-            filters={"user": current_user, "allow": "Price List"},
-            fields=["for_value"]
-        )
-        price_list = price_list_permissions[0]['for_value'] if price_list_permissions else None
+        default_cost_centers = pos_context.cost_centers[0] if pos_context.cost_centers else None
 
-        # Fetch 'Accepted Store Empties' for the current user
-        store_warehouse_empties = frappe.get_all(
-            'User Permission',
-            filters={'user': current_user,"is_default":0,'allow': 'Warehouse'},
-            fields=['for_value']
-        )
-        default_warehouse_empties = store_warehouse_empties[0]['for_value'] if store_warehouse_empties else None
+        # The default warehouse is the store, the non-default one receives the empties
+        fallback_warehouse = pos_context.default_warehouse
+        price_list = pos_context.price_list
+        default_warehouse_empties = pos_context.empties_store
 
         # Get today's date and time for setting in the document
         today_date = datetime.today().date()  # Get current date
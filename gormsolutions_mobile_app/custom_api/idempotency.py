@@ -0,0 +1,98 @@
+import functools
+import hashlib
+import json
+
+import frappe
+from frappe import _
+from frappe.utils import add_to_date, cint, now_datetime
+
+IDEMPOTENCY_DOCTYPE = "POS Idempotency Key"
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+DEFAULT_TTL_HOURS = 24
+
+
+def idempotent(fn):
+    """
+    Make a whitelisted document-creating method safe to retry.
+
+    When the client sends an `Idempotency-Key` header (or an `idempotency_key` argument), the first
+    successful result is stored in `POS Idempotency Key` for `pos_idempotency_ttl_hours` (site config,
+    default 24). Replays of the same key by the same user return that stored result without calling
+    the method again. Error results are not stored, so a failed call can be retried with the same key.
+
+    Usage (keep `frappe.whitelist` outermost):
+
+        @frappe.whitelist()
+        @idempotent
+        def create_invoice(...):
+    """
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = frappe.get_request_header(IDEMPOTENCY_HEADER) or frappe.form_dict.get("idempotency_key")
+        if not key:
+            return fn(*args, **kwargs)
+
+        endpoint = f"{fn.__module__}.{fn.__name__}"
+        key_hash = hashlib.sha256(f"{frappe.session.user}\n{endpoint}\n{key}".encode()).hexdigest()
+
+        stored = get_stored_response(key_hash)
+        if stored is not None:
+            return stored
+
+        try:
+            # Claim the key first: a concurrent retry blocks on this row until we commit
+            frappe.get_doc({
+                "doctype": IDEMPOTENCY_DOCTYPE,
+                "key_hash": key_hash,
+                "endpoint": endpoint,
+                "user": frappe.session.user,
+                "expires_on": add_to_date(now_datetime(), hours=cint(frappe.conf.pos_idempotency_ttl_hours) or DEFAULT_TTL_HOURS),
+            }).insert(ignore_permissions=True)
+        except (frappe.DuplicateEntryError, frappe.UniqueValidationError):
+            stored = get_stored_response(key_hash)
+            if stored is not None:
+                return stored
+            frappe.throw(_("A request with this idempotency key is already being processed."), frappe.DuplicateEntryError)
+
+        result = fn(*args, **kwargs)
+
+        if is_error_response(result):
+            frappe.db.delete(IDEMPOTENCY_DOCTYPE, {"name": key_hash})
+        else:
+            frappe.db.set_value(IDEMPOTENCY_DOCTYPE, key_hash, "response", frappe.as_json(result), update_modified=False)
+
+        return result
+
+    return wrapper
+
+
+def get_stored_response(key_hash):
+    """Return the stored result for `key_hash`, or None if there is none (or it has expired)."""
+    stored = frappe.db.get_value(IDEMPOTENCY_DOCTYPE, key_hash, ["response", "expires_on"], as_dict=True)
+    if not stored:
+        return None
+
+    if stored.expires_on and stored.expires_on < now_datetime():
+        frappe.db.delete(IDEMPOTENCY_DOCTYPE, {"name": key_hash})
+        return None
+
+    if stored.response is None:
+        # claimed by a request that has not finished yet
+        return None
+
+    return json.loads(stored.response)
+
+
+def is_error_response(result):
+    """The custom_api methods report failures as return values rather than exceptions."""
+    if isinstance(result, BaseException):
+        return True
+    if isinstance(result, dict):
+        return "error" in result or result.get("status") == "error"
+    return isinstance(result, str) and result.startswith("Error:")
+
+
+def clear_expired_idempotency_keys():
+    """Scheduled daily: drop keys past their TTL."""
+    frappe.db.delete(IDEMPOTENCY_DOCTYPE, {"expires_on": ("<", now_datetime())})
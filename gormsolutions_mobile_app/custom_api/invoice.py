@@ -1,5 +1,6 @@
 import frappe
 import json
+import time
 
 # @frappe.whitelist(allow_guest=True)
 # def get_invoice_details(limit, offset, search=None):
@@ -25,8 +26,38 @@ from datetime import datetime, timedelta
 import frappe
 from datetime import datetime
 
+from frappe.utils import get_fullname
+
+from gormsolutions_mobile_app.custom_api.idempotency import idempotent
+from gormsolutions_mobile_app.custom_api.pagination import get_page, is_cursor_mode
+from gormsolutions_mobile_app.custom_api.pos_context import get_pos_context
+
+INVOICE_LIST_FIELDS = [
+    'name', 'grand_total', 'posting_time', 'posting_date', 'paid_amount', 'outstanding_amount',
+    'owner', 'docstatus', "status", 'customer', 'customer_name'
+]
+INVOICE_ITEM_FIELDS = ['item_code', 'rate', 'qty', 'amount']
+
+
 @frappe.whitelist(allow_guest=True)
-def get_invoice_details(limit, offset, search=None):
+def get_invoice_details(limit, offset=None, search=None, fields=None, include_items=1, cursor=None):
+    """
+    Fetch the logged-in user's submitted Sales Invoices, newest first.
+
+    Args:
+        limit (int): Number of invoices to fetch.
+        offset (int, optional): Offset for pagination (used when no cursor is sent).
+        search (str, optional): Search keyword for customer name.
+        fields (list | str, optional): Subset of INVOICE_LIST_FIELDS to return.
+        include_items (bool, optional): Attach the invoice item rows (default: 1).
+            List views can pass 0 to skip loading items entirely.
+        cursor (str, optional): Opt into keyset pagination on (posting_date, name).
+            Send an empty cursor for the first page and `next_cursor` afterwards.
+
+    Returns:
+        list: Sales Invoice details, each with an `items` list when requested.
+            In cursor mode: {"data": [...], "next_cursor": str | None}.
+    """
     # Initialize filters with docstatus filter
     filters = [["docstatus", "!=", 0]]
 
@@ -37,85 +68,304 @@ def get_invoice_details(limit, offset, search=None):
     if search:
         filters.append(["customer_name", "like", f"%{search}%"])
 
-    # Fetch filtered Sales Invoice details
-    sales_invoice_details = frappe.get_all(
-        'Sales Invoice',
-        fields=[
-            'name', 'grand_total', 'posting_time', 'posting_date', 'paid_amount', 'outstanding_amount',
-            'owner', 'docstatus', "status", 'customer', 'customer_name'
-        ],
-        order_by='posting_date desc',
-        filters=filters,
-        start=offset,
-        page_length=limit
-    )
+    # Only allow known invoice columns; `name` is always needed to attach items
+    if fields:
+        if isinstance(fields, str):
+            fields = json.loads(fields) if fields.startswith("[") else [field.strip() for field in fields.split(",")]
+        fields = [field for field in INVOICE_LIST_FIELDS if field in fields]
+        if 'name' not in fields:
+            fields.insert(0, 'name')
+    else:
+        fields = INVOICE_LIST_FIELDS
+
+    if is_cursor_mode(cursor):
+        page = get_page('Sales Invoice', fields, filters, limit, cursor, sort_field='posting_date')
+        sales_invoice_details = page["data"]
+    else:
+        # Fetch filtered Sales Invoice details
+        sales_invoice_details = frappe.get_all(
+            'Sales Invoice',
+            fields=fields,
+            order_by='posting_date desc, name desc',
+            filters=filters,
+            start=offset,
+            page_length=limit
+        )
 
-    # Format posting_time to include AM/PM and two decimal places for seconds
     for invoice in sales_invoice_details:
         if invoice.get('posting_time'):
-            posting_time_str = str(invoice['posting_time'])
-
-            # Ensure seconds are in two digits and fractional seconds are not more than two decimal places
-            time_parts = posting_time_str.split(":")
-            if len(time_parts) == 3:
-                seconds_parts = time_parts[2].split(".")
-                if len(seconds_parts) == 1:
-                    # No decimal part, just ensure 2 digits for seconds
-                    time_parts[2] = f"{seconds_parts[0]:02}"
-                else:
-                    # If there are decimals, ensure only two decimal places
-                    time_parts[2] = f"{seconds_parts[0]:02}.{seconds_parts[1][:2]}"  # Limit to 2 decimals
-
-            # Rebuild the time string after fixing the seconds and microseconds
-            formatted_time_str = ":".join(time_parts)
-
-            try:
-                # Try parsing the fixed time with fractional seconds
-                posting_time = datetime.strptime(formatted_time_str, '%H:%M:%S.%f')
-                formatted_time = posting_time.strftime('%I:%M:%S.%f')[:-3]  # Trim microseconds to two decimals
-                formatted_time = formatted_time + " " + posting_time.strftime("%p")
-            except ValueError:
-                # Fallback for cases where the format is not as expected
-                posting_time = datetime.strptime(formatted_time_str, '%H:%M:%S')
-                formatted_time = posting_time.strftime('%I:%M:%S') + " " + posting_time.strftime("%p")
-
-            # Update the posting_time field with the formatted value
-            invoice['posting_time'] = formatted_time
-
-        # Fetch items related to each invoice
-        items = frappe.get_all(
-            'Sales Invoice Item',
-            fields=['item_code', 'rate', 'qty', 'amount'],
-            filters={'parent': invoice['name']}
-        )
-        invoice['items'] = items
+            invoice['posting_time'] = format_posting_time(invoice['posting_time'])
+
+    if frappe.utils.cint(include_items):
+        items_by_invoice = get_invoice_items([invoice['name'] for invoice in sales_invoice_details])
+        for invoice in sales_invoice_details:
+            invoice['items'] = items_by_invoice.get(invoice['name'], [])
 
+    if is_cursor_mode(cursor):
+        return page
     return sales_invoice_details
 
 
+def get_invoice_items(invoice_names):
+    """Fetch the item rows of all given invoices in one query, grouped by invoice name."""
+    items_by_invoice = {}
+    if not invoice_names:
+        return items_by_invoice
+
+    items = frappe.get_all(
+        'Sales Invoice Item',
+        fields=['parent'] + INVOICE_ITEM_FIELDS,
+        filters={'parent': ['in', invoice_names], 'parenttype': 'Sales Invoice'},
+        order_by='idx asc'
+    )
+    for item in items:
+        items_by_invoice.setdefault(item.pop('parent'), []).append(item)
+
+    return items_by_invoice
+
+
+def format_posting_time(posting_time):
+    """Format a posting_time as 12-hour time with AM/PM and at most two decimals for seconds."""
+    posting_time_str = str(posting_time)
+
+    # Ensure seconds are in two digits and fractional seconds are not more than two decimal places
+    time_parts = posting_time_str.split(":")
+    if len(time_parts) == 3:
+        seconds_parts = time_parts[2].split(".")
+        if len(seconds_parts) == 1:
+            # No decimal part, just ensure 2 digits for seconds
+            time_parts[2] = f"{seconds_parts[0]:02}"
+        else:
+            # If there are decimals, ensure only two decimal places
+            time_parts[2] = f"{seconds_parts[0]:02}.{seconds_parts[1][:2]}"  # Limit to 2 decimals
+
+    # Rebuild the time string after fixing the seconds and microseconds
+    formatted_time_str = ":".join(time_parts)
+
+    try:
+        # Try parsing the fixed time with fractional seconds
+        posting_time = datetime.strptime(formatted_time_str, '%H:%M:%S.%f')
+        formatted_time = posting_time.strftime('%I:%M:%S.%f')[:-3]  # Trim microseconds to two decimals
+        formatted_time = formatted_time + " " + posting_time.strftime("%p")
+    except ValueError:
+        # Fallback for cases where the format is not as expected
+        posting_time = datetime.strptime(formatted_time_str, '%H:%M:%S')
+        formatted_time = posting_time.strftime('%I:%M:%S') + " " + posting_time.strftime("%p")
+
+    return formatted_time
+
+
 @frappe.whitelist()
-def create_invoice(customer_name, paid_amount, items, user=None, is_pos=None, update_stock=None):
-    import json
+@idempotent
+def create_invoice(customer_name, paid_amount, items, user=None, is_pos=None, update_stock=None, async_submit=None):
+    """
+    Create and submit a Sales Invoice for a mobile app sale.
+
+    With `async_submit` set, the draft is inserted and returned immediately and the submit (stock
+    ledger and GL posting) runs on a background worker; see `queue_invoice_submit`.
+    """
+    # Resolve warehouse, mode of payment and POS profile for the current user
+    invoice_context = get_invoice_context(user if is_pos else None)
+    if invoice_context.get("error"):
+        return invoice_context
 
-    # Parse items if necessary
-    if isinstance(items, str):
-        items = json.loads(items)
+    try:
+        invoice_doc = build_invoice_doc(
+            invoice_context, customer_name, paid_amount, items, is_pos, update_stock,
+            payment_terms=frappe.db.get_value("Customer", customer_name, "payment_terms")
+        )
+
+        # Save and submit the document
+        res_doc = invoice_doc.insert()
+        if frappe.utils.cint(async_submit):
+            queue_invoice_submit(res_doc)
+        else:
+            res_doc.submit()
+        return res_doc
+
+    except Exception as e:
+        return {"error": str(e)}
+
+
+INVOICE_SUBMIT_QUEUE_KEY = "gormsolutions_invoice_submit_queue"
+INVOICE_SUBMIT_LOCK_KEY = "gormsolutions_invoice_submit_lock"
+# Longer than one drain; a lock left by a killed job expires with the short queue's 5 minute job timeout
+INVOICE_SUBMIT_LOCK_TIMEOUT = 5 * 60
+INVOICE_SUBMIT_DRAIN_SECONDS = 2 * 60
+
+
+def queue_invoice_submit(invoice_doc):
+    """
+    Queue a draft invoice to be submitted by `submit_queued_invoices`.
+
+    Drafts are appended to a Redis list per warehouse once the request commits, and a background
+    job drains that list while holding a per-warehouse lock, so invoices of one warehouse are
+    submitted one at a time in the order they were created. The outcome is sent to the invoice
+    owner as a `pos_invoice_submitted` realtime event.
+    """
+    warehouse = invoice_doc.set_warehouse or next(
+        (item.warehouse for item in invoice_doc.items if item.warehouse), None
+    ) or "_default"
+
+    def enqueue():
+        frappe.cache().rpush(f"{INVOICE_SUBMIT_QUEUE_KEY}|{warehouse}", invoice_doc.name)
+        frappe.enqueue(
+            "gormsolutions_mobile_app.custom_api.invoice.submit_queued_invoices",
+            queue="short",
+            warehouse=warehouse
+        )
+
+    frappe.db.after_commit.add(enqueue)
+
+
+def submit_queued_invoices(warehouse):
+    """
+    Background job: submit the queued drafts of `warehouse` in queue order.
+
+    One job at a time drains the list of a warehouse; a job that finds the lock taken returns at
+    once, since the holder also submits its draft. A drain stops after
+    INVOICE_SUBMIT_DRAIN_SECONDS and enqueues a new job for the rest, to stay within the job timeout.
+    """
+    queue_key = f"{INVOICE_SUBMIT_QUEUE_KEY}|{warehouse}"
+    while True:
+        lock = frappe.cache().lock(
+            frappe.cache().make_key(f"{INVOICE_SUBMIT_LOCK_KEY}|{warehouse}"),
+            timeout=INVOICE_SUBMIT_LOCK_TIMEOUT
+        )
+        if not lock.acquire(blocking=False):
+            return
+
+        started = time.monotonic()
+        try:
+            while time.monotonic() - started < INVOICE_SUBMIT_DRAIN_SECONDS:
+                name = frappe.cache().lpop(queue_key)
+                if not name:
+                    break
+                submit_queued_invoice(frappe.safe_decode(name))
+        finally:
+            lock.release()
+
+        if time.monotonic() - started >= INVOICE_SUBMIT_DRAIN_SECONDS:
+            # Enqueued after the release, so the new job can take the lock
+            frappe.enqueue(
+                "gormsolutions_mobile_app.custom_api.invoice.submit_queued_invoices",
+                queue="short",
+                warehouse=warehouse
+            )
+            return
+
+        # A draft queued after the last pop may have found the lock still taken
+        if not frappe.cache().llen(queue_key):
+            return
+
+
+def submit_queued_invoice(name):
+    invoice_doc = frappe.get_doc("Sales Invoice", name)
+    if invoice_doc.docstatus != 0:
+        return
+
+    # Submit as the cashier who created the draft
+    frappe.set_user(invoice_doc.owner)
+    try:
+        invoice_doc.submit()
+        frappe.db.commit()
+        message = {"name": name, "status": "submitted"}
+    except Exception as e:
+        frappe.db.rollback()
+        frappe.log_error(frappe.get_traceback(), "POS Invoice Async Submit Error")
+        message = {"name": name, "status": "error", "error": str(e)}
+    finally:
+        frappe.set_user("Administrator")
+
+    frappe.publish_realtime("pos_invoice_submitted", message, user=invoice_doc.owner)
+
+
+MAX_INVOICE_BATCH_SIZE = 1000
+
+
+@frappe.whitelist()
+@idempotent
+def create_invoices_batch(invoices, user=None):
+    """
+    Create and submit a batch of invoices queued by the app while it was offline.
+
+    The warehouse, mode of payment, POS profile and customer payment terms are resolved once for
+    the whole batch. Each invoice is inserted and submitted under its own savepoint, so a failing
+    invoice is rolled back without affecting the others.
+
+    Args:
+        invoices (list): Invoices with the `create_invoice` arguments:
+            customer_name, paid_amount, items, is_pos, update_stock.
+        user (str, optional): User for fetching the POS Profile of POS invoices.
+
+    Returns:
+        list: One result per invoice, in order:
+            {"index": 0, "status": "success", "name": "ACC-SINV-..."} or
+            {"index": 1, "status": "error", "error": "..."}
+    """
+    if isinstance(invoices, str):
+        invoices = json.loads(invoices)
+
+    if not isinstance(invoices, list):
+        return {"error": "Invoices must be a list."}
+
+    if len(invoices) > MAX_INVOICE_BATCH_SIZE:
+        return {"error": f"A batch can contain at most {MAX_INVOICE_BATCH_SIZE} invoices."}
+
+    invoice_context = get_invoice_context(user)
+    if invoice_context.get("error"):
+        return invoice_context
+
+    customers = list({invoice.get("customer_name") for invoice in invoices if invoice.get("customer_name")})
+    payment_terms = dict(frappe.get_all(
+        "Customer",
+        filters={"name": ["in", customers]},
+        fields=["name", "payment_terms"],
+        as_list=True
+    )) if customers else {}
+
+    results = []
+    for index, invoice in enumerate(invoices):
+        savepoint = f"pos_invoice_batch_{index}"
+        frappe.db.savepoint(savepoint)
+        try:
+            invoice_doc = build_invoice_doc(
+                invoice_context,
+                invoice.get("customer_name"),
+                invoice.get("paid_amount"),
+                invoice.get("items") or [],
+                invoice.get("is_pos"),
+                invoice.get("update_stock"),
+                payment_terms=payment_terms.get(invoice.get("customer_name"))
+            )
+            invoice_doc.insert()
+            invoice_doc.submit()
+            frappe.db.release_savepoint(savepoint)
+            results.append({"index": index, "status": "success", "name": invoice_doc.name})
+        except Exception as e:
+            frappe.db.rollback(save_point=savepoint)
+            frappe.clear_messages()
+            results.append({"index": index, "status": "error", "error": str(e)})
+
+    return results
+
+
+def get_invoice_context(user=None):
+    """
+    Resolve the warehouse, mode of payment and POS profile used for the current user's invoices.
+
+    Args:
+        user (str, optional): User whose default POS Profile is used for POS invoices.
+
+    Returns:
+        frappe._dict: fallback_warehouse, mode_of_payment, pos_profile, pos_warehouse;
+            or {"error": "..."} when the user is not configured for invoicing.
+    """
+    # Resolve the current user's permitted warehouses, modes of payment etc.
+    pos_context = get_pos_context()
 
-    # Get the current user
-    current_user = frappe.session.user 
-
-    # Fetch User Permission records for 'Warehouse' allowed for the current user
-    warehouse_list = frappe.get_all(
-        'User Permission',
-        filters={
-            'user': current_user,
-            'allow': 'Warehouse'
-        },
-        fields=['for_value']
-    )
-    
     # Determine fallback warehouse
-    fallback_warehouse = warehouse_list[0]['for_value'] if warehouse_list else None
+    fallback_warehouse = pos_context.warehouses[0] if pos_context.warehouses else None
 
     if not fallback_warehouse:
         # Use the default warehouse from Stock Settings if no user permissions found
@@ -124,16 +374,7 @@ def create_invoice(customer_name, paid_amount, items, user=None, is_pos=None, up
             return {"error": "No warehouse assigned to user and no default warehouse found in Stock Settings."}
 
     # Fetch and validate Mode of Payment
-    mode_of_payment_list = frappe.get_all(
-        'User Permission',
-        filters={
-            'user': current_user,
-            'allow': 'Mode of Payment' 
-        },
-        fields=['for_value']
-    )
-
-    mode_of_payment = mode_of_payment_list[0]['for_value'] if mode_of_payment_list else None
+    mode_of_payment = pos_context.modes_of_payment[0] if pos_context.modes_of_payment else None
 
     if not mode_of_payment:
         return {"error": "No Mode of Payment assigned to the user. Please configure Mode of Payment in User Permissions."}
@@ -141,93 +382,58 @@ def create_invoice(customer_name, paid_amount, items, user=None, is_pos=None, up
     if not frappe.db.exists('Mode of Payment', mode_of_payment):
         return {"error": f"The Mode of Payment '{mode_of_payment}' does not exist in the system. Please check the configuration."}
 
-    # Initialize POS profile and warehouse
-    pos_profile = None
-    pos_warehouse = None
+    # If user is provided, fetch POS profile
+    user_pos_context = get_pos_context(user) if user else frappe._dict()
 
-    # If user and is_pos are provided, fetch POS profile
-    if user and is_pos:
-        pos_profile = frappe.db.get_value("POS Profile User", {"default": 1, "user": user}, "parent")
-        pos_warehouse = frappe.db.get_value("POS Profile", pos_profile, "warehouse")
+    return frappe._dict({
+        "fallback_warehouse": fallback_warehouse,
+        "mode_of_payment": mode_of_payment,
+        "pos_profile": user_pos_context.get("pos_profile"),
+        "pos_warehouse": user_pos_context.get("pos_warehouse"),
+    })
+
+
+def build_invoice_doc(invoice_context, customer_name, paid_amount, items, is_pos=None, update_stock=None,
+        payment_terms=None):
+    """Build (without saving) the Sales Invoice for one mobile app sale."""
+    # Parse items if necessary
+    if isinstance(items, str):
+        items = json.loads(items)
+
+    # POS profile and warehouse only apply to POS invoices
+    pos_profile = invoice_context.pos_profile if is_pos else None
+    pos_warehouse = invoice_context.pos_warehouse if is_pos else None
 
     # Set warehouse and enable update_stock if is_pos or update_stock is enabled
     if is_pos or update_stock:
         for item in items:
             # Use POS warehouse if available, else fallback to user-defined or default warehouse
-            item['warehouse'] = pos_warehouse or fallback_warehouse
+            item['warehouse'] = pos_warehouse or invoice_context.fallback_warehouse
         update_stock = 1  # Explicitly enable update_stock
 
-    try:
-        # Construct the Sales Invoice document
-        invoice_doc_data = {
-            "doctype": "Sales Invoice",
-            "customer": customer_name,
-            "from_mobile_app": "Mobile App Cash Customer",
-            "update_stock": update_stock,  # Ensure update_stock is enabled
-            "is_pos": is_pos,  # Use the value passed by the user
-            "items": items,
-            "payment_terms_template": frappe.db.get_value("Customer", customer_name, "payment_terms") or None
-        }
-
-        # Include POS profile only if is_pos is enabled
-        if is_pos:
-            invoice_doc_data["pos_profile"] = pos_profile
-
-            # Add payment details for POS invoices
-            invoice_doc_data["payments"] = [{
-                "mode_of_payment": mode_of_payment,
-                "amount": paid_amount
-            }]
-
-        # Create the Sales Invoice document
-        invoice_doc = frappe.get_doc(invoice_doc_data)
-
-        # Save and submit the document
-        res_doc = invoice_doc.insert()
-        res_doc.submit()
-        return res_doc
-
-    except Exception as e:
-        return {"error": str(e)}
+    # Construct the Sales Invoice document
+    invoice_doc_data = {
+        "doctype": "Sales Invoice",
+        "customer": customer_name,
+        "from_mobile_app": "Mobile App Cash Customer",
+        "update_stock": update_stock,  # Ensure update_stock is enabled
+        "is_pos": is_pos,  # Use the value passed by the user
+        "items": items,
+        "payment_terms_template": payment_terms or None
+    }
+
+    # Include POS profile only if is_pos is enabled
+    if is_pos:
+        invoice_doc_data["pos_profile"] = pos_profile
+
+        # Add payment details for POS invoices
+        invoice_doc_data["payments"] = [{
+            "mode_of_payment": invoice_context.mode_of_payment,
+            "amount": paid_amount
+        }]
+
+    return frappe.get_doc(invoice_doc_data)
 
-@frappe.whitelist()
-def get_sales_payment_summary(start_date, end_date):
-    try:
-        # Get the logged-in user's full name
-        user_doc = frappe.get_doc("User", frappe.session.user)
-        user_full_name = user_doc.full_name
-
-        # Fetch Sales Invoice total for the specified date range and creator, excluding cancelled records
-        invoice_total = frappe.db.sql("""
-            SELECT SUM(`tabSales Invoice`.grand_total) as total_amount
-            FROM `tabSales Invoice`
-            WHERE posting_date BETWEEN %s AND %s
-            AND docstatus = 1  # Exclude cancelled records (docstatus = 2)
-            AND owner = %s
-        """, (start_date, end_date, frappe.session.user))[0][0]
-
-        # Fetch Payment Entry total for the specified date range linked to Sales Invoice and creator
-        payment_total = frappe.db.sql("""
-            SELECT SUM(`tabPayment Entry`.paid_amount) as total_paid_amount
-            FROM `tabPayment Entry Reference`
-            INNER JOIN `tabPayment Entry` ON `tabPayment Entry Reference`.parent = `tabPayment Entry`.name
-            INNER JOIN `tabSales Invoice` ON `tabPayment Entry Reference`.reference_name = `tabSales Invoice`.name
-            WHERE `tabPayment Entry`.posting_date BETWEEN %s AND %s
-            AND `tabPayment Entry`.docstatus = 1  # Exclude cancelled records (docstatus = 2)
-            AND `tabSales Invoice`.owner = %s
-        """, (start_date, end_date, frappe.session.user))[0][0]
-
-        data = {
-            "user": user_full_name,
-            "start_date": start_date,
-            "end_date": end_date,
-            "total_invoices": invoice_total,
-            "total_payments": payment_total,
-        }
-        return data
-    except Exception as e:
-        return {"error": str(e)}
-    
 @frappe.whitelist(allow_guest=True)
 def cancel_invoice(name=None):
     try:
@@ -279,55 +485,88 @@ def update_invoice(docname,items):
         
     return invoice_doc.save(ignore_permissions=True)
 
+
+SALES_PAYMENT_SUMMARY_CACHE_KEY = "gormsolutions_sales_payment_summary"
+SALES_PAYMENT_SUMMARY_CACHE_TTL = 60
+
+
 @frappe.whitelist()
 def get_sales_payment_summary(start_date, end_date):
+    """
+    Shift totals of the logged-in user between `start_date` and `end_date`.
+
+    Cached per user and date range for SALES_PAYMENT_SUMMARY_CACHE_TTL seconds; submitting or
+    cancelling one of the user's invoices, or a payment against them, clears the user's entries.
+    """
     try:
-        # Get the logged-in user's full name
-        user_doc = frappe.get_doc("User", frappe.session.user)
-        user_full_name = user_doc.full_name
-
-        # Fetch Sales Invoice total for the specified date range, creator, and POS status (excluding cancelled records)
-        invoice_total = frappe.db.sql("""
-            SELECT SUM(`tabSales Invoice`.grand_total) as total_amount
-            FROM `tabSales Invoice`
-            WHERE posting_date BETWEEN %s AND %s
-            AND docstatus = 1  # Exclude cancelled records (docstatus = 2)
-            AND owner = %s
-            
-        """, (start_date, end_date, frappe.session.user))[0][0]
-
-        # Fetch Payment Entry total for the specified date range, linked to Sales Invoice and creator
-        payment_total = frappe.db.sql("""
-            SELECT SUM(`tabPayment Entry`.paid_amount) as total_paid_amount
-            FROM `tabPayment Entry Reference`
-            INNER JOIN `tabPayment Entry` ON `tabPayment Entry Reference`.parent = `tabPayment Entry`.name
-            INNER JOIN `tabSales Invoice` ON `tabPayment Entry Reference`.reference_name = `tabSales Invoice`.name
-            WHERE `tabPayment Entry`.posting_date BETWEEN %s AND %s
-            AND `tabPayment Entry`.docstatus = 1  # Exclude cancelled records (docstatus = 2)
-            AND `tabSales Invoice`.owner = %s
-            """, (start_date, end_date, frappe.session.user))[0][0]
-
-        # Add the paid_amount of the Sales Invoice records with is_pos = 1 directly
-        invoice_paid_total = frappe.db.sql("""
-            SELECT SUM(`tabSales Invoice`.paid_amount) as total_invoice_paid
-            FROM `tabSales Invoice`
-            WHERE posting_date BETWEEN %s AND %s
-            AND docstatus = 1  # Exclude cancelled records (docstatus = 2)
-            AND owner = %s
-            AND is_pos = 1  # Include only POS invoices with a paid amount
-        """, (start_date, end_date, frappe.session.user))[0][0]
-
-        # Combine the Payment Entry total and the Invoice paid amounts
-        total_payments = (payment_total or 0) + (invoice_paid_total or 0)
-
-        # Prepare data to be returned
-        data = {
-            "user": user_full_name,
-            "start_date": start_date,
-            "end_date": end_date,
-            "total_invoices": invoice_total if invoice_total else 0,
-            "total_payments": total_payments,
-        }
-        return data
+        user = frappe.session.user
+        return frappe.cache().get_value(
+            get_sales_payment_summary_cache_key(start_date, end_date), user=user
+        ) or build_sales_payment_summary(start_date, end_date, user)
     except Exception as e:
         return {"error": str(e)}
+
+
+def build_sales_payment_summary(start_date, end_date, user):
+    # Invoice total, POS paid total and Payment Entry total (linked to the user's Sales Invoices) in one query
+    totals = frappe.db.sql("""
+        SELECT
+            SUM(si.grand_total) AS total_amount,
+            SUM(CASE WHEN si.is_pos = 1 THEN si.paid_amount ELSE 0 END) AS total_invoice_paid,
+            (
+                SELECT SUM(pe.paid_amount)
+                FROM `tabPayment Entry Reference` per
+                INNER JOIN `tabPayment Entry` pe ON per.parent = pe.name
+                INNER JOIN `tabSales Invoice` psi ON per.reference_name = psi.name
+                WHERE pe.posting_date BETWEEN %(start_date)s AND %(end_date)s
+                AND pe.docstatus = 1
+                AND psi.owner = %(user)s
+            ) AS total_paid_amount
+        FROM `tabSales Invoice` si
+        WHERE si.posting_date BETWEEN %(start_date)s AND %(end_date)s
+        AND si.docstatus = 1  # Exclude cancelled records (docstatus = 2)
+        AND si.owner = %(user)s
+    """, {"start_date": start_date, "end_date": end_date, "user": user}, as_dict=True)[0]
+
+    # Combine the Payment Entry total and the POS invoice paid amounts
+    total_payments = (totals.total_paid_amount or 0) + (totals.total_invoice_paid or 0)
+
+    data = {
+        "user": get_fullname(user),
+        "start_date": start_date,
+        "end_date": end_date,
+        "total_invoices": totals.total_amount if totals.total_amount else 0,
+        "total_payments": total_payments,
+    }
+
+    frappe.cache().set_value(
+        get_sales_payment_summary_cache_key(start_date, end_date),
+        data,
+        user=user,
+        expires_in_sec=SALES_PAYMENT_SUMMARY_CACHE_TTL
+    )
+    return data
+
+
+def get_sales_payment_summary_cache_key(start_date, end_date):
+    return f"{SALES_PAYMENT_SUMMARY_CACHE_KEY}|{start_date}|{end_date}"
+
+
+def clear_sales_payment_summary(doc, method=None):
+    """
+    doc_events handler for Sales Invoice and Payment Entry (on_submit, on_cancel): drop the cached
+    summaries of the invoice owner, or of the owners of the invoices a payment is allocated to.
+    """
+    if doc.doctype == "Payment Entry":
+        invoice_names = [
+            ref.reference_name for ref in doc.get("references") or []
+            if ref.reference_doctype == "Sales Invoice"
+        ]
+        owners = set(frappe.get_all(
+            "Sales Invoice", filters={"name": ["in", invoice_names]}, pluck="owner"
+        )) if invoice_names else set()
+    else:
+        owners = {doc.owner}
+
+    for owner in owners:
+        frappe.cache().delete_keys(f"user:{owner}:{SALES_PAYMENT_SUMMARY_CACHE_KEY}")
@@ -1,63 +1,58 @@
+from collections import OrderedDict
+
 import frappe
-from erpnext.stock.utils import get_stock_balance
 from frappe import throw, msgprint, _
 
+from gormsolutions_mobile_app.custom_api.pagination import (
+    decode_cursor,
+    encode_cursor,
+    get_keyset_rows,
+    get_page,
+    is_cursor_mode,
+)
+from gormsolutions_mobile_app.custom_api.pos_context import get_pos_context
+from gormsolutions_mobile_app.custom_api.response_format import format_response
+from gormsolutions_mobile_app.custom_api.search_index import get_ranked_page, search_names
+
+ITEM_DETAIL_FIELDS = ["item_code", "item_name", "description", "image","item_group", "stock_uom","custom_promotion_amount","custom_on_promotion"]
+ITEM_LOOKUP_VERSION_KEY = "gormsolutions_item_lookup_version"
+ITEM_LOOKUP_CACHE_SIZE = 5000
+
+# Scanned items, kept per worker: {(site, code, price list, warehouses): (versions, item)}
+item_lookup_cache = OrderedDict()
+
 @frappe.whitelist()
-def get_item_details(limit, offset, search=None, user=None):
+def get_item_details(limit, offset=None, search=None, user=None, cursor=None):
     """
     Fetch item details based on filters, user permissions, and stock information.
 
     Args:
         limit (int): Number of items to fetch.
-        offset (int): Offset for pagination.
-        search (str, optional): Search keyword for item name.
+        offset (int, optional): Offset for pagination (used when no cursor is sent).
+        search (str, optional): Search words, matched as prefixes of the item code, item name
+            and barcodes (see search_index). Best matches come first in offset mode. Cursor
+            pages keep (modified, name) order and cover the best SEARCH_CANDIDATE_LIMIT matches.
         user (str, optional): User for fetching POS Profile.
+        cursor (str, optional): Opt into keyset pagination on (modified, name).
+            Send an empty cursor for the first page and `next_cursor` afterwards.
 
     Returns:
         list: List of item details with stock and price information.
+            In cursor mode: {"data": [...], "next_cursor": str | None}.
     """
-    current_user = frappe.session.user
-
-    # Fetch all warehouses from User Permissions
-    user_permissions = frappe.get_all(
-        "User Permission",
-        filters={"user": current_user, "allow": "Warehouse"},
-        fields=["for_value"]
-    )
-    allowed_warehouses = [perm["for_value"] for perm in user_permissions]
+    # Fetch warehouses, item groups and price list from the cached User Permissions
+    pos_context = get_pos_context()
+    allowed_warehouses = pos_context.warehouses
     
     if not allowed_warehouses:
         frappe.throw(_("No warehouses found in User Permissions. Please set them."))
-    
-    # Fetch allowed Item Groups
-    allowed_item_groups = frappe.get_all(
-        "User Permission",
-        filters={"user": current_user, "allow": "Item Group"},
-        fields=["for_value"]
-    )
-    allowed_group_names = [group["for_value"] for group in allowed_item_groups]
 
-    # Fetch allowed Price List
-    price_list_permissions = frappe.get_all(
-        "User Permission",
-        filters={"user": current_user, "allow": "Price List"},
-        fields=["for_value"]
-    )
-    price_lists = [perm["for_value"] for perm in price_list_permissions]
-    
-    if not price_lists:
+    if not pos_context.price_list:
         frappe.throw(_("No price list found. Please set it in User Permissions."))
-    price_list = price_lists[0]  # Default to the first price list if multiple are allowed
-
-    # Fetch all child item groups under allowed groups
-    item_groups_to_filter = allowed_group_names[:]
-    if allowed_group_names:
-        child_groups = frappe.get_all(
-            "Item Group",
-            filters={"parent_item_group": ["in", allowed_group_names]},
-            fields=["name"]
-        )
-        item_groups_to_filter.extend([group["name"] for group in child_groups])
+    price_list = pos_context.price_list  # Default to the first price list if multiple are allowed
+
+    # Allowed item groups and their child groups
+    item_groups_to_filter = pos_context.item_groups_with_children
 
     # Prepare filters for fetching items
     filters = [
@@ -65,28 +60,54 @@ def get_item_details(limit, offset, search=None, user=None):
         # ["is_sales_item", "=", 1],
         # ["is_stock_item", "=", 1],
     ]
-    if search:
-        filters.append(["item_name", "like", f"%{search}%"])
     if item_groups_to_filter:
         filters.append(["item_group", "in", item_groups_to_filter])
 
     # Fetch items based on filters
-    item_details = frappe.get_all(
-        "Item",
-        filters=filters,
-        fields=["item_code", "item_name", "description", "image","item_group", "stock_uom","custom_promotion_amount","custom_on_promotion"],
-        start=offset,
-        page_length=limit,
-    )
+    fields = ITEM_DETAIL_FIELDS
+    if is_cursor_mode(cursor):
+        if search:
+            candidates = search_names("Item", search)
+            if not candidates:
+                return {"data": [], "next_cursor": None}
+            filters.append(["name", "in", candidates])
+        page = get_page("Item", fields, filters, limit, cursor)
+        item_details = page["data"]
+    elif search:
+        # Best matches first; ranked candidates are fetched until the page is full
+        item_details = get_ranked_page(
+            "Item", search, "item_code", offset, limit,
+            lambda names: frappe.get_all("Item", filters=filters + [["name", "in", names]], fields=fields, page_length=len(names))
+        )
+    else:
+        item_details = frappe.get_all(
+            "Item",
+            filters=filters,
+            fields=fields,
+            start=offset,
+            page_length=limit,
+        )
+
+    add_stock_and_price(item_details, allowed_warehouses, price_list)
+
+    if is_cursor_mode(cursor):
+        return page
+    return item_details
+
+def add_stock_and_price(item_details, allowed_warehouses, price_list):
+    """Enrich item details with stock and price information, one query each for the whole list."""
+    item_codes = [item["item_code"] for item in item_details]
+    stock_by_item = get_stock_by_item(item_codes, allowed_warehouses)
+    price_by_item = get_price_by_item(item_codes, price_list)
 
-    # Enrich item details with stock and price information
     for item in item_details:
         # Aggregate stock across all allowed warehouses
         stock_total = 0
         warehouse_stock = []
-        
+        item_stock = stock_by_item.get(item["item_code"], {})
+
         for warehouse in allowed_warehouses:
-            stock_balance = get_stock_balance(item["item_code"], warehouse) or 0.00
+            stock_balance = item_stock.get(warehouse) or 0.00
             stock_total += stock_balance
             warehouse_stock.append({
                 "warehouse_name": warehouse,
@@ -97,17 +118,149 @@ def get_item_details(limit, offset, search=None, user=None):
         item["other_warehouse_stock"] = warehouse_stock  # Detailed warehouse-wise stock
 
         # Get item price from the price list
-        item["price"] = frappe.get_value(
-            "Item Price",
-            {"item_code": item["item_code"], "selling": 1, "price_list": price_list},
-            "price_list_rate"
-        ) or 0.00
+        item["price"] = price_by_item.get(item["item_code"]) or 0.00
+
+def get_stock_by_item(item_codes, warehouses):
+    """
+    Fetch the current stock of the given items in the given warehouses from `Bin`.
+
+    Returns:
+        dict: {item_code: {warehouse: actual_qty}}
+    """
+    stock_by_item = {}
+    if not item_codes or not warehouses:
+        return stock_by_item
+
+    bins = frappe.get_all(
+        "Bin",
+        filters={"item_code": ["in", item_codes], "warehouse": ["in", warehouses]},
+        fields=["item_code", "warehouse", "actual_qty"]
+    )
+    for bin in bins:
+        stock_by_item.setdefault(bin["item_code"], {})[bin["warehouse"]] = bin["actual_qty"]
+
+    return stock_by_item
+
+
+def get_price_by_item(item_codes, price_list):
+    """
+    Fetch the selling rate of the given items in `price_list`.
+
+    Returns:
+        dict: {item_code: price_list_rate}, keeping the most recently modified price per item.
+    """
+    price_by_item = {}
+    if not item_codes or not price_list:
+        return price_by_item
+
+    prices = frappe.get_all(
+        "Item Price",
+        filters={"item_code": ["in", item_codes], "selling": 1, "price_list": price_list},
+        fields=["item_code", "price_list_rate"],
+        order_by="modified desc"
+    )
+    for price in prices:
+        price_by_item.setdefault(price["item_code"], price["price_list_rate"])
+
+    return price_by_item
+
+
+@frappe.whitelist()
+def get_item_by_code(code):
+    """
+    Look up one item by barcode or item code, for scanning at the till.
+
+    Args:
+        code (str): Barcode (Item Barcode) or item code.
+
+    Returns:
+        dict: Item details as in get_item_details: price in the user's price list, promotion
+            fields, and stock in the user's warehouses.
+
+    Answers are kept in a per-worker LRU cache and checked against version counters in Redis
+    (one round trip), which Item (and its barcodes), Item Price and stock changes bump.
+    """
+    code = (code or "").strip()
+    if not code:
+        frappe.throw(_("Scan a barcode or enter an item code"))
+
+    pos_context = get_pos_context()
+    if not pos_context.warehouses:
+        frappe.throw(_("No warehouses found in User Permissions. Please set them."))
+    if not pos_context.price_list:
+        frappe.throw(_("No price list found. Please set it in User Permissions."))
+
+    cache_key = (frappe.local.site, code, pos_context.price_list, tuple(pos_context.warehouses))
+    cached = item_lookup_cache.get(cache_key)
+    item = None
+    if cached:
+        versions, item = cached
+        if get_item_lookup_versions(item["item_code"]) == versions:
+            item_lookup_cache.move_to_end(cache_key)
+        else:
+            item = None
+
+    if item is None:
+        item_code = frappe.db.get_value("Item Barcode", {"barcode": code, "parenttype": "Item"}, "parent") or code
+        # Versions are read before the item and only bumped once a change commits, so a change
+        # committed while loading invalidates the entry
+        versions = get_item_lookup_versions(item_code)
+        item = frappe.db.get_value("Item", {"name": item_code, "disabled": 0}, ITEM_DETAIL_FIELDS, as_dict=True)
+        if not item:
+            frappe.throw(_("{0} {1} not found").format(_("Item"), code), frappe.DoesNotExistError)
+
+        add_stock_and_price([item], pos_context.warehouses, pos_context.price_list)
+        item_lookup_cache[cache_key] = (versions, item)
+        if len(item_lookup_cache) > ITEM_LOOKUP_CACHE_SIZE:
+            item_lookup_cache.popitem(last=False)
+
+    # Checked on every call: item group permissions are not part of the cache key
+    if pos_context.item_groups_with_children and item["item_group"] not in pos_context.item_groups_with_children:
+        frappe.throw(_("{0} {1} not found").format(_("Item"), code), frappe.DoesNotExistError)
+
+    return item
+
+
+def get_item_lookup_versions(item_code):
+    """Current (catalogue, item) version counters; None until first bumped."""
+    cache = frappe.cache()
+    return tuple(cache.mget([
+        cache.make_key(f"{ITEM_LOOKUP_VERSION_KEY}|catalogue"),
+        cache.make_key(f"{ITEM_LOOKUP_VERSION_KEY}|item|{item_code}"),
+    ]))
+
+
+def bump_item_lookup_version(doc, method=None, *args):
+    """
+    doc_events handler for Item, Item Price, Bin and Stock Ledger Entry: invalidate the cached
+    lookups of the affected item in every worker. Barcodes are saved with their Item.
+
+    The version is bumped after the transaction commits (for a Stock Ledger Entry, also after
+    the Bin is updated), so a lookup cannot cache the old data under the new version.
+    """
+    cache = frappe.cache()
+    item_code = doc.name if doc.doctype == "Item" else doc.get("item_code")
+
+    if method == "after_rename" or not item_code:
+        # Renames change item codes under cached barcodes; drop everything
+        key = cache.make_key(f"{ITEM_LOOKUP_VERSION_KEY}|catalogue")
+    else:
+        key = cache.make_key(f"{ITEM_LOOKUP_VERSION_KEY}|item|{item_code}")
+
+    def bump():
+        cache.incr(key)
+
+    frappe.db.after_commit.add(bump)
 
-    return item_details
 
 @frappe.whitelist(allow_guest = True)
-def get_item_details_offline(limit=None,offset=None,search=None):
-    
+def get_item_details_offline(limit=None,offset=None,search=None,format=None):
+    """
+    Deprecated: the three lists are paged independently and do not line up.
+    Kept for old app builds; new builds should use `sync_items`.
+
+    Pass format=columnar for the compact response (see response_format.format_response).
+    """
     # filters=[['item_name','like','%'+search+'%']]
     
     item_details = frappe.get_all('Item',
@@ -127,11 +280,11 @@ def get_item_details_offline(limit=None,offset=None,search=None):
     page_length=limit
     )
     # return item_details
-    return {
+    return format_response({
         "item_details":item_details,
         "item_stock_details":item_stock_details,
         "item_price_details":item_price_details
-    }
+    }, format)
     
 @frappe.whitelist(allow_guest = True)
 def get_item_warehouse_offline(limit=None,offset=None,search=None):
@@ -146,4 +299,117 @@ def get_item_warehouse_offline(limit=None,offset=None,search=None):
     )
     default_warehouse = [perm["for_value"] for perm in user_permissions]
     
-    return user_permissions
\ No newline at end of file
+    return user_permissions
+
+SYNC_ITEM_FIELDS = [
+    "item_code", "item_name", "description", "image", "item_group", "stock_uom",
+    "custom_promotion_amount", "custom_on_promotion", "disabled",
+]
+SYNC_PAGE_LENGTH = 500
+MAX_SYNC_PAGE_LENGTH = 5000
+# Rows are stamped with `modified` when written but become visible when their transaction
+# commits, possibly after rows of later transactions: a caught-up sync re-reads this window
+SYNC_LAG_SECONDS = 5 * 60
+
+
+@frappe.whitelist()
+def sync_items(since=None, limit=None):
+    """
+    Delta sync of the offline item catalogue.
+
+    Returns the items, bins (for the user's warehouses) and selling prices (for the user's price
+    lists) modified after the `since` watermark, plus tombstones for disabled or deleted items
+    and for prices deleted or no longer selling in the user's price lists. Call again with the
+    returned `watermark` while `has_more` is set.
+
+    Once a list is caught up its watermark is set back by SYNC_LAG_SECONDS, so rows of
+    transactions that committed late are still sent; re-sent rows are upserts by key.
+
+    Args:
+        since (str, optional): Watermark returned by the previous sync; omit for a full sync.
+        limit (int, optional): Maximum rows per list in one response.
+
+    Returns:
+        dict: {"items", "removed_items", "bins", "prices", "removed_prices", "watermark", "has_more"}
+    """
+    limit = min(frappe.utils.cint(limit) or SYNC_PAGE_LENGTH, MAX_SYNC_PAGE_LENGTH)
+    pos_context = get_pos_context()
+
+    watermark = decode_cursor(since)
+    if watermark and len(watermark) != 4:
+        frappe.throw(_("Invalid sync watermark."))
+    initial_sync = not watermark
+    if initial_sync:
+        # Nothing to delete on a device that starts empty; only track deletions from now on
+        watermark = [None, None, None, get_sync_lag_key()]
+    items_after, bins_after, prices_after, deleted_after = watermark
+
+    item_filters = [["disabled", "=", 0]] if initial_sync else []
+    items, items_more = get_keyset_rows("Item", SYNC_ITEM_FIELDS, item_filters, limit, items_after, descending=False)
+
+    bin_filters = []
+    if pos_context.warehouses:
+        bin_filters.append(["warehouse", "in", pos_context.warehouses])
+    bins, bins_more = get_keyset_rows(
+        "Bin", ["item_code", "warehouse", "actual_qty"], bin_filters, limit, bins_after, descending=False
+    )
+
+    # Not filtered on selling or price list, so a price that leaves the filter gets a tombstone
+    prices, prices_more = get_keyset_rows(
+        "Item Price", ["item_code", "price_list", "price_list_rate", "currency", "selling"], [], limit,
+        prices_after, descending=False
+    )
+
+    def is_synced_price(price):
+        return price.selling and (not pos_context.price_lists or price.price_list in pos_context.price_lists)
+
+    deleted, deleted_more = get_keyset_rows(
+        "Deleted Document", ["deleted_doctype", "deleted_name"],
+        [["deleted_doctype", "in", ["Item", "Item Price"]]], limit, deleted_after,
+        sort_field="creation", descending=False
+    )
+
+    lag_key = get_sync_lag_key()
+
+    def last_key(rows, sort_field, after, has_more):
+        key = [rows[-1][sort_field], rows[-1]["name"]] if rows else after
+        if has_more or not key:
+            return key
+        # Caught up: re-read the lag window next time. Never while paging, or a window
+        # holding more than `limit` rows would be returned over and over.
+        return min(key, lag_key, key=lambda k: (str(k[0]), k[1]))
+
+    new_watermark = encode_cursor([
+        last_key(items, "modified", items_after, items_more),
+        last_key(bins, "modified", bins_after, bins_more),
+        last_key(prices, "modified", prices_after, prices_more),
+        last_key(deleted, "creation", deleted_after, deleted_more),
+    ])
+
+    removed_items = [item.item_code for item in items if item.disabled]
+    removed_items.extend(row.deleted_name for row in deleted if row.deleted_doctype == "Item")
+
+    removed_prices = [row.deleted_name for row in deleted if row.deleted_doctype == "Item Price"]
+    if not initial_sync:
+        removed_prices.extend(price.name for price in prices if not is_synced_price(price))
+
+    return {
+        "items": [strip_sync_keys(item, ("modified", "name", "disabled")) for item in items if not item.disabled],
+        "removed_items": removed_items,
+        "bins": [strip_sync_keys(bin, ("modified", "name")) for bin in bins],
+        "prices": [strip_sync_keys(price, ("modified", "selling")) for price in prices if is_synced_price(price)],
+        "removed_prices": removed_prices,
+        "watermark": new_watermark,
+        "has_more": items_more or bins_more or prices_more or deleted_more,
+    }
+
+
+def get_sync_lag_key():
+    """Keyset key just before every row modified in the last SYNC_LAG_SECONDS."""
+    return [str(frappe.utils.add_to_date(frappe.utils.now_datetime(), seconds=-SYNC_LAG_SECONDS)), ""]
+
+
+def strip_sync_keys(row, keys):
+    for key in keys:
+        row.pop(key, None)
+    return row
@@ -1,6 +1,8 @@
 import frappe
 from frappe.utils import nowdate
 
+from gormsolutions_mobile_app.custom_api.pos_context import get_pos_context
+
 @frappe.whitelist()
 def create_material_request(material_request_type="Material Transfer", items=None):
     """
@@ -27,21 +29,10 @@ def create_material_request(material_request_type="Material Transfer", items=Non
         if not items or not isinstance(items, list):
             frappe.throw("Items must be a list of dictionaries.")
 
-        current_user = frappe.session.user    
-
-        # Fetch default warehouse from User Permissions
-        default_warehouse = frappe.db.get_value(
-            "User Permission",
-            {"user": current_user, "allow": "Warehouse"},
-            "for_value"
-        )
-
-        # Fetch default cost center from User Permissions
-        default_cost_center = frappe.db.get_value(
-            "User Permission",
-            {"user": current_user, "allow": "Cost Center"},
-            "for_value"
-        )
+        # Fetch default warehouse and cost center from User Permissions
+        pos_context = get_pos_context()
+        default_warehouse = pos_context.warehouses[0] if pos_context.warehouses else None
+        default_cost_center = pos_context.cost_centers[0] if pos_context.cost_centers else None
 
         if not default_warehouse:
             frappe.throw("Default warehouse not found. Please set it in User Permissions.")
@@ -99,12 +90,15 @@ def create_material_request(material_request_type="Material Transfer", items=Non
 
 import frappe
 
+from gormsolutions_mobile_app.custom_api.response_format import format_response
+
 @frappe.whitelist()
-def fetch_material_requests(user=None):
+def fetch_material_requests(user=None, format=None):
     """
     Fetch all Material Requests along with their item details.
     If 'user' is provided, fetch requests created by that user.
     If not, fetch all Material Requests.
+    Pass format=columnar for the compact response (see response_format.format_response).
     """
     try:
         # Set filters based on the user parameter
@@ -128,7 +122,7 @@ def fetch_material_requests(user=None):
             )
             request['items'] = items  # Attach items to the Material Request
 
-        return material_requests
+        return format_response(material_requests, format)
 
     except Exception as e:
         frappe.log_error(message=frappe.get_traceback(), title="Error Fetching Material Requests with Items")
@@ -0,0 +1,221 @@
+import math
+import time
+
+import frappe
+from werkzeug.wrappers import Response
+
+METRICS_KEY = "gormsolutions_api_metrics"
+METRICS_SAMPLE_SIZE = 1000
+METRICS_QUANTILES = (0.5, 0.95, 0.99)
+METHOD_PATH_PREFIXES = ("/api/method/", "/api/v2/method/")
+APP_METHOD_PREFIX = "gormsolutions_mobile_app."
+
+# (hash suffix, Prometheus name, help text) of the per-method counters
+METRIC_COUNTERS = (
+    ("seconds", "pos_api_request_seconds_sum", "Total wall time of the method in seconds."),
+    ("queries", "pos_api_sql_queries_total", "SQL queries run by the method."),
+    ("rows", "pos_api_sql_rows_total", "Rows returned by the SQL queries of the method."),
+    ("bytes", "pos_api_response_bytes_total", "Response bytes sent by the method."),
+)
+
+
+def is_enabled():
+    """Instrumentation is opt-in: set `pos_api_metrics: 1` in site config."""
+    return bool(frappe.conf.get("pos_api_metrics"))
+
+
+def before_request():
+    """
+    before_request hook: start measuring calls to this app's whitelisted methods.
+
+    SQL queries are counted by wrapping `sql` on the request's database connection object,
+    which is discarded at the end of the request.
+    """
+    if not is_enabled():
+        return
+
+    method = get_request_method()
+    if not method or not is_whitelisted(method):
+        return
+
+    metrics = frappe.local.pos_api_metrics = frappe._dict(method=method, queries=0, rows=0, started=time.perf_counter())
+
+    db = frappe.db
+    sql = db.sql
+
+    def counted_sql(*args, **kwargs):
+        result = sql(*args, **kwargs)
+        metrics.queries += 1
+        if isinstance(result, (list, tuple)):
+            metrics.rows += len(result)
+        return result
+
+    db.sql = counted_sql
+    metrics.restore = lambda: db.__dict__.pop("sql", None)
+
+
+def after_request(response=None, request=None):
+    """after_request hook: store the measurements of the call in Redis."""
+    metrics = getattr(frappe.local, "pos_api_metrics", None)
+    if not metrics:
+        return
+
+    frappe.local.pos_api_metrics = None
+    metrics.restore()
+    elapsed = time.perf_counter() - metrics.started
+
+    # Failed calls (permission errors, validation errors, crashes) are not part of the latency profile
+    if response is None or response.status_code >= 400:
+        return
+
+    response_bytes = response.content_length or (0 if response.is_streamed else len(response.get_data()))
+
+    try:
+        record_call(metrics.method, elapsed, metrics.queries, metrics.rows, response_bytes)
+    except Exception:
+        # Metrics must never fail a request
+        pass
+
+
+def get_request_method():
+    request = getattr(frappe.local, "request", None)
+    path = request.path if request else ""
+    for prefix in METHOD_PATH_PREFIXES:
+        if path.startswith(prefix):
+            method = path[len(prefix):]
+            return method if method.startswith(APP_METHOD_PREFIX) else None
+    return None
+
+
+def is_whitelisted(method):
+    """
+    Only methods that resolve to a whitelisted function are recorded: the method name becomes a
+    Redis key, so arbitrary paths must not create entries.
+    """
+    try:
+        return frappe.get_attr(method) in frappe.whitelisted
+    except Exception:
+        return False
+
+
+def record_call(method, elapsed, queries, rows, response_bytes):
+    cache = frappe.cache()
+    samples_key = cache.make_key(f"{METRICS_KEY}|samples|{method}")
+
+    pipe = cache.pipeline(transaction=False)
+    pipe.hincrby(cache.make_key(f"{METRICS_KEY}|requests"), method, 1)
+    pipe.hincrbyfloat(cache.make_key(f"{METRICS_KEY}|seconds"), method, elapsed)
+    pipe.hincrby(cache.make_key(f"{METRICS_KEY}|queries"), method, queries)
+    pipe.hincrby(cache.make_key(f"{METRICS_KEY}|rows"), method, rows)
+    pipe.hincrby(cache.make_key(f"{METRICS_KEY}|bytes"), method, response_bytes)
+    # Rolling window of the latest calls, for the percentiles
+    pipe.lpush(samples_key, f"{elapsed:.6f},{queries},{rows},{response_bytes}")
+    pipe.ltrim(samples_key, 0, METRICS_SAMPLE_SIZE - 1)
+    pipe.execute()
+
+
+def get_counters():
+    cache = frappe.cache()
+    pipe = cache.pipeline(transaction=False)
+    pipe.hgetall(cache.make_key(f"{METRICS_KEY}|requests"))
+    for suffix, name, help_text in METRIC_COUNTERS:
+        pipe.hgetall(cache.make_key(f"{METRICS_KEY}|{suffix}"))
+    requests, *values = pipe.execute()
+
+    counters = {}
+    for method, count in requests.items():
+        method = frappe.safe_decode(method)
+        counters[method] = {"requests": int(count)}
+    for (suffix, name, help_text), value in zip(METRIC_COUNTERS, values):
+        for method, amount in value.items():
+            counters.setdefault(frappe.safe_decode(method), {"requests": 0})[suffix] = float(amount)
+
+    return counters
+
+
+def get_samples(methods):
+    cache = frappe.cache()
+    pipe = cache.pipeline(transaction=False)
+    for method in methods:
+        pipe.lrange(cache.make_key(f"{METRICS_KEY}|samples|{method}"), 0, -1)
+
+    samples = {}
+    for method, rows in zip(methods, pipe.execute()):
+        samples[method] = [
+            [float(value) for value in frappe.safe_decode(row).split(",")]
+            for row in rows
+        ]
+    return samples
+
+
+def percentile(values, quantile):
+    """Nearest-rank percentile of already sorted `values`."""
+    if not values:
+        return 0
+    return values[max(0, math.ceil(quantile * len(values)) - 1)]
+
+
+@frappe.whitelist()
+def get_api_metrics():
+    """
+    Per-method table of the rolling window: calls, p50/p95/p99 wall time (ms), and p50/p95/p99
+    of SQL queries, rows and response bytes, plus the lifetime counters.
+    """
+    frappe.only_for("System Manager")
+
+    counters = get_counters()
+    samples = get_samples(list(counters))
+
+    table = []
+    for method, totals in sorted(counters.items()):
+        columns = list(zip(*samples.get(method) or [])) or [(), (), (), ()]
+        row = {"method": method, "window": len(samples.get(method) or []), **totals}
+        for name, values, scale in zip(("ms", "queries", "rows", "bytes"), columns, (1000, 1, 1, 1)):
+            values = sorted(values)
+            for quantile in METRICS_QUANTILES:
+                row[f"{name}_p{int(quantile * 100)}"] = round(percentile(values, quantile) * scale, 3)
+        table.append(row)
+
+    return table
+
+
+@frappe.whitelist()
+def prometheus_metrics():
+    """
+    Prometheus text exposition of the counters and wall-time quantiles.
+
+    Needs the System Manager role; scrape with the API key and secret of such a user
+    (`authorization: {type: token, credentials: "<key>:<secret>"}` in the scrape config).
+    """
+    frappe.only_for("System Manager")
+
+    counters = get_counters()
+    samples = get_samples(list(counters))
+
+    def label(method):
+        return method.replace("\\", "\\\\").replace('"', '\\"')
+
+    lines = [
+        "# HELP pos_api_request_seconds Wall time of whitelisted methods (rolling window quantiles).",
+        "# TYPE pos_api_request_seconds summary",
+    ]
+    for method, totals in sorted(counters.items()):
+        durations = sorted(sample[0] for sample in samples.get(method) or [])
+        for quantile in METRICS_QUANTILES:
+            lines.append(f'pos_api_request_seconds{{method="{label(method)}",quantile="{quantile}"}} {percentile(durations, quantile):.6f}')
+        lines.append(f'pos_api_request_seconds_sum{{method="{label(method)}"}} {totals.get("seconds", 0):.6f}')
+        lines.append(f'pos_api_request_seconds_count{{method="{label(method)}"}} {totals["requests"]}')
+
+    for suffix, name, help_text in METRIC_COUNTERS[1:]:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for method, totals in sorted(counters.items()):
+            lines.append(f'{name}{{method="{label(method)}"}} {int(totals.get(suffix, 0))}')
+
+    return Response("\n".join(lines) + "\n", content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@frappe.whitelist()
+def reset_api_metrics():
+    frappe.only_for("System Manager")
+    frappe.cache().delete_keys(METRICS_KEY)
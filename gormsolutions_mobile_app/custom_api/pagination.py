@@ -0,0 +1,99 @@
+import base64
+import json
+
+import frappe
+from frappe import _
+
+
+def encode_cursor(values):
+    """Encode the sort-key values of the last row of a page as an opaque, URL-safe cursor."""
+    payload = json.dumps(values, default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by `encode_cursor`. Returns None for an empty cursor (first page)."""
+    if not cursor:
+        return None
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        frappe.throw(_("Invalid pagination cursor."))
+
+    if not isinstance(values, list):
+        frappe.throw(_("Invalid pagination cursor."))
+
+    return values
+
+
+def is_cursor_mode(cursor):
+    """
+    Cursor pagination is opt-in: clients request it by sending a `cursor` argument,
+    which is empty for the first page and the returned `next_cursor` afterwards.
+    Old app builds keep sending `offset` and get the plain list back.
+    """
+    return cursor is not None
+
+
+def get_keyset_rows(doctype, fields, filters, limit, after=None, sort_field="modified", descending=True,
+        get_list=frappe.get_all):
+    """
+    Fetch up to `limit` rows of `doctype` ordered by (`sort_field`, name), starting strictly after
+    the `after` = [sort_value, name] key instead of skipping rows with an offset.
+
+    Returns:
+        tuple: (rows, has_more). Each row keeps `sort_field` and `name` so the caller can build the next key.
+    """
+    filters = list(filters or [])
+    or_filters = None
+
+    if after:
+        if len(after) != 2:
+            frappe.throw(_("Invalid pagination cursor."))
+        sort_value, name = after
+        # Row-value comparison on (sort_field, name), written so the sort_field index can be used
+        operator = "<" if descending else ">"
+        filters.append([sort_field, operator + "=", sort_value])
+        or_filters = [[sort_field, operator, sort_value], ["name", operator, name]]
+
+    query_fields = list(fields)
+    query_fields.extend(field for field in (sort_field, "name") if field not in query_fields)
+
+    direction = "desc" if descending else "asc"
+    rows = get_list(
+        doctype,
+        fields=query_fields,
+        filters=filters,
+        or_filters=or_filters,
+        order_by=f"{sort_field} {direction}, name {direction}",
+        page_length=limit + 1,
+    )
+
+    has_more = len(rows) > limit
+    return rows[:limit], has_more
+
+
+def get_page(doctype, fields, filters, limit, cursor=None, sort_field="modified", get_list=frappe.get_all):
+    """
+    Fetch one page of `doctype` ordered by (`sort_field` desc, name desc), seeking from `cursor`.
+
+    Returns:
+        dict: {"data": [...], "next_cursor": str | None}
+    """
+    limit = frappe.utils.cint(limit) or 20
+    rows, has_more = get_keyset_rows(
+        doctype, fields, filters, limit, decode_cursor(cursor), sort_field=sort_field, get_list=get_list
+    )
+
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_cursor([rows[-1][sort_field], rows[-1]["name"]])
+
+    extra_fields = [field for field in (sort_field, "name") if field not in fields]
+    for row in rows:
+        for field in extra_fields:
+            row.pop(field, None)
+
+    return {"data": rows, "next_cursor": next_cursor}
@@ -1,7 +1,11 @@
 import frappe
 import json
 
+from gormsolutions_mobile_app.custom_api.idempotency import idempotent
+from gormsolutions_mobile_app.custom_api.pos_context import get_pos_context
+
 @frappe.whitelist(allow_guest=True)
+@idempotent
 def create_payment(sales_invoice,mode_of_payment,paid_amount):
     mode_of_pay_doc = frappe.get_doc("Mode of Payment",mode_of_payment)
     sales_invoice_doc = frappe.get_doc("Sales Invoice",sales_invoice)
@@ -41,21 +45,8 @@ def create_payment(sales_invoice,mode_of_payment,paid_amount):
 @frappe.whitelist()
 def mode_of_payment():
     try:
-        # Get the current user
-        current_user = frappe.session.user
-
-        # Fetch User Permission records for 'Mode of Payment' allowed for the current user
-        user_permission_records = frappe.get_all(
-            'User Permission',
-            filters={
-                'user': current_user,
-                'allow': 'Mode of Payment'
-            },
-            fields=['for_value']
-        )
-
-        # Extract allowed Mode of Payment names
-        allowed_mode_names = [record['for_value'] for record in user_permission_records]
+        # Allowed Mode of Payment names for the current user
+        allowed_mode_names = get_pos_context().modes_of_payment
 
         # Define filters to fetch enabled 'Mode of Payment'
         filters = {'enabled': 1}
@@ -76,19 +67,14 @@ def mode_of_payment():
         return {"error": str(e)}
 
 @frappe.whitelist(allow_guest=True)
+@idempotent
 def receive_payment(party=None, mode_of_payment=None, paid_amount=0, posting_date=None, reference_no=None, reference_date=None):
     if not party or not mode_of_payment or not paid_amount or not posting_date:
         return {"error": "Party, mode of payment, paid amount, and posting date are required."}
     
     try:
         # Fetch allowed Cost Centers for the current user
-        current_user = frappe.session.user
-        cost_center_permitted = frappe.get_all(
-            "User Permission",
-            filters={"user": current_user, "allow": "Cost Center"},
-            fields=["for_value"]
-        )
-        default_cost_centers = [perm["for_value"] for perm in cost_center_permitted]
+        default_cost_centers = get_pos_context().cost_centers
         
         if not default_cost_centers:
             return {"error": "No permitted cost centers found for the current user."}
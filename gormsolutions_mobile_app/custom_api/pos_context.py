@@ -0,0 +1,96 @@
+import frappe
+
+POS_CONTEXT_CACHE_KEY = "gormsolutions_pos_context"
+
+
+def get_pos_context(user=None):
+    """
+    Return the resolved POS context of `user` (default: session user), cached in Redis.
+
+    The context is built from the user's `User Permission` records and default POS Profile:
+
+        warehouses              all permitted warehouses
+        default_warehouse       first warehouse marked "Is Default"
+        empties_store           first warehouse not marked "Is Default"
+        cost_centers            permitted cost centers
+        price_lists             permitted price lists (`price_list` is the first one)
+        modes_of_payment        permitted modes of payment
+        item_groups             permitted item groups
+        item_groups_with_children
+                                permitted item groups plus their direct children
+        pos_profile             default POS Profile of the user
+        pos_warehouse           warehouse of that POS Profile
+
+    It is invalidated by `clear_pos_context` / `clear_all_pos_contexts` (see hooks.doc_events).
+    """
+    user = user or frappe.session.user
+    return frappe.cache().hget(POS_CONTEXT_CACHE_KEY, user, generator=lambda: load_pos_context(user))
+
+
+def load_pos_context(user):
+    """Build the POS context of `user` from the database (one User Permission query)."""
+    permissions = frappe.get_all(
+        "User Permission",
+        filters={"user": user},
+        fields=["allow", "for_value", "is_default"]
+    )
+
+    allowed = {}
+    for perm in permissions:
+        allowed.setdefault(perm.allow, []).append(perm)
+
+    def values(allow, is_default=None):
+        return [
+            perm.for_value
+            for perm in allowed.get(allow, [])
+            if is_default is None or bool(perm.is_default) == is_default
+        ]
+
+    def first(items):
+        return items[0] if items else None
+
+    item_groups = values("Item Group")
+    item_groups_with_children = item_groups[:]
+    if item_groups:
+        item_groups_with_children.extend(frappe.get_all(
+            "Item Group",
+            filters={"parent_item_group": ["in", item_groups]},
+            pluck="name"
+        ))
+
+    pos_profile = frappe.db.sql("""
+        SELECT pp.name, pp.warehouse
+        FROM `tabPOS Profile User` ppu
+        JOIN `tabPOS Profile` pp ON pp.name = ppu.parent
+        WHERE ppu.user = %s AND ppu.`default` = 1
+        LIMIT 1
+    """, (user,), as_dict=True)
+    pos_profile = pos_profile[0] if pos_profile else frappe._dict()
+
+    price_lists = values("Price List")
+
+    return frappe._dict({
+        "user": user,
+        "warehouses": values("Warehouse"),
+        "default_warehouse": first(values("Warehouse", is_default=True)),
+        "empties_store": first(values("Warehouse", is_default=False)),
+        "cost_centers": values("Cost Center"),
+        "price_lists": price_lists,
+        "price_list": first(price_lists),
+        "modes_of_payment": values("Mode of Payment"),
+        "item_groups": item_groups,
+        "item_groups_with_children": item_groups_with_children,
+        "pos_profile": pos_profile.get("name"),
+        "pos_warehouse": pos_profile.get("warehouse"),
+    })
+
+
+def clear_pos_context(doc, method=None):
+    """doc_events handler for User Permission: drop the cached context of the affected user."""
+    if doc.get("user"):
+        frappe.cache().hdel(POS_CONTEXT_CACHE_KEY, doc.user)
+
+
+def clear_all_pos_contexts(doc=None, method=None):
+    """doc_events handler for POS Profile and Item Group: these can affect every user's context."""
+    frappe.cache().delete_key(POS_CONTEXT_CACHE_KEY)
@@ -1,7 +1,138 @@
 import frappe
+from frappe import _
+from frappe.utils import cint, fmt_money
+from werkzeug.wrappers import Response
+
+POS_INVOICE_TEMPLATE = "gormsolutions_mobile_app/templates/print_format/pos_invoice.html"
+PRINT_CACHE_KEY = "gormsolutions_invoice_print"
+PRINT_CACHE_TTL = 24 * 60 * 60
+
+# Characters per line of Font A on common thermal paper widths (mm)
+RECEIPT_LINE_WIDTHS = {58: 32, 80: 48}
+DEFAULT_RECEIPT_WIDTH = 80
+
+ESC_INIT = b"\x1b@"
+ESC_ALIGN_LEFT = b"\x1ba\x00"
+ESC_ALIGN_CENTER = b"\x1ba\x01"
+ESC_BOLD_ON = b"\x1bE\x01"
+ESC_BOLD_OFF = b"\x1bE\x00"
+ESC_FEED_AND_CUT = b"\x1bd\x04\x1dV\x01"
+
+# Compiled template code, kept per worker: {(site, path): code}
+compiled_templates = {}
+
 
 @frappe.whitelist(allow_guest=True)
-def print_invoice(invoice_id):
-    res_doc = frappe.get_doc("Sales Invoice",invoice_id)
-    print_format = frappe.render_template("gormsolutions_mobile_app/templates/print_format/pos_invoice.html",{'doc':res_doc},is_path = True)
-    return print_format
\ No newline at end of file
+def print_invoice(invoice_id, format=None, width=None):
+    """
+    Render a Sales Invoice receipt.
+
+    Args:
+        invoice_id (str): Sales Invoice name.
+        format (str, optional): "html" (default, the styled print format), "text" (plain-text
+            receipt) or "escpos" (raw ESC/POS bytes for thermal printers).
+        width (int, optional): Paper width in mm for text/escpos, 58 or 80 (default 80).
+
+    Renders are cached by invoice name and `modified`, so a reprint of an unchanged invoice
+    does not load the document again.
+    """
+    format = format or "html"
+    if format not in ("html", "text", "escpos"):
+        frappe.throw(_("Unsupported print format: {0}").format(format))
+
+    width = cint(width) or DEFAULT_RECEIPT_WIDTH
+    if width not in RECEIPT_LINE_WIDTHS:
+        frappe.throw(_("Paper width must be one of: {0}").format(", ".join(map(str, RECEIPT_LINE_WIDTHS))))
+
+    modified = frappe.db.get_value("Sales Invoice", invoice_id, "modified")
+    if not modified:
+        frappe.throw(_("{0} {1} not found").format(_("Sales Invoice"), invoice_id), frappe.DoesNotExistError)
+
+    cache_key = f"{PRINT_CACHE_KEY}|{format}|{width}|{frappe.local.lang}|{invoice_id}|{modified}"
+    output = frappe.cache().get_value(cache_key)
+    if output is None:
+        output = render_invoice(frappe.get_doc("Sales Invoice", invoice_id), format, width)
+        frappe.cache().set_value(cache_key, output, expires_in_sec=PRINT_CACHE_TTL)
+
+    if format == "escpos":
+        return Response(output, mimetype="application/octet-stream")
+    return output
+
+
+def render_invoice(res_doc, format, width):
+    if format == "html":
+        return get_compiled_template(POS_INVOICE_TEMPLATE).render({'doc': res_doc})
+
+    lines = get_receipt_lines(res_doc, RECEIPT_LINE_WIDTHS[width])
+    if format == "text":
+        return "\n".join(text.center(RECEIPT_LINE_WIDTHS[width]).rstrip() if center else text for text, center, bold in lines)
+
+    return render_escpos(lines)
+
+
+def get_compiled_template(path):
+    """
+    Template for `path`, bound to this request's Jinja environment.
+
+    Frappe builds a new environment with per-request, per-site globals for every request, so only
+    the compiled code is kept across requests and a Template is made from it each time.
+    """
+    jenv = frappe.get_jenv()
+    cache_key = (frappe.local.site, path)
+    code = compiled_templates.get(cache_key)
+    if code is None:
+        source, filename, uptodate = jenv.loader.get_source(jenv, path)
+        code = compiled_templates[cache_key] = jenv.compile(source, path, filename)
+    return jenv.template_class.from_code(jenv, code, jenv.make_globals(None))
+
+
+def get_receipt_lines(res_doc, line_width):
+    """
+    Receipt content as (text, centered, bold) tuples of at most `line_width` characters,
+    following the layout of the pos_invoice print format.
+    """
+    separator = ("-" * line_width, False, False)
+
+    def amount_line(label, value):
+        value = fmt_money(value, precision=2)
+        return (label[:line_width - len(value) - 1].ljust(line_width - len(value)) + value, False, False)
+
+    lines = [
+        (_("Sales Invoice"), True, True),
+        ((res_doc.company or "")[:line_width], True, False),
+        separator,
+        (f"{_('Invoice No')}: {res_doc.name}"[:line_width], False, False),
+        (f"{_('Date')}: {res_doc.get_formatted('posting_date')}"[:line_width], False, False),
+        (f"{_('Customer')}: {res_doc.customer_name}"[:line_width], False, False),
+        separator,
+    ]
+
+    for item in res_doc.items:
+        lines.append(((item.item_name or item.item_code)[:line_width], False, False))
+        lines.append(amount_line(f"  {frappe.utils.flt(item.qty, 3):g} x {fmt_money(item.rate, precision=2)}", item.amount))
+
+    lines.append(separator)
+    if res_doc.discount_amount:
+        lines.append(amount_line(_("Discount"), res_doc.discount_amount))
+    lines.append(amount_line(_("Grand Total"), res_doc.grand_total))
+    lines.append(amount_line(_("Paid Amount"), res_doc.grand_total - res_doc.outstanding_amount))
+    if res_doc.outstanding_amount:
+        lines.append(amount_line(_("Outstanding Amount"), res_doc.outstanding_amount))
+    lines.append(separator)
+
+    if res_doc.terms:
+        lines.extend((line[:line_width], False, False) for line in frappe.utils.strip_html(res_doc.terms).splitlines() if line.strip())
+    lines.append((_("Thank you, please visit again."), True, False))
+
+    return lines
+
+
+def render_escpos(lines):
+    output = bytearray(ESC_INIT)
+    for text, center, bold in lines:
+        output += ESC_ALIGN_CENTER if center else ESC_ALIGN_LEFT
+        output += ESC_BOLD_ON if bold else ESC_BOLD_OFF
+        # Code page 437 is the power-on default of most thermal printers
+        output += text.encode("cp437", errors="replace") + b"\n"
+    output += ESC_BOLD_OFF + ESC_ALIGN_LEFT + ESC_FEED_AND_CUT
+    return bytes(output)
@@ -1,18 +1,17 @@
 import frappe
+
+from gormsolutions_mobile_app.custom_api.idempotency import idempotent
+from gormsolutions_mobile_app.custom_api.pos_context import get_pos_context
+
 @frappe.whitelist(allow_guest=True)
+@idempotent
 def receive_payment_and_create_invoice(party=None, mode_of_payment=None, paid_amount=0, posting_date=None, invoice_items=None):
     if not party or not posting_date or not invoice_items:
         return {"error": "Party, posting date, and invoice items are required."}
     
     try:
         # Fetch allowed Cost Centers for the current user
-        current_user = frappe.session.user
-        cost_center_permitted = frappe.get_all(
-            "User Permission",
-            filters={"user": current_user, "allow": "Cost Center"},
-            fields=["for_value"]
-        )
-        default_cost_centers = [perm["for_value"] for perm in cost_center_permitted]
+        default_cost_centers = get_pos_context().cost_centers
         
         if not default_cost_centers:
             return {"error": "No permitted cost centers found for the current user."}
@@ -0,0 +1,104 @@
+import gzip
+
+import frappe
+from werkzeug.wrappers import Response
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+COLUMNAR = "columnar"
+MSGPACK_MIMETYPE = "application/msgpack"
+GZIP_MIN_BYTES = 8 * 1024
+
+
+def to_columnar(rows):
+    """
+    Turn a list of dicts into {"columns": [...], "rows": [[...], ...]} so key names are sent once.
+    Anything that is not a list of dicts is returned unchanged.
+    """
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        return rows
+
+    columns = []
+    for row in rows:
+        columns.extend(key for key in row if key not in columns)
+
+    return {"columns": columns, "rows": [[row.get(column) for column in columns] for row in rows]}
+
+
+def format_response(data, format=None, headers=None):
+    """
+    Apply the response `format` requested by a bulk endpoint.
+
+    Without a format the data is returned as-is (plain JSON list of dicts, as before), unless
+    extra `headers` have to be sent. With format=columnar every list of dicts (top-level, or a
+    value of a top-level dict) is converted with `to_columnar` and sent through `build_response`.
+    """
+    if format != COLUMNAR:
+        return build_response(data, headers=headers) if headers else data
+
+    if isinstance(data, dict):
+        payload = {key: to_columnar(value) for key, value in data.items()}
+    else:
+        payload = to_columnar(data)
+
+    return build_response(payload, headers=headers)
+
+
+def build_response(message, status=200, headers=None):
+    """
+    Build the HTTP response for `message` directly, wrapped in {"message": ...} like a normal
+    whitelisted method response.
+
+    MessagePack is used when the client sends `Accept: application/msgpack` and the msgpack
+    package is installed, JSON otherwise. Bodies above GZIP_MIN_BYTES are gzipped when the
+    client accepts it.
+    """
+    accept = frappe.get_request_header("Accept") or ""
+    if msgpack and MSGPACK_MIMETYPE in accept:
+        body = msgpack.packb({"message": message}, default=str, use_bin_type=True)
+        mimetype = MSGPACK_MIMETYPE
+    else:
+        body = frappe.as_json({"message": message}, indent=None, separators=(",", ":")).encode()
+        mimetype = "application/json"
+
+    response = Response(status=status, mimetype=mimetype)
+    response.headers["Vary"] = "Accept, Accept-Encoding"
+
+    accept_encoding = frappe.get_request_header("Accept-Encoding") or ""
+    if len(body) >= GZIP_MIN_BYTES and "gzip" in accept_encoding:
+        body = gzip.compress(body, compresslevel=5)
+        response.headers["Content-Encoding"] = "gzip"
+
+    response.set_data(body)
+    for key, value in (headers or {}).items():
+        response.headers[key] = value
+
+    return response
+
+
+def not_modified(etag):
+    """Empty 304 response for a client that already holds the resource with this `etag`."""
+    response = Response(status=304)
+    response.headers["ETag"] = etag
+    return response
+
+
+def etag_matches(etag, if_none_match):
+    """
+    Whether an If-None-Match header matches `etag`: "*", or a comma-separated list of entity
+    tags compared without their W/ prefix and quotes (the weak comparison used for If-None-Match).
+    """
+    if not if_none_match:
+        return False
+
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    if "*" in tags:
+        return True
+
+    def opaque(tag):
+        return tag.removeprefix("W/").strip('"')
+
+    return any(opaque(tag) == opaque(etag) for tag in tags if tag)
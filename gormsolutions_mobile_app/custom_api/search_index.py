@@ -0,0 +1,196 @@
+import re
+
+import frappe
+from frappe.utils import cint, cstr, now
+
+SEARCH_TOKEN_DOCTYPE = "POS Search Token"
+SEARCH_CANDIDATE_LIMIT = 1000
+SEARCH_TOKEN_LENGTH = 140
+REBUILD_CHUNK_SIZE = 5000
+
+# Fields indexed per doctype; Item barcodes come from the Item Barcode child table
+SEARCH_FIELDS = {
+    "Item": ["item_code", "item_name"],
+    "Customer": ["name", "customer_name", "mobile_no"],
+}
+
+
+def get_tokens(values):
+    """
+    Search tokens of `values` as {token: position}: every value as a whole (position 0, so an
+    exact code or barcode matches) and each of its words at its word position.
+    """
+    tokens = {}
+    for value in values:
+        value = cstr(value).strip().lower()
+        if not value:
+            continue
+
+        tokens[value[:SEARCH_TOKEN_LENGTH]] = 0
+        for position, word in enumerate(re.findall(r"\w+", value)):
+            word = word[:SEARCH_TOKEN_LENGTH]
+            tokens[word] = min(tokens.get(word, position), position)
+
+    return tokens
+
+
+def get_search_values(doc):
+    values = [doc.get(field) for field in SEARCH_FIELDS[doc.doctype]]
+    if doc.doctype == "Item":
+        values.extend(row.barcode for row in doc.get("barcodes") or [])
+    return values
+
+
+def search_names(doctype, text, limit=SEARCH_CANDIDATE_LIMIT, start=0):
+    """
+    Names of `doctype` records where every word of `text` is the prefix of an indexed word,
+    best matches first: records whose code, name or number starts with the first word come
+    before those where it matches a later word.
+
+    Returns:
+        list: up to `limit` names, ranked, skipping the first `start`.
+    """
+    words = re.findall(r"\w+", cstr(text).lower())
+    if not words:
+        return []
+
+    params = {"doctype": doctype, "limit": cint(limit), "start": cint(start)}
+    conditions = []
+    for i, word in enumerate(words):
+        # \w includes "_", the LIKE single-character wildcard
+        params[f"word_{i}"] = word.replace("_", "\\_")[:SEARCH_TOKEN_LENGTH] + "%"
+        conditions.append(f"token LIKE %(word_{i})s")
+
+    return frappe.db.sql_list(f"""
+        SELECT reference_name
+        FROM `tabPOS Search Token`
+        WHERE reference_doctype = %(doctype)s
+            AND ({" OR ".join(conditions)})
+        GROUP BY reference_name
+        HAVING {" AND ".join(f"SUM({condition}) > 0" for condition in conditions)}
+        ORDER BY MIN(CASE WHEN {conditions[0]} THEN position END), reference_name
+        LIMIT %(start)s, %(limit)s
+    """, params)
+
+
+def sort_by_rank(rows, names, key):
+    """Order `rows` like `names`, the ranked result of search_names."""
+    rank = {name: i for i, name in enumerate(names)}
+    return sorted(rows, key=lambda row: rank.get(row[key], len(rank)))
+
+
+def get_ranked_page(doctype, text, key, offset, limit, get_rows):
+    """
+    Rows `offset` to `offset + limit` of a search, best matches first.
+
+    Args:
+        get_rows (callable): get_rows(names) -> the rows of `names` that pass the endpoint's own
+            filters. Candidates are fetched SEARCH_CANDIDATE_LIMIT at a time until the page is
+            full, so paging is not cut off at the candidate limit.
+    """
+    offset, limit = cint(offset), cint(limit)
+    rows = []
+    start = 0
+    while len(rows) < offset + limit:
+        names = search_names(doctype, text, start=start)
+        if not names:
+            break
+
+        rows.extend(sort_by_rank(get_rows(names), names, key))
+        if len(names) < SEARCH_CANDIDATE_LIMIT:
+            break
+        start += len(names)
+
+    return rows[offset:offset + limit]
+
+
+def update_search_tokens(doc, method=None):
+    """
+    doc_events handler for Item and Customer (on_update): re-index the document when an indexed
+    field or, for an Item, its barcodes changed. Price, stock and flag edits save Items often.
+    """
+    if doc.get_doc_before_save() and not has_search_values_changed(doc):
+        return
+    index_search_tokens(doc)
+
+
+def has_search_values_changed(doc):
+    if any(doc.has_value_changed(field) for field in SEARCH_FIELDS[doc.doctype]):
+        return True
+    if doc.doctype == "Item":
+        before = doc.get_doc_before_save()
+        return [row.barcode for row in before.get("barcodes") or []] != [row.barcode for row in doc.get("barcodes") or []]
+    return False
+
+
+def index_search_tokens(doc):
+    delete_search_tokens(doc)
+    insert_search_tokens(doc.doctype, [(doc.name, get_tokens(get_search_values(doc)))])
+
+
+def delete_search_tokens(doc, method=None):
+    """doc_events handler for Item and Customer (on_trash)."""
+    frappe.db.delete(SEARCH_TOKEN_DOCTYPE, {"reference_doctype": doc.doctype, "reference_name": doc.name})
+
+
+def rename_search_tokens(doc, method=None, old=None, new=None, merge=False):
+    """doc_events handler for Item and Customer (after_rename): drop the tokens of the old name."""
+    frappe.db.delete(SEARCH_TOKEN_DOCTYPE, {"reference_doctype": doc.doctype, "reference_name": old})
+    index_search_tokens(doc)
+
+
+def insert_search_tokens(doctype, documents):
+    """Insert the tokens of `documents`, a list of (name, {token: position})."""
+    timestamp = now()
+    user = frappe.session.user
+    frappe.db.bulk_insert(
+        SEARCH_TOKEN_DOCTYPE,
+        ["name", "reference_doctype", "reference_name", "token", "position",
+            "creation", "modified", "owner", "modified_by", "docstatus"],
+        [
+            (frappe.generate_hash(length=12), doctype, name, token, position, timestamp, timestamp, user, user, 0)
+            for name, tokens in documents
+            for token, position in tokens.items()
+        ]
+    )
+
+
+def rebuild_search_index(doctypes=None):
+    """
+    Rebuild the search tokens of `doctypes` (default: all indexed doctypes) in chunks.
+
+    Returns:
+        dict: doctype -> number of documents indexed.
+    """
+    counts = {}
+    for doctype in doctypes or SEARCH_FIELDS:
+        frappe.db.delete(SEARCH_TOKEN_DOCTYPE, {"reference_doctype": doctype})
+
+        fields = list(dict.fromkeys(["name"] + SEARCH_FIELDS[doctype]))
+        last_name = None
+        counts[doctype] = 0
+        while True:
+            filters = {"name": [">", last_name]} if last_name else {}
+            rows = frappe.get_all(doctype, filters=filters, fields=fields, order_by="name", page_length=REBUILD_CHUNK_SIZE)
+            if not rows:
+                break
+
+            barcodes = {}
+            if doctype == "Item":
+                for barcode in frappe.get_all(
+                    "Item Barcode",
+                    filters={"parent": ["in", [row.name for row in rows]], "parenttype": "Item"},
+                    fields=["parent", "barcode"]
+                ):
+                    barcodes.setdefault(barcode.parent, []).append(barcode.barcode)
+
+            insert_search_tokens(doctype, [
+                (row.name, get_tokens([row.get(field) for field in SEARCH_FIELDS[doctype]] + barcodes.get(row.name, [])))
+                for row in rows
+            ])
+            frappe.db.commit()
+
+            counts[doctype] += len(rows)
+            last_name = rows[-1].name
+
+    return counts
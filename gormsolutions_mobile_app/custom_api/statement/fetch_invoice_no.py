@@ -1,26 +1,70 @@
 # custom_app/api/customer.py
 
+import time
+
 import frappe
+from frappe.utils import cint, now
+
+INVOICE_NO_SYNC_WATERMARK = "gormsolutions_customer_invoice_no_watermark"
+INVOICE_NO_SYNC_CHUNK_SIZE = 1000
 
 @frappe.whitelist()
-def update_customer_invoices():
-    # Get all Customer documents with a non-empty `credit_sales_id`
-    customers = frappe.get_all('Customer Document', filters={'credit_sales_id': ['!=', '']}, fields=['name', 'credit_sales_id'])
-    updated_customers = []
-    
-    for customer in customers:
-        # Fetch invoice_no from Credit Sales App based on credit_sales_id
-        credit_sales_records = frappe.get_all('Credit Sales App', filters={'name': customer.credit_sales_id}, fields=['invoice_no'])
-        
-        if credit_sales_records:
-            # Combine all invoice_no values into a single comma-separated string
-            invoice_no_string = ', '.join([record['invoice_no'] for record in credit_sales_records])
-
-            # Update the invoice_no field in Customer document
-            frappe.db.set_value('Customer Document', customer['name'], 'invoice_no', invoice_no_string)
-            updated_customers.append(customer['name'])
-    
-    # Commit changes to save updates to the database
+def update_customer_invoices(full=0, chunk_size=None):
+    """
+    Copy `invoice_no` from the linked Credit Sales App onto each Customer Document.
+
+    Only documents where either side changed since the last completed run are scanned (pass
+    full=1 to scan everything). Rows are updated with one UPDATE ... JOIN per chunk of
+    `chunk_size` documents, committing after each chunk so no long transaction holds locks.
+    """
+    chunk_size = cint(chunk_size) or INVOICE_NO_SYNC_CHUNK_SIZE
+    watermark = None if cint(full) else frappe.db.get_global(INVOICE_NO_SYNC_WATERMARK)
+
+    # Rows modified while this run is in progress are picked up by the next one
+    run_started_at = now()
+    started = time.monotonic()
+
+    scanned = 0
+    updated = 0
+    last_name = None
+    while True:
+        # Get the next chunk of Customer Documents with a linked Credit Sales App
+        names = frappe.db.sql_list(f"""
+            SELECT cd.name
+            FROM `tabCustomer Document` cd
+            JOIN `tabCredit Sales App` csa ON csa.name = cd.credit_sales_id
+            WHERE cd.credit_sales_id != ''
+                {"AND (cd.modified > %(watermark)s OR csa.modified > %(watermark)s)" if watermark else ""}
+                {"AND cd.name > %(last_name)s" if last_name else ""}
+            ORDER BY cd.name
+            LIMIT {chunk_size}
+        """, {"watermark": watermark, "last_name": last_name})
+
+        if not names:
+            break
+
+        # Update the invoice_no field of the whole chunk from Credit Sales App
+        frappe.db.sql("""
+            UPDATE `tabCustomer Document` cd
+            JOIN `tabCredit Sales App` csa ON csa.name = cd.credit_sales_id
+            SET cd.invoice_no = csa.invoice_no
+            WHERE cd.name IN %(names)s
+                AND NOT (cd.invoice_no <=> csa.invoice_no)
+        """, {"names": names})
+        updated += frappe.db.sql("SELECT ROW_COUNT()")[0][0]
+        scanned += len(names)
+
+        # Commit changes per chunk to keep transactions short
+        frappe.db.commit()
+
+        if len(names) < chunk_size:
+            break
+        last_name = names[-1]
+
+    frappe.db.set_global(INVOICE_NO_SYNC_WATERMARK, run_started_at)
     frappe.db.commit()
-    
-    return f"Updated invoice numbers for {len(updated_customers)} customers."
+
+    elapsed = time.monotonic() - started
+    rows_per_sec = scanned / elapsed if elapsed else scanned
+
+    return f"Updated invoice numbers for {updated} customers ({scanned} checked, {rows_per_sec:.0f} rows/sec)."
@@ -1,40 +1,50 @@
 import frappe
+from frappe import _
 
 @frappe.whitelist()
 def fetch_order_numbers(statement_name):
-    # Fetch credit_sales_id from the child table (Statement Details) linked to the Statement
-    statement_details = frappe.get_all(
-        "Invoice Table Statement",  # Assuming this is the child table name
-        filters={"parent": statement_name},  # Filter based on the parent (Statement)
-        fields=["credit_sales_id"]  # Only fetch the credit_sales_id field
-    )
-    
+    # Items table of Credit Sales App, read from its meta
+    items_doctype = frappe.get_meta("Credit Sales App").get_field("items").options
+
+    # Statement lines (Invoice Table Statement) with their Credit Sales App and its items, in one query
+    rows = frappe.db.sql(f"""
+        SELECT
+            its.credit_sales_id,
+            csa.name AS fuel_sales_name,
+            csa.invoice_no,
+            item.name AS item_name,
+            item.order_number
+        FROM
+            `tabInvoice Table Statement` its
+        LEFT JOIN
+            `tabCredit Sales App` csa ON csa.name = its.credit_sales_id
+        LEFT JOIN
+            `tab{items_doctype}` item ON item.parent = csa.name
+                AND item.parenttype = 'Credit Sales App'
+                AND item.parentfield = 'items'
+        WHERE
+            its.parent = %(statement_name)s
+            AND IFNULL(its.credit_sales_id, '') != ''
+        ORDER BY
+            its.idx, item.idx
+    """, {"statement_name": statement_name}, as_dict=True)
+
     # Initialize an empty result list
     result = []
 
-    # Loop through each statement detail (child table record)
-    for detail in statement_details:
-        credit_sales_id = detail.get("credit_sales_id")
-        
-        if credit_sales_id:
-            try:
-                # Fetch the Fuel Sales document where the name matches the credit_sales_id
-                fuel_sales = frappe.get_doc("Credit Sales App", credit_sales_id)
+    for row in rows:
+        if not row.fuel_sales_name:
+            # Handle case where the fuel sales document does not exist
+            frappe.log_error(f"Fuel Sales document {row.credit_sales_id} not found.")
+            continue
 
-                # Loop through the items in the Fuel Sales document
-                for item in fuel_sales.items:
-                    # Append a dictionary with 'order_number', 'fuel_sales_name', and 'invoice_no' keys to the result list
-                    result.append({
-                        "order_number": item.order_number,
-                        "fuel_sales_name": fuel_sales.name,
-                        "invoice_no": fuel_sales.invoice_no
-                    })
-            except frappe.DoesNotExistError:
-                # Handle case where the fuel sales document does not exist
-                frappe.log_error(f"Fuel Sales document {credit_sales_id} not found.")
-            except Exception as e:
-                # Log any other exceptions
-                frappe.log_error(str(e))
+        if row.item_name:
+            # Append a dictionary with 'order_number', 'fuel_sales_name', and 'invoice_no' keys to the result list
+            result.append({
+                "order_number": row.order_number,
+                "fuel_sales_name": row.fuel_sales_name,
+                "invoice_no": row.invoice_no
+            })
 
     # Return the list of dictionaries (with keys 'order_number', 'fuel_sales_name', and 'invoice_no')
     return {
@@ -43,34 +53,39 @@ def fetch_order_numbers(statement_name):
     }
 
 
-
-import frappe
 @frappe.whitelist()
 def fetch_discount(statement_name):
-    # Fetch necessary fields from the child table (Statement Details) linked to the Statement
-    discount_details = frappe.get_all(
-        "Invoice Table Statement",  # Assuming this is the child table name
-        filters={"parent": statement_name},  # Filter based on the parent (Statement)
-        fields=['name', 'invoice_vourcher']
-    )
-    
+    # Statement lines (Invoice Table Statement) joined to their Sales Invoice in one query
+    discount_details = frappe.db.sql("""
+        SELECT
+            its.invoice_vourcher,
+            si.name AS sales_invoice,
+            si.discount_amount
+        FROM
+            `tabInvoice Table Statement` its
+        LEFT JOIN
+            `tabSales Invoice` si ON si.name = its.invoice_vourcher
+        WHERE
+            its.parent = %(statement_name)s
+            AND IFNULL(its.invoice_vourcher, '') != ''
+        ORDER BY
+            its.idx
+    """, {"statement_name": statement_name}, as_dict=True)
+
     # Initialize an empty result list
     invoice_sales = []
 
-    # Loop through each statement detail (child table record)
     for detail in discount_details:
-        sales_invoice_id = detail.get("invoice_vourcher")
-        
-        if sales_invoice_id:
-            # Fetch the Sales Invoice document where the name matches the invoice_vourcher
-            invoice_doc = frappe.get_doc("Sales Invoice", sales_invoice_id)
+        if not detail.sales_invoice:
+            frappe.throw(
+                _("{0} {1} not found").format(_("Sales Invoice"), detail.invoice_vourcher),
+                frappe.DoesNotExistError
+            )
 
-            # Append the necessary invoice information to the result list
-            invoice_sales.append({
-              "additional_discount_amount": invoice_doc.discount_amount
-            })
+        # Append the necessary invoice information to the result list
+        invoice_sales.append({
+          "additional_discount_amount": detail.discount_amount
+        })
 
     # Return the list of invoice sales
     return invoice_sales
-
-
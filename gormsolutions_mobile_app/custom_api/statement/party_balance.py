@@ -0,0 +1,161 @@
+import frappe
+from frappe.utils import flt, get_first_day, getdate, now, today
+
+CHECKPOINT_TABLE = "`tabParty Balance Checkpoint`"
+
+
+def get_party_balance(party_type, party, before_date, exclude_cancelled=False):
+    """
+    GL balance of a party from all entries posted before `before_date`.
+
+    Read as the nearest monthly checkpoint plus the entries posted since. When the checkpoint
+    for the month of `before_date` does not exist yet it is built in the background, so the
+    next request for that month only scans the days since the month start.
+
+    Args:
+        exclude_cancelled (bool): Leave out entries flagged is_cancelled (cancelled originals
+            and their reversals).
+    """
+    # Checkpoints only cover closed-off history: never past the start of the current month
+    target_date = min(get_first_day(before_date), get_first_day(today()))
+
+    checkpoint = frappe.db.sql(f"""
+        SELECT checkpoint_date, balance, uncancelled_balance
+        FROM {CHECKPOINT_TABLE}
+        WHERE party_type = %s AND party = %s AND checkpoint_date <= %s
+        ORDER BY checkpoint_date DESC
+        LIMIT 1
+    """, (party_type, party, target_date), as_dict=True)
+    checkpoint = checkpoint[0] if checkpoint else None
+
+    if not checkpoint or getdate(checkpoint.checkpoint_date) != target_date:
+        frappe.enqueue(
+            "gormsolutions_mobile_app.custom_api.statement.party_balance.create_party_balance_checkpoint",
+            queue="short",
+            party_type=party_type,
+            party=party,
+            checkpoint_date=target_date,
+            # Every statement request for the party misses until the job runs; queue it once
+            job_id=f"party_balance_checkpoint::{party_type}::{party}::{target_date}",
+            deduplicate=True
+        )
+
+    balance, uncancelled_balance = get_gl_balance_between(
+        party_type, party, checkpoint.checkpoint_date if checkpoint else None, before_date
+    )
+    if checkpoint:
+        balance += flt(checkpoint.balance)
+        uncancelled_balance += flt(checkpoint.uncancelled_balance)
+
+    return uncancelled_balance if exclude_cancelled else balance
+
+
+def get_gl_balance_between(party_type, party, from_date, to_date):
+    """
+    Returns:
+        tuple: (balance, balance excluding cancelled entries) of the submitted GL Entries of the
+        party posted on or after `from_date` (from the beginning when None) and before `to_date`.
+    """
+    balance = frappe.db.sql(f"""
+        SELECT
+            SUM(gle.debit - gle.credit) AS balance,
+            SUM(CASE WHEN gle.is_cancelled = 0 THEN gle.debit - gle.credit ELSE 0 END) AS uncancelled_balance
+        FROM
+            `tabGL Entry` gle
+        WHERE
+            gle.party_type = %(party_type)s
+            AND gle.party = %(party)s
+            AND gle.posting_date < %(to_date)s
+            {"AND gle.posting_date >= %(from_date)s" if from_date else ""}
+            AND gle.docstatus = 1
+    """, {"party_type": party_type, "party": party, "from_date": from_date, "to_date": to_date}, as_dict=True)
+
+    if not balance:
+        return 0.0, 0.0
+    return flt(balance[0].balance), flt(balance[0].uncancelled_balance)
+
+
+def get_gl_fingerprint(party_type, party, before_date, lock=False):
+    """
+    (count, latest modified) of the party's GL Entries posted before `before_date`. It changes
+    when an entry is added, or flagged is_cancelled, in that range.
+
+    With `lock`, the read is a locking read: it sees the latest committed rows instead of the
+    transaction's snapshot, and waits for uncommitted entries of the party.
+    """
+    return tuple(frappe.db.sql(f"""
+        SELECT COUNT(*), MAX(modified)
+        FROM `tabGL Entry`
+        WHERE party_type = %s AND party = %s AND posting_date < %s
+        {"LOCK IN SHARE MODE" if lock else ""}
+    """, (party_type, party, str(getdate(before_date))))[0])
+
+
+def create_party_balance_checkpoint(party_type, party, checkpoint_date):
+    """
+    Background job: store the balance of the party before `checkpoint_date`, building on the previous checkpoint.
+
+    A back-dated GL Entry committed after this job has read the balance would leave the
+    checkpoint stale, and its clear_party_balance_checkpoints has already run. So the GL
+    fingerprint is read again with a locking read after the upsert, and the write is rolled
+    back if it changed.
+    """
+    fingerprint = get_gl_fingerprint(party_type, party, checkpoint_date)
+
+    previous = frappe.db.sql(f"""
+        SELECT checkpoint_date, balance, uncancelled_balance
+        FROM {CHECKPOINT_TABLE}
+        WHERE party_type = %s AND party = %s AND checkpoint_date < %s
+        ORDER BY checkpoint_date DESC
+        LIMIT 1
+    """, (party_type, party, checkpoint_date), as_dict=True)
+    previous = previous[0] if previous else None
+
+    balance, uncancelled_balance = get_gl_balance_between(
+        party_type, party, previous.checkpoint_date if previous else None, checkpoint_date
+    )
+    if previous:
+        balance += flt(previous.balance)
+        uncancelled_balance += flt(previous.uncancelled_balance)
+
+    frappe.db.sql(f"""
+        INSERT INTO {CHECKPOINT_TABLE}
+            (name, party_type, party, checkpoint_date, balance, uncancelled_balance,
+            creation, modified, owner, modified_by, docstatus)
+        VALUES
+            (MD5(CONCAT_WS('|', %(party_type)s, %(party)s, %(checkpoint_date)s)), %(party_type)s, %(party)s,
+            %(checkpoint_date)s, %(balance)s, %(uncancelled_balance)s, %(now)s, %(now)s, %(user)s, %(user)s, 0)
+        ON DUPLICATE KEY UPDATE
+            balance = VALUES(balance),
+            uncancelled_balance = VALUES(uncancelled_balance),
+            modified = VALUES(modified)
+    """, {
+        "party_type": party_type,
+        "party": party,
+        "checkpoint_date": str(getdate(checkpoint_date)),
+        "balance": balance,
+        "uncancelled_balance": uncancelled_balance,
+        "now": now(),
+        "user": frappe.session.user,
+    })
+
+    if get_gl_fingerprint(party_type, party, checkpoint_date, lock=True) != fingerprint:
+        frappe.db.rollback()
+        return
+
+    frappe.db.commit()
+
+
+def clear_party_balance_checkpoints(doc, method=None):
+    """
+    doc_events handler for GL Entry: a back-dated entry (including the reversal posted when a
+    voucher is cancelled) changes every checkpoint after its posting date, so drop those.
+    Entries posted in the current month never reach a checkpoint.
+    """
+    if not doc.get("party_type") or not doc.get("party"):
+        return
+
+    frappe.db.sql(f"""
+        DELETE FROM {CHECKPOINT_TABLE}
+        WHERE party_type = %s AND party = %s AND checkpoint_date > %s
+    """, (doc.party_type, doc.party, doc.posting_date))
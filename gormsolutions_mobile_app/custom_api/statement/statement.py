@@ -1,152 +1,74 @@
 import frappe
 from frappe.utils import flt
-@frappe.whitelist()
-def get_sales_invoice_details_and_payments(customer, from_date, to_date):
-    sales_invoice_data = []
-    total_paid_amount = 0
-    grand_total_amount = 0  # Variable to hold the grand total of all amounts
-    running_balance = 0      # Variable to hold the running balance
-    balance_brought_forward = 0  # Variable to hold the balance brought forward
-
-    # Step 1: Calculate Balance Brought Forward (balance before the 'from_date')
-    previous_balance = frappe.db.sql("""
-        SELECT 
-            SUM(gle.debit - gle.credit) AS balance
-        FROM 
-            `tabGL Entry` gle
-        WHERE 
-            gle.party_type = 'Customer'
-            AND gle.party = %s
-            AND gle.posting_date < %s
-            AND gle.docstatus = 1
-            AND gle.is_cancelled = 0  -- Exclude cancelled entries
-    """, (customer, from_date), as_dict=True)
-    
-    if previous_balance and previous_balance[0].balance:
-        balance_brought_forward = flt(previous_balance[0].balance)
-    
-    # Initialize running balance with balance brought forward
-    running_balance = balance_brought_forward
 
-    # Step 2: Fetch Sales Invoices and their items for the specified customer and date range
-    invoices = frappe.db.sql("""
-        SELECT 
-            si.name AS invoice_name,
-            si.custom_fuel_sales_app_id AS sales_app_id,
-            si.custom_credit_sales_app AS credit_sales_id,
-            si.posting_date,
-            si.cost_center, 
-            sii.item_code, 
-            sii.custom_vehicle_plates, 
-            sii.qty, 
-            sii.rate, 
-            sii.amount
-        FROM 
-            `tabSales Invoice` si
-        JOIN 
-            `tabSales Invoice Item` sii ON sii.parent = si.name
-        WHERE 
-            si.customer = %s 
-            AND si.posting_date BETWEEN %s AND %s 
-            AND si.docstatus = 1
-    """, (customer, from_date, to_date), as_dict=True)
+from gormsolutions_mobile_app.custom_api.statement.statement_engine import (
+    build_statement,
+    get_balance_brought_forward,
+    gl_entry_source,
+    payment_source,
+    statement_source,
+)
 
-    for invoice in invoices:
-        total_amount = flt(invoice.amount)
-        grand_total_amount += total_amount  # Add to grand total
-        running_balance += total_amount  # Update running balance
-        
-        invoice_data = {
-            "invoice_name": invoice.invoice_name,
-            "cost_center": invoice.cost_center,
-            "sales_app_id": invoice.sales_app_id,
-            "credit_sales_id": invoice.credit_sales_id,
-            "posting_date": invoice.posting_date,  # Add posting date to the invoice data
-            "item_code": invoice.item_code,
-            "custom_vehicle_plates": invoice.custom_vehicle_plates,
-            "qty": flt(invoice.qty),
-            "rate": flt(invoice.rate),
-            "amount": total_amount,
-            "running_balance": running_balance  # Include running balance for each invoice
-        }
-        
-        sales_invoice_data.append(invoice_data)
-
-    # Step 3: Fetch Payment Entries within the specified date range for the same customer
-    payments = frappe.db.sql("""
-        SELECT 
-            pe.name AS payment_entry_name, 
-            pe.posting_date,
-            pe.cost_center, 
-            pe.paid_amount
-        FROM 
-            `tabPayment Entry` pe
-        WHERE 
-            pe.party_type = 'Customer'
-            AND pe.party = %s
-            AND pe.posting_date BETWEEN %s AND %s
-            AND pe.docstatus = 1
-    """, (customer, from_date, to_date), as_dict=True)
+@frappe.whitelist()
+def get_sales_invoice_details_and_payments(customer, from_date, to_date):
+    # Balance brought forward (balance before the 'from_date'), excluding cancelled entries
+    balance_brought_forward = get_balance_brought_forward(customer, from_date, exclude_cancelled=True)
 
-    filtered_payments = []
-    for payment in payments:
-        total_paid_amount += flt(payment.paid_amount)
-        running_balance -= flt(payment.paid_amount)  # Subtract payment from running balance
-        filtered_payments.append({
-            "payment_entry_name": payment.payment_entry_name,
-            "cost_center": payment.cost_center,
-            "posting_date": payment.posting_date,  # Include posting date for payments
-            "paid_amount": payment.paid_amount
-        })
+    params = {"customer": customer, "from_date": from_date, "to_date": to_date}
 
-    # Step 4: Fetch GL Entries for the customer where voucher type is Journal Entry
-    gl_entries = frappe.db.sql("""
-        SELECT
-            gle.name AS gl_entry_name,
-            gle.posting_date,
-            gle.cost_center,
-            gle.debit,
-            gle.voucher_no,
-            gle.credit,
-            gle.remarks
-        FROM
-            `tabGL Entry` gle
-        WHERE
-            gle.party_type = 'Customer'
-            AND gle.party = %s
-            AND gle.voucher_type = 'Journal Entry'
-            AND gle.posting_date BETWEEN %s AND %s
-            AND gle.docstatus = 1
-            AND gle.is_cancelled = 0  -- Exclude cancelled entries
-    """, (customer, from_date, to_date), as_dict=True)
+    # Sales Invoices and their items for the specified customer and date range
+    invoices = statement_source(
+        "invoice",
+        """
+            SELECT
+                si.name AS invoice_name,
+                si.custom_fuel_sales_app_id AS sales_app_id,
+                si.custom_credit_sales_app AS credit_sales_id,
+                si.posting_date,
+                si.cost_center,
+                sii.idx,
+                sii.item_code,
+                sii.custom_vehicle_plates,
+                sii.qty,
+                sii.rate,
+                sii.amount
+            FROM
+                `tabSales Invoice` si
+            JOIN
+                `tabSales Invoice Item` sii ON sii.parent = si.name
+            WHERE
+                si.customer = %(customer)s
+                AND si.posting_date BETWEEN %(from_date)s AND %(to_date)s
+                AND si.docstatus = 1
+                {after}
+        """,
+        params,
+        key=[("si.posting_date", "posting_date"), ("si.name", "invoice_name"), ("sii.idx", "idx")],
+        debit="amount"
+    )
 
-    filtered_gl_entries = []
-    for gl_entry in gl_entries:
-        filtered_gl_entries.append({
-            "gl_entry_name": gl_entry.gl_entry_name,
-            "posting_date": gl_entry.posting_date,
-            "cost_center": gl_entry.cost_center,
-            "voucher_no": gl_entry.voucher_no,
-            "debit": flt(gl_entry.debit),
-            "credit": flt(gl_entry.credit),
-            "remarks": gl_entry.remarks
-        })
+    sources = [
+        invoices,
+        payment_source(params),
+        # Journal Entry lines against the customer, excluding cancelled entries
+        gl_entry_source(params, "gle.voucher_type = 'Journal Entry' AND gle.is_cancelled = 0"),
+    ]
 
-        # Update running balance: add debit amounts and subtract credit amounts
-        running_balance += flt(gl_entry.debit)  # Add debit to running balance
-        running_balance -= flt(gl_entry.credit)  # Subtract credit from running balance
-        total_paid_amount += flt(gl_entry.credit)  # Add credit to total paid
+    statement = build_statement(sources, balance_brought_forward, format_invoice_line)
+    statement.pop("running_balance")
+    return statement
 
-    # Step 5: Calculate outstanding amount
-    outstanding_amount = grand_total_amount - total_paid_amount
 
-    # Return results
+def format_invoice_line(invoice):
     return {
-        "sales_invoice_data": sales_invoice_data,
-        "balance_brought_forward": balance_brought_forward,  # Include the balance brought forward
-        "grand_total_amount": grand_total_amount,  # Return grand total of all amounts
-        "total_paid_amount": total_paid_amount,
-        "outstanding_amount": outstanding_amount,  # Return outstanding amount
-        "payments": filtered_payments,  # Include filtered payment details in the result
-        "gl_entries": filtered_gl_entries  # Include filtered GL entries in the result
+        "invoice_name": invoice.invoice_name,
+        "cost_center": invoice.cost_center,
+        "sales_app_id": invoice.sales_app_id,
+        "credit_sales_id": invoice.credit_sales_id,
+        "posting_date": invoice.posting_date,
+        "item_code": invoice.item_code,
+        "custom_vehicle_plates": invoice.custom_vehicle_plates,
+        "qty": flt(invoice.qty),
+        "rate": flt(invoice.rate),
+        "amount": flt(invoice.amount)
     }
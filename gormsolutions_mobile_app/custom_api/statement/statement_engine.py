@@ -0,0 +1,290 @@
+import heapq
+
+import frappe
+from frappe import _
+from frappe.utils import cint, flt
+
+from gormsolutions_mobile_app.custom_api.pagination import decode_cursor, encode_cursor
+from gormsolutions_mobile_app.custom_api.statement.party_balance import get_party_balance
+
+STATEMENT_CHUNK_SIZE = 2000
+STATEMENT_PAGE_LENGTH = 500
+MAX_STATEMENT_PAGE_LENGTH = 5000
+
+
+def statement_source(kind, sql, params, key, debit=None, credit=None):
+    """
+    Describe one source of statement lines.
+
+    Args:
+        kind (str): Line kind reported to the caller ("invoice", "payment", "gl_entry").
+        sql (str): SELECT without ORDER BY/LIMIT; its WHERE clause must end with `{after}`.
+        params (dict): Named query parameters.
+        key (list): (column, alias) pairs that order the rows uniquely, starting with posting date.
+        debit (str, optional): Row field added to the balance.
+        credit (str, optional): Row field subtracted from the balance.
+    """
+    return frappe._dict(kind=kind, sql=sql, params=params, key=key, debit=debit, credit=credit)
+
+
+def payment_source(params):
+    """Payment Entries received from the customer, reducing the balance by the paid amount."""
+    return statement_source(
+        "payment",
+        """
+            SELECT
+                pe.name AS payment_entry_name,
+                pe.posting_date,
+                pe.cost_center,
+                pe.paid_amount
+            FROM
+                `tabPayment Entry` pe
+            WHERE
+                pe.party_type = 'Customer'
+                AND pe.party = %(customer)s
+                AND pe.posting_date BETWEEN %(from_date)s AND %(to_date)s
+                AND pe.docstatus = 1
+                {after}
+        """,
+        params,
+        key=[("pe.posting_date", "posting_date"), ("pe.name", "payment_entry_name")],
+        credit="paid_amount",
+    )
+
+
+def gl_entry_source(params, condition):
+    """Customer GL Entries matching `condition`, posted as debit and credit."""
+    return statement_source(
+        "gl_entry",
+        f"""
+            SELECT
+                gle.name AS gl_entry_name,
+                gle.posting_date,
+                gle.cost_center,
+                gle.debit,
+                gle.voucher_no,
+                gle.credit,
+                gle.remarks
+            FROM
+                `tabGL Entry` gle
+            WHERE
+                gle.party_type = 'Customer'
+                AND gle.party = %(customer)s
+                AND {condition}
+                AND gle.posting_date BETWEEN %(from_date)s AND %(to_date)s
+                AND gle.docstatus = 1
+                {{after}}
+        """,
+        params,
+        key=[("gle.posting_date", "posting_date"), ("gle.name", "gl_entry_name")],
+        debit="debit",
+        credit="credit",
+    )
+
+
+def get_balance_brought_forward(customer, from_date, exclude_cancelled=False):
+    """Customer balance from all GL Entries posted before `from_date` (see `get_party_balance`)."""
+    return get_party_balance("Customer", customer, from_date, exclude_cancelled=exclude_cancelled)
+
+
+def iter_keyset(sql, params, key, after=None, chunk_size=STATEMENT_CHUNK_SIZE):
+    """
+    Yield the rows of `sql` in `key` order, one query per `chunk_size` rows, each query seeking
+    past the last row of the previous one. Rows start strictly after the `after` key when given.
+    """
+    columns = [column for column, alias in key]
+    order_by = ", ".join(columns)
+
+    while True:
+        chunk_params = dict(params)
+        after_condition = ""
+        if after:
+            after_condition = "AND " + keyset_condition(columns)
+            chunk_params.update({f"key_{i}": value for i, value in enumerate(after)})
+
+        rows = frappe.db.sql(
+            f"{sql.format(after=after_condition)} ORDER BY {order_by} LIMIT {cint(chunk_size)}",
+            chunk_params,
+            as_dict=True,
+        )
+        yield from rows
+
+        if len(rows) < chunk_size:
+            return
+        after = [rows[-1][alias] for column, alias in key]
+
+
+def keyset_condition(columns):
+    """(c0, c1, ...) > (key_0, key_1, ...), written out so the index on the first column is usable."""
+    clauses = []
+    for i, column in enumerate(columns):
+        terms = [f"{columns[j]} = %(key_{j})s" for j in range(i)]
+        terms.append(f"{column} > %(key_{i})s")
+        clauses.append("(" + " AND ".join(terms) + ")")
+    return "(" + " OR ".join(clauses) + ")"
+
+
+def iter_source_lines(index, source, after=None, chunk_size=STATEMENT_CHUNK_SIZE):
+    for row in iter_keyset(source.sql, source.params, source.key, after, chunk_size):
+        row.kind = source.kind
+        row.source = index
+        row.key = [row[alias] for column, alias in source.key]
+        row.balance_change = flt(row.get(source.debit)) - flt(row.get(source.credit))
+        yield row
+
+
+def iter_statement(sources, opening_balance=0, after=None, chunk_size=STATEMENT_CHUNK_SIZE):
+    """
+    Merge the `sources` by posting date and yield every line with the `running_balance` after it.
+
+    Each source is read in posting-date order in chunks, so memory stays bounded however long
+    the history is. Lines on the same date keep the order of `sources`.
+
+    Args:
+        sources (list): `statement_source` definitions.
+        opening_balance (float): Balance before the first line.
+        after (list, optional): Per source, the key of the last line already returned (or None).
+    """
+    after = after or [None] * len(sources)
+    streams = [
+        iter_source_lines(index, source, after[index], chunk_size)
+        for index, source in enumerate(sources)
+    ]
+
+    running_balance = flt(opening_balance)
+    for line in heapq.merge(*streams, key=lambda line: line.posting_date):
+        running_balance += line.balance_change
+        line.running_balance = running_balance
+        yield line
+
+
+def format_payment_line(line):
+    return {
+        "payment_entry_name": line.payment_entry_name,
+        "cost_center": line.cost_center,
+        "posting_date": line.posting_date,
+        "paid_amount": line.paid_amount
+    }
+
+
+def format_gl_entry_line(line):
+    return {
+        "gl_entry_name": line.gl_entry_name,
+        "posting_date": line.posting_date,
+        "cost_center": line.cost_center,
+        "voucher_no": line.voucher_no,
+        "debit": flt(line.debit),
+        "credit": flt(line.credit),
+        "remarks": line.remarks
+    }
+
+
+def build_statement(sources, opening_balance, format_invoice_line):
+    """
+    Run the statement and collect it in the response shape of the statement endpoints.
+
+    Returns:
+        dict: sales_invoice_data (with running_balance per line), balance_brought_forward,
+        grand_total_amount, total_paid_amount, outstanding_amount, payments, gl_entries,
+        running_balance.
+    """
+    sales_invoice_data = []
+    payments = []
+    gl_entries = []
+    grand_total_amount = 0
+    total_paid_amount = 0
+    running_balance = flt(opening_balance)
+
+    for line in iter_statement(sources, opening_balance):
+        running_balance = line.running_balance
+
+        if line.kind == "invoice":
+            grand_total_amount += line.balance_change
+            invoice_data = format_invoice_line(line)
+            invoice_data["running_balance"] = line.running_balance
+            sales_invoice_data.append(invoice_data)
+        elif line.kind == "payment":
+            total_paid_amount += flt(line.paid_amount)
+            payments.append(format_payment_line(line))
+        else:
+            total_paid_amount += flt(line.credit)
+            gl_entries.append(format_gl_entry_line(line))
+
+    return {
+        "sales_invoice_data": sales_invoice_data,
+        "balance_brought_forward": opening_balance,
+        "grand_total_amount": grand_total_amount,
+        "total_paid_amount": total_paid_amount,
+        "outstanding_amount": grand_total_amount - total_paid_amount,
+        "payments": payments,
+        "gl_entries": gl_entries,
+        "running_balance": running_balance
+    }
+
+
+def get_statement_page(sources, opening_balance, format_invoice_line, cursor=None, limit=None):
+    """
+    One page of merged statement lines, for statements too long to return in one response.
+
+    The cursor carries the running balance and the last key read from each source, so every
+    page costs one seek per source regardless of how deep into the history it is.
+
+    Returns:
+        dict: {"lines": [...], "next_cursor": str | None}. Each line has `kind` and `running_balance`.
+    """
+    limit = min(cint(limit) or STATEMENT_PAGE_LENGTH, MAX_STATEMENT_PAGE_LENGTH)
+
+    after = None
+    state = decode_cursor(cursor)
+    if state:
+        opening_balance, after = validate_statement_cursor(state, sources)
+
+    formatters = {
+        "invoice": format_invoice_line,
+        "payment": format_payment_line,
+        "gl_entry": format_gl_entry_line,
+    }
+
+    lines = []
+    last_keys = list(after or [None] * len(sources))
+    has_more = False
+    for line in iter_statement(sources, opening_balance, after, chunk_size=limit + 1):
+        if len(lines) == limit:
+            has_more = True
+            break
+
+        data = formatters[line.kind](line)
+        data["kind"] = line.kind
+        data["running_balance"] = line.running_balance
+        lines.append(data)
+        last_keys[line.source] = line.key
+
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_cursor([lines[-1]["running_balance"], last_keys])
+
+    return {"lines": lines, "next_cursor": next_cursor}
+
+
+def validate_statement_cursor(state, sources):
+    """
+    Check the shape of a decoded statement cursor: [running balance, [last key per source]],
+    each key None or one value per key column of its source.
+
+    Returns:
+        tuple: (opening_balance, after)
+    """
+    def valid_key(key, source):
+        return key is None or (isinstance(key, list) and len(key) == len(source.key))
+
+    if (
+        len(state) != 2
+        or isinstance(state[0], bool)
+        or not isinstance(state[0], (int, float))
+        or not isinstance(state[1], list)
+        or len(state[1]) != len(sources)
+        or not all(valid_key(key, source) for key, source in zip(state[1], sources))
+    ):
+        frappe.throw(_("Invalid pagination cursor."))
+
+    return state[0], state[1]
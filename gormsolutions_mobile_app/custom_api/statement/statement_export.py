@@ -0,0 +1,176 @@
+import csv
+import os
+
+import frappe
+from frappe import _
+from frappe.utils import flt, getdate
+
+from gormsolutions_mobile_app.custom_api.statement.customer_statement import get_customer_statement_sources
+from gormsolutions_mobile_app.custom_api.statement.statement_engine import (
+    get_balance_brought_forward,
+    iter_statement,
+)
+
+STATEMENT_EXPORT_FORMATS = ("csv", "xlsx")
+STATEMENT_EXPORT_EVENT = "customer_statement_export"
+STATEMENT_EXPORT_COLUMNS = [
+    "Posting Date", "Type", "Reference", "Cost Center", "Item Code", "Vehicle Plates",
+    "Order Number", "Qty", "Rate", "Remarks", "Debit", "Credit", "Running Balance",
+]
+
+
+@frappe.whitelist()
+def export_customer_statements(from_date, to_date, customers=None, file_format="csv"):
+    """
+    Queue the generation of statement files for `customers` (a list or JSON list), or for every
+    customer with activity between `from_date` and `to_date` when none are given.
+
+    Each statement is written to a private file attached to its Customer. Progress is published
+    to the calling user as `customer_statement_export` realtime events.
+    """
+    if file_format not in STATEMENT_EXPORT_FORMATS:
+        frappe.throw(_("File format must be one of: {0}").format(", ".join(STATEMENT_EXPORT_FORMATS)))
+    if getdate(from_date) > getdate(to_date):
+        frappe.throw(_("From Date cannot be after To Date."))
+
+    if isinstance(customers, str):
+        customers = frappe.parse_json(customers)
+
+    job = frappe.enqueue(
+        "gormsolutions_mobile_app.custom_api.statement.statement_export.generate_customer_statements",
+        queue="long",
+        timeout=3600,
+        from_date=from_date,
+        to_date=to_date,
+        customers=customers or None,
+        file_format=file_format,
+        user=frappe.session.user
+    )
+
+    return {"status": "queued", "job_id": job.id if job else None}
+
+
+def generate_customer_statements(from_date, to_date, customers=None, file_format="csv", user=None):
+    """Background job: write one statement file per customer and attach it to the Customer."""
+    if not customers:
+        customers = get_customers_with_activity(from_date, to_date)
+
+    files = []
+    errors = []
+    for index, customer in enumerate(customers, start=1):
+        try:
+            file_url = write_customer_statement(customer, from_date, to_date, file_format)
+            files.append({"customer": customer, "file_url": file_url})
+            frappe.db.commit()
+        except Exception as e:
+            frappe.db.rollback()
+            frappe.log_error(frappe.get_traceback(), "Customer Statement Export Error")
+            errors.append({"customer": customer, "error": str(e)})
+
+        frappe.publish_realtime(
+            STATEMENT_EXPORT_EVENT,
+            {"status": "running", "customer": customer, "progress": index, "total": len(customers)},
+            user=user
+        )
+
+    frappe.publish_realtime(
+        STATEMENT_EXPORT_EVENT,
+        {"status": "completed", "files": files, "errors": errors, "total": len(customers)},
+        user=user
+    )
+
+
+def get_customers_with_activity(from_date, to_date):
+    """Customers with a submitted Customer Document or Payment Entry in the period."""
+    return frappe.db.sql_list("""
+        SELECT customer FROM `tabCustomer Document`
+        WHERE posting_date BETWEEN %(from_date)s AND %(to_date)s AND docstatus = 1
+        UNION
+        SELECT party FROM `tabPayment Entry`
+        WHERE party_type = 'Customer' AND posting_date BETWEEN %(from_date)s AND %(to_date)s AND docstatus = 1
+        ORDER BY 1
+    """, {"from_date": from_date, "to_date": to_date})
+
+
+def write_customer_statement(customer, from_date, to_date, file_format):
+    """
+    Stream the statement of `customer` to a private file, one row at a time, and attach it.
+
+    Returns:
+        str: URL of the created File.
+    """
+    file_name = "Statement-{0}-{1}-{2}-{3}.{4}".format(
+        frappe.scrub(customer), from_date, to_date, frappe.generate_hash(length=6), file_format
+    )
+    path = frappe.get_site_path("private", "files", file_name)
+
+    balance_brought_forward = get_balance_brought_forward(customer, from_date)
+    rows = iter_statement_rows(
+        iter_statement(get_customer_statement_sources(customer, from_date, to_date), balance_brought_forward),
+        from_date,
+        balance_brought_forward
+    )
+
+    try:
+        if file_format == "xlsx":
+            write_xlsx(path, rows, title=customer)
+        else:
+            write_csv(path, rows)
+    except Exception:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+
+    file_doc = frappe.get_doc({
+        "doctype": "File",
+        "file_name": file_name,
+        "file_url": f"/private/files/{file_name}",
+        "is_private": 1,
+        "attached_to_doctype": "Customer",
+        "attached_to_name": customer,
+    })
+    file_doc.insert(ignore_permissions=True)
+    return file_doc.file_url
+
+
+def iter_statement_rows(lines, from_date, balance_brought_forward):
+    yield STATEMENT_EXPORT_COLUMNS
+    yield [from_date, "Balance Brought Forward", "", "", "", "", "", "", "", "", "", "", flt(balance_brought_forward)]
+
+    for line in lines:
+        if line.kind == "invoice":
+            yield [
+                line.posting_date, "Invoice", line.invoice_name, line.station, line.item_code,
+                line.number_plate, line.order_number, flt(line.qty), flt(line.rate), "",
+                flt(line.amount), 0, line.running_balance,
+            ]
+        elif line.kind == "payment":
+            yield [
+                line.posting_date, "Payment", line.payment_entry_name, line.cost_center, "",
+                "", "", "", "", "", 0, flt(line.paid_amount), line.running_balance,
+            ]
+        else:
+            yield [
+                line.posting_date, "Journal", line.voucher_no, line.cost_center, "",
+                "", "", "", "", line.remarks, flt(line.debit), flt(line.credit), line.running_balance,
+            ]
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        for row in rows:
+            writer.writerow(row)
+
+
+def write_xlsx(path, rows, title=None):
+    from openpyxl import Workbook
+
+    # Write-only mode keeps a constant memory footprint regardless of the number of rows
+    workbook = Workbook(write_only=True)
+    title = (title or "").translate(str.maketrans("", "", "[]:*?/\\"))[:31]
+    sheet = workbook.create_sheet(title=title or "Statement")
+    for row in rows:
+        sheet.append(row)
+
+    workbook.save(path)
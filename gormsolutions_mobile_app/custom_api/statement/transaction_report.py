@@ -1,195 +1,101 @@
-import frappe
-from frappe.utils import flt
-
-@frappe.whitelist()
-def get_transaction_report_gl(transaction_id, station=None, from_date=None, to_date=None):
-    # Fetch the Transaction Accounts document
-    transaction_account_doc = frappe.get_doc("Transaction Accounts", transaction_id)
-    account_names = [item.account for item in transaction_account_doc.trans_account_items]
+import json
 
-    # Initialize conditions and parameters
-    conditions = ["is_cancelled = 0"]  # Exclude canceled entries 
-    params = {}
-
-    # Add conditions based on optional filters
-    if station:
-        conditions.append("cost_center = %(cost_center)s")
-        params["cost_center"] = station
+import frappe
+from frappe.utils import add_days, date_diff, flt, getdate, today
 
-    if from_date and to_date:
-        conditions.append("posting_date BETWEEN %(from_date)s AND %(to_date)s")
-        params["from_date"] = from_date
-        params["to_date"] = to_date
+from gormsolutions_mobile_app.custom_api.statement.gl_daily_balance import get_gl_balances
 
-    # Combine conditions into a single string
-    condition_str = " AND ".join(conditions)
+DAILY_TOTALS_CACHE_KEY = "gormsolutions_daily_totals"
+# Lifetime of a cost center's hash, counted from its first write: a day cached from data read
+# just before a back-dated posting committed is recomputed within this time at the latest
+DAILY_TOTALS_CACHE_TTL = 24 * 60 * 60
 
-    # Query the GL Entry table
-    debit_credit_data = frappe.db.sql(f"""
-        SELECT 
-            account, 
-            SUM(debit) - SUM(credit) AS balance
-        FROM 
-            `tabGL Entry`
-        WHERE 
-            account IN %(account_names)s 
-            {"AND " + condition_str if condition_str else ""}
-        GROUP BY 
-            account
-    """, {
-        "account_names": account_names,
-        **params
-    }, as_dict=True)
+VIVO_DEBTORS_CONDITION = "account = '1310 - Debtors - SE' AND party = 'VIVO' AND party_type = 'Customer'"
 
-    return debit_credit_data
 
+@frappe.whitelist()
+def get_transaction_report_gl(transaction_id, station=None, from_date=None, to_date=None):
+    return get_transaction_report_balances(transaction_id, station, from_date, to_date)
 
 
 @frappe.whitelist()
 def get_transaction_report_gl_withoutvivo(transaction_id, station=None, from_date=None, to_date=None):
-    # Fetch the Transaction Accounts document
-    transaction_account_doc = frappe.get_doc("Transaction Accounts", transaction_id)
-    account_names = [item.account for item in transaction_account_doc.trans_account_items]
-
-    # Initialize conditions and parameters
-    conditions = ["is_cancelled = 0"]  # Exclude canceled entries
-    params = {}
-
-    # Add conditions based on optional filters
-    if station:
-        conditions.append("cost_center = %(cost_center)s")
-        params["cost_center"] = station
-
-    if from_date and to_date:
-        conditions.append("posting_date BETWEEN %(from_date)s AND %(to_date)s")
-        params["from_date"] = from_date
-        params["to_date"] = to_date
-
     # Exclude the specific combination of account, party, and party_type
-    conditions.append("NOT (account = '1310 - Debtors - SE' AND party = 'VIVO' AND party_type = 'Customer')")
-
-    # Combine conditions into a single string
-    condition_str = " AND ".join(conditions)
-
-    # Query the GL Entry table
-    debit_credit_data = frappe.db.sql(f"""
-        SELECT 
-            account, 
-            SUM(debit) - SUM(credit) AS balance
-        FROM 
-            `tabGL Entry`
-        WHERE 
-            account IN %(account_names)s 
-            {"AND " + condition_str if condition_str else ""}
-        GROUP BY 
-            account
-    """, {
-        "account_names": account_names,
-        **params
-    }, as_dict=True)
-
-    return debit_credit_data
+    return get_transaction_report_balances(
+        transaction_id, station, from_date, to_date, extra_condition=f"NOT ({VIVO_DEBTORS_CONDITION})"
+    )
+
 
 @frappe.whitelist()
 def get_transaction_report_gl_withvivo(transaction_id, station=None, from_date=None, to_date=None):
+    # Only the specific combination of account, party, and party_type
+    return get_transaction_report_balances(
+        transaction_id, station, from_date, to_date, extra_condition=VIVO_DEBTORS_CONDITION
+    )
+
+
+def get_transaction_report_balances(transaction_id, station=None, from_date=None, to_date=None, extra_condition=None):
+    """
+    Balance per account of a `Transaction Accounts` set, read from the `GL Daily Balance` rollup
+    (one row per account, cost center, party and day) instead of scanning `tabGL Entry`.
+    """
     # Fetch the Transaction Accounts document
     transaction_account_doc = frappe.get_doc("Transaction Accounts", transaction_id)
     account_names = [item.account for item in transaction_account_doc.trans_account_items]
 
-    # Initialize conditions and parameters
-    conditions = ["is_cancelled = 0"]  # Exclude canceled entries
-    params = {}
+    return get_gl_balances(account_names, station, from_date, to_date, extra_condition)
 
-    # Add conditions based on optional filters
-    if station:
-        conditions.append("cost_center = %(cost_center)s")
-        params["cost_center"] = station
-
-    if from_date and to_date:
-        conditions.append("posting_date BETWEEN %(from_date)s AND %(to_date)s")
-        params["from_date"] = from_date
-        params["to_date"] = to_date
-
-    # Exclude the specific combination of account, party, and party_type
-    conditions.append("account = '1310 - Debtors - SE' AND party = 'VIVO' AND party_type = 'Customer'")
-
-    # Combine conditions into a single string
-    condition_str = " AND ".join(conditions)
-
-    # Query the GL Entry table
-    debit_credit_data = frappe.db.sql(f"""
-        SELECT 
-            account, 
-            SUM(debit) - SUM(credit) AS balance
-        FROM 
-            `tabGL Entry`
-        WHERE 
-            account IN %(account_names)s 
-            {"AND " + condition_str if condition_str else ""}
-        GROUP BY 
-            account
-    """, {
-        "account_names": account_names,
-        **params
-    }, as_dict=True)
-
-    return debit_credit_data
-
-
-import frappe
-from frappe.utils import flt, today
 
 @frappe.whitelist()
 def get_daily_totals(from_date=None, to_date=None, cost_center=None):
     """
     Fetch total sales and total expenses for a date range and cost center.
     If no date range is provided, it defaults to today's date.
+
+    Totals are kept per day: past days are served from a Redis hash (see `clear_daily_totals`
+    for invalidation), and only uncached days plus today are aggregated in SQL. Today is
+    recomputed on every call, a grouped query over one posting date.
     """
     if not from_date:
         from_date = today()
     if not to_date:
         to_date = today()
 
-    # Initialize totals
-    total_sales = 0.0
-    total_expenses = 0.0
-
-    # Define cost center condition dynamically
-    cost_center_condition = "AND cost_center = %(cost_center)s" if cost_center else ""
-
-    # Fetch total sales from Sales Invoices
-    sales_data = frappe.db.sql(f"""
-        SELECT 
-            SUM(grand_total) AS total_sales
-        FROM 
-            `tabSales Invoice`
-        WHERE 
-            posting_date BETWEEN %(from_date)s AND %(to_date)s
-            AND docstatus = 1
-            {cost_center_condition}
-    """, {"from_date": from_date, "to_date": to_date, "cost_center": cost_center} if cost_center else {"from_date": from_date, "to_date": to_date}, as_dict=True)
-
-    if sales_data and sales_data[0].get('total_sales'):
-        total_sales = flt(sales_data[0].get('total_sales'))
-
-    # Fetch GL Entries for the specified cost center and date range
-    total_expenses_fromgl = frappe.get_all(
-        "GL Entry",
-        filters={
-            "posting_date": ["between", [from_date, to_date]],
-            "docstatus": 1,
-        },
-        fields=["name", "debit", "credit", "account", "posting_date", "cost_center"]
-    )
-
-    # Dictionary to store total debits and credits for each account
-    total_expenses = 0.0
-    for entry in total_expenses_fromgl:
-        # Check if the account is an Expense Account and filter by the cost center if provided
-        account_doc = frappe.get_doc("Account", entry['account'])
-        if account_doc.account_type == "Expense Account":
-            if cost_center and entry.get('cost_center') == cost_center or not cost_center:
-                total_expenses += flt(entry.get('debit', 0)) - flt(entry.get('credit', 0))
+    days = [add_days(getdate(from_date), i) for i in range(date_diff(to_date, from_date) + 1)]
+    current_date = getdate(today())
+
+    cache = frappe.cache()
+    cache_key = cache.make_key(get_daily_totals_cache_name(cost_center))
+
+    # Past days can only change through a back-dated posting, which clears that day
+    past_days = [str(day) for day in days if day < current_date]
+    cached = {}
+    ttl = None
+    if past_days:
+        pipe = cache.pipeline()
+        pipe.hmget(cache_key, past_days)
+        pipe.ttl(cache_key)
+        values, ttl = pipe.execute()
+        for day, value in zip(past_days, values):
+            if value is not None:
+                cached[day] = json.loads(value)
+
+    missing_days = [str(day) for day in days if str(day) not in cached]
+    if missing_days:
+        computed = compute_daily_totals(missing_days[0], missing_days[-1], cost_center)
+
+        pipe = cache.pipeline()
+        for day in missing_days:
+            cached[day] = computed.get(day, [0.0, 0.0])
+            if getdate(day) < current_date:
+                pipe.hset(cache_key, day, json.dumps(cached[day]))
+        # Only a new hash gets an expiry; refreshing it on every write would keep it forever
+        if past_days and (ttl is None or ttl < 0):
+            pipe.expire(cache_key, DAILY_TOTALS_CACHE_TTL)
+        pipe.execute()
+
+    total_sales = sum(flt(cached[str(day)][0]) for day in days)
+    total_expenses = sum(flt(cached[str(day)][1]) for day in days)
 
     return {
         "from_date": from_date,
@@ -198,3 +104,78 @@ def get_daily_totals(from_date=None, to_date=None, cost_center=None):
         "total_sales": total_sales,
         "total_expenses": total_expenses
     }
+
+
+def compute_daily_totals(from_date, to_date, cost_center=None):
+    """
+    Aggregate sales and expense-account totals per posting date.
+
+    Returns:
+        dict: {"YYYY-MM-DD": [total_sales, total_expenses]} for the days that have any postings.
+    """
+    params = {"from_date": from_date, "to_date": to_date, "cost_center": cost_center}
+    cost_center_condition = "AND {0}cost_center = %(cost_center)s" if cost_center else ""
+
+    sales_data = frappe.db.sql(f"""
+        SELECT
+            posting_date,
+            SUM(grand_total) AS total
+        FROM
+            `tabSales Invoice`
+        WHERE
+            posting_date BETWEEN %(from_date)s AND %(to_date)s
+            AND docstatus = 1
+            {cost_center_condition.format("")}
+        GROUP BY
+            posting_date
+    """, params, as_dict=True)
+
+    # Account type is checked in the join instead of loading each Account
+    expense_data = frappe.db.sql(f"""
+        SELECT
+            gle.posting_date,
+            SUM(gle.debit) - SUM(gle.credit) AS total
+        FROM
+            `tabGL Entry` gle
+        INNER JOIN
+            `tabAccount` acc ON acc.name = gle.account
+        WHERE
+            gle.posting_date BETWEEN %(from_date)s AND %(to_date)s
+            AND gle.docstatus = 1
+            AND acc.account_type = 'Expense Account'
+            {cost_center_condition.format("gle.")}
+        GROUP BY
+            gle.posting_date
+    """, params, as_dict=True)
+
+    totals = {}
+    for row in sales_data:
+        totals.setdefault(str(row.posting_date), [0.0, 0.0])[0] = flt(row.total)
+    for row in expense_data:
+        totals.setdefault(str(row.posting_date), [0.0, 0.0])[1] = flt(row.total)
+
+    return totals
+
+
+def get_daily_totals_cache_name(cost_center=None):
+    """One hash per cost center (and one for all cost centers), keyed by posting date."""
+    return f"{DAILY_TOTALS_CACHE_KEY}|{cost_center or '*'}"
+
+
+def clear_daily_totals(doc, method=None):
+    """
+    doc_events handler for GL Entry and Sales Invoice: drop the cached day of a back-dated posting
+    once it commits, so a request in between cannot cache the day from before the posting.
+    Today is never cached, so postings dated today need no invalidation.
+    """
+    if not doc.get("posting_date") or getdate(doc.posting_date) >= getdate(today()):
+        return
+
+    day = str(getdate(doc.posting_date))
+    cost_centers = {None, doc.get("cost_center")}
+
+    def clear():
+        for cost_center in cost_centers:
+            frappe.cache().hdel(get_daily_totals_cache_name(cost_center), day)
+
+    frappe.db.after_commit.add(clear)
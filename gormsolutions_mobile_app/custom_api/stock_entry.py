@@ -1,5 +1,7 @@
 import frappe
 
+from gormsolutions_mobile_app.custom_api.pos_context import get_pos_context
+
 @frappe.whitelist(allow_guest=True)
 def create_stock_entry(stock_entry_type, items, from_warehouse=None, to_warehouse=None, company=None, posting_date=None):
     """
@@ -45,16 +47,8 @@ def create_stock_entry(stock_entry_type, items, from_warehouse=None, to_warehous
             "items": []
         })
         
-        # Get cost centers permitted for the current user
-        current_user = frappe.session.user
-        cost_center_permitted = frappe.get_all(
-            "User Permission",
-            filters={"user": current_user, "allow": "Cost Center"},
-            fields=["for_value"]
-        )
-        
-        # Default cost center to use (hardcoded or fetched from permissions)
-        default_cost_centers = [perm["for_value"] for perm in cost_center_permitted]
+        # Default cost center to use (fetched from permissions)
+        default_cost_centers = get_pos_context().cost_centers
         
         if not default_cost_centers:
             return {"error": "No permitted cost centers found for the current user."}
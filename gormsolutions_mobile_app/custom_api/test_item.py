@@ -0,0 +1,172 @@
+# Copyright (c) 2025, mututa paul and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from gormsolutions_mobile_app.custom_api.item import (
+	get_item_by_code,
+	get_item_details,
+	get_item_lookup_versions,
+	sync_items,
+)
+
+TEST_USER = "test-pos-items@example.com"
+ITEM_PREFIX = "_Test POS Item"
+PRICE_LIST = "Standard Selling"
+TEST_BARCODE = "5901234123457"
+
+
+def count_queries(fn, **kwargs):
+	with patch.object(frappe.db, "sql", wraps=frappe.db.sql) as sql:
+		result = fn(**kwargs)
+	return sql.call_count, result
+
+
+class TestItemDetails(FrappeTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		cls.warehouses = frappe.get_all("Warehouse", filters={"is_group": 0}, pluck="name", limit=2)
+		item_group = frappe.get_all("Item Group", filters={"is_group": 0}, pluck="name", limit=1)[0]
+
+		if not frappe.db.exists("User", TEST_USER):
+			frappe.get_doc(
+				{"doctype": "User", "email": TEST_USER, "first_name": "POS Items", "send_welcome_email": 0}
+			).insert(ignore_permissions=True)
+
+		for allow, for_value in [("Warehouse", w) for w in cls.warehouses] + [("Price List", PRICE_LIST)]:
+			if not frappe.db.exists("User Permission", {"user": TEST_USER, "allow": allow, "for_value": for_value}):
+				frappe.get_doc(
+					{"doctype": "User Permission", "user": TEST_USER, "allow": allow, "for_value": for_value}
+				).insert(ignore_permissions=True)
+
+		for i in range(10):
+			item_code = f"{ITEM_PREFIX} {i}"
+			if not frappe.db.exists("Item", item_code):
+				frappe.get_doc(
+					{
+						"doctype": "Item",
+						"item_code": item_code,
+						"item_name": item_code,
+						"item_group": item_group,
+						"stock_uom": "Nos",
+					}
+				).insert(ignore_permissions=True)
+			if not frappe.db.exists("Item Price", {"item_code": item_code, "price_list": PRICE_LIST}):
+				frappe.get_doc(
+					{
+						"doctype": "Item Price",
+						"item_code": item_code,
+						"price_list": PRICE_LIST,
+						"price_list_rate": 100 + i,
+					}
+				).insert(ignore_permissions=True)
+
+	def setUp(self):
+		frappe.set_user(TEST_USER)
+
+	def tearDown(self):
+		frappe.set_user("Administrator")
+
+	def test_query_count_does_not_grow_with_page_size(self):
+		# warm up any per-user caches so both measurements see the same state
+		get_item_details(limit=1, offset=0, search=ITEM_PREFIX)
+
+		small_count, small_page = count_queries(get_item_details, limit=1, offset=0, search=ITEM_PREFIX)
+		large_count, large_page = count_queries(get_item_details, limit=10, offset=0, search=ITEM_PREFIX)
+
+		self.assertEqual(len(small_page), 1)
+		self.assertEqual(len(large_page), 10)
+		self.assertEqual(small_count, large_count)
+
+	def test_stock_and_price_enrichment(self):
+		items = get_item_details(limit=10, offset=0, search=ITEM_PREFIX)
+
+		for item in items:
+			self.assertEqual(
+				sorted(row["warehouse_name"] for row in item["other_warehouse_stock"]), sorted(self.warehouses)
+			)
+			self.assertEqual(item["stock"], sum(row["stock"] for row in item["other_warehouse_stock"]))
+			self.assertEqual(item["price"], 100 + int(item["item_code"].rsplit(" ", 1)[1]))
+
+	def test_item_by_code_and_barcode(self):
+		item_code = f"{ITEM_PREFIX} 0"
+		frappe.set_user("Administrator")
+		item = frappe.get_doc("Item", item_code)
+		if not any(row.barcode == TEST_BARCODE for row in item.barcodes):
+			item.append("barcodes", {"barcode": TEST_BARCODE})
+			item.save(ignore_permissions=True)
+		frappe.set_user(TEST_USER)
+
+		by_code = get_item_by_code(item_code)
+		by_barcode = get_item_by_code(TEST_BARCODE)
+
+		self.assertEqual(by_code["item_code"], item_code)
+		self.assertEqual(by_barcode["item_code"], item_code)
+		self.assertEqual(by_code["price"], 100)
+		self.assertEqual(by_code["stock"], sum(row["stock"] for row in by_code["other_warehouse_stock"]))
+		self.assertRaises(frappe.DoesNotExistError, get_item_by_code, "_Test POS Unknown Code")
+
+	def test_item_by_code_sees_item_changes(self):
+		item_code = f"{ITEM_PREFIX} 1"
+		self.assertEqual(get_item_by_code(item_code)["item_name"], item_code)
+
+		# Saving the Item runs the doc_events that invalidate the cached lookup once it commits
+		frappe.set_user("Administrator")
+		frappe.get_doc("Item", item_code).update({"item_name": f"{item_code} renamed"}).save(ignore_permissions=True)
+		frappe.db.commit()
+		frappe.set_user(TEST_USER)
+		try:
+			self.assertEqual(get_item_by_code(item_code)["item_name"], f"{item_code} renamed")
+		finally:
+			frappe.set_user("Administrator")
+			frappe.get_doc("Item", item_code).update({"item_name": item_code}).save(ignore_permissions=True)
+			frappe.db.commit()
+
+	def test_item_by_code_bumps_version_after_commit(self):
+		item_code = f"{ITEM_PREFIX} 2"
+		self.assertEqual(get_item_by_code(item_code)["item_name"], item_code)
+		versions = get_item_lookup_versions(item_code)
+
+		frappe.set_user("Administrator")
+		frappe.get_doc("Item", item_code).update({"item_name": f"{item_code} renamed"}).save(ignore_permissions=True)
+		# Still inside the open transaction: the version must not move yet
+		self.assertEqual(get_item_lookup_versions(item_code), versions)
+		frappe.set_user(TEST_USER)
+		self.assertEqual(get_item_by_code(item_code)["item_name"], item_code)
+
+		frappe.db.commit()
+		try:
+			self.assertNotEqual(get_item_lookup_versions(item_code), versions)
+			self.assertEqual(get_item_by_code(item_code)["item_name"], f"{item_code} renamed")
+		finally:
+			frappe.set_user("Administrator")
+			frappe.get_doc("Item", item_code).update({"item_name": item_code}).save(ignore_permissions=True)
+			frappe.db.commit()
+
+	def test_sync_items_tombstones_prices_leaving_the_filter(self):
+		def sync(since=None):
+			prices, removed_prices = {}, set()
+			while True:
+				response = sync_items(since=since)
+				prices.update((price["name"], price) for price in response["prices"])
+				removed_prices.update(response["removed_prices"])
+				since = response["watermark"]
+				if not response["has_more"]:
+					return prices, removed_prices, since
+
+		price_name = frappe.db.get_value("Item Price", {"item_code": f"{ITEM_PREFIX} 3", "price_list": PRICE_LIST})
+		prices, _removed, watermark = sync()
+		self.assertIn(price_name, prices)
+
+		# Item Price.validate copies selling from its Price List; set the flag directly
+		frappe.db.set_value("Item Price", price_name, "selling", 0)
+		try:
+			prices, removed_prices, _watermark = sync(watermark)
+			self.assertNotIn(price_name, prices)
+			self.assertIn(price_name, removed_prices)
+		finally:
+			frappe.db.set_value("Item Price", price_name, "selling", 1)
@@ -1,110 +1,97 @@
 import frappe
+from frappe.utils import cint, flt
 
 @frappe.whitelist()
 def fetch_stock_entry_ledger_data(from_date=None, to_date=None, cost_center=None):
+    """
+    Per-item purchase and sales summary from the Stock Ledger.
+
+    For Purchase Invoice entries: qty_in, average valuation rate and total buying amount.
+    For Sales Invoice entries: qty_out, average invoice rate and total selling amount.
+    Everything is aggregated in one grouped SQL query.
+    """
     try:
         # Define filters
-        filters = {
-            'is_cancelled': 0,  # Exclude cancelled entries
-            'voucher_type': ['in', ['Purchase Invoice', 'Sales Invoice']]
-        }
+        conditions = [
+            "sle.is_cancelled = 0",  # Exclude cancelled entries
+            "sle.voucher_type IN ('Purchase Invoice', 'Sales Invoice')",
+        ]
+        params = {}
 
         # Add optional filters
         if from_date and to_date:
-            filters['posting_date'] = ['between', [from_date, to_date]]
+            conditions.append("sle.posting_date BETWEEN %(from_date)s AND %(to_date)s")
+            params.update({"from_date": from_date, "to_date": to_date})
 
-        # Fetch warehouses linked to the given cost center
-        warehouses = []
+        # Restrict to the warehouses linked to the given cost center (when it has any)
         if cost_center:
-            warehouses = frappe.get_all(
-                'Warehouse',
-                filters={'custom_cost_centre': cost_center},
-                pluck='name'
-            )
-            if warehouses:
-                filters['warehouse'] = ['in', warehouses]
+            conditions.append("""(
+                w.custom_cost_centre = %(cost_center)s
+                OR NOT EXISTS (SELECT 1 FROM `tabWarehouse` WHERE custom_cost_centre = %(cost_center)s)
+            )""")
+            params["cost_center"] = cost_center
 
-        # Fetch data from Stock Ledger Entry based on the given filters
-        stock_entries = frappe.get_all(
-            'Stock Ledger Entry',
-            filters=filters,
-            fields=['voucher_no', 'voucher_type', 'actual_qty', 'valuation_rate', 'warehouse', 'item_code', 'posting_date']
-        )
+        # The selling rate of a Sales Invoice entry is the rate of the invoice row for that item. When
+        # the item is on several rows, the most recently modified one is used: the ordering the
+        # per-row frappe.db.get_value lookup of the original report applied
+        grouped_items = frappe.db.sql(f"""
+            SELECT
+                entry.item_code,
+                SUM(IF(entry.voucher_type = 'Purchase Invoice', entry.actual_qty, 0)) AS qty_in,
+                SUM(IF(entry.voucher_type = 'Purchase Invoice', entry.valuation_rate, 0)) AS buying_price,
+                SUM(IF(entry.voucher_type = 'Purchase Invoice', entry.actual_qty * entry.valuation_rate, 0)) AS total_buying_amount,
+                SUM(entry.voucher_type = 'Purchase Invoice') AS buying_price_count,
+                SUM(IF(entry.voucher_type = 'Sales Invoice', entry.actual_qty, 0)) AS qty_out,
+                SUM(IF(entry.voucher_type = 'Sales Invoice', entry.selling_rate, 0)) AS selling_price,
+                SUM(IF(entry.voucher_type = 'Sales Invoice', entry.actual_qty * entry.selling_rate, 0)) AS total_selling_amount,
+                SUM(entry.voucher_type = 'Sales Invoice') AS selling_price_count
+            FROM (
+                SELECT
+                    sle.item_code,
+                    sle.voucher_type,
+                    sle.actual_qty,
+                    IFNULL(sle.valuation_rate, 0) AS valuation_rate,
+                    IF(sle.voucher_type = 'Sales Invoice', IFNULL((
+                        SELECT sii.rate
+                        FROM `tabSales Invoice Item` sii
+                        WHERE sii.parent = sle.voucher_no AND sii.item_code = sle.item_code
+                        ORDER BY sii.modified DESC
+                        LIMIT 1
+                    ), 0), 0) AS selling_rate
+                FROM `tabStock Ledger Entry` sle
+                LEFT JOIN `tabWarehouse` w ON w.name = sle.warehouse
+                WHERE {" AND ".join(conditions)}
+            ) entry
+            GROUP BY entry.item_code
+            ORDER BY entry.item_code
+        """, params, as_dict=True)
 
         result = {
             'Purchase Invoice': [],
             'Sales Invoice': []
         }
 
-        # Dictionary to accumulate grouped items
-        grouped_items = {}
-
-        for entry in stock_entries:
-            # Fetch custom cost center from the warehouse
-            custom_cost_center = frappe.db.get_value('Warehouse', entry.warehouse, 'custom_cost_centre')
-
-            data = {
-                'voucher_no': entry.voucher_no,
-                'voucher_type': entry.voucher_type,
-                'qty_change': entry.actual_qty,
-                'valuation_rate': entry.valuation_rate or 0,  # Default to 0 if None
-                'warehouse': entry.warehouse,
-                'item_code': entry.item_code,
-                'posting_date': entry.posting_date,
-                'custom_cost_center': custom_cost_center
-            }
-
-            # Grouping data by item_code to avoid duplicates
-            if entry.item_code not in grouped_items:
-                grouped_items[entry.item_code] = {
-                    'qty_in': 0,
-                    'qty_out': 0,
-                    'buying_price': 0,
-                    'selling_price': 0,
-                    'total_buying_amount': 0,
-                    'total_selling_amount': 0,
-                    'buying_price_count': 0,
-                    'selling_price_count': 0,
-                    'item_code': entry.item_code
-                }
-
-            if entry.voucher_type == 'Purchase Invoice':
-                # For Purchase Invoice, accumulate purchase quantities and buying prices
-                grouped_items[entry.item_code]['qty_in'] += entry.actual_qty
-                grouped_items[entry.item_code]['buying_price'] += entry.valuation_rate or 0  # Avoid None
-                grouped_items[entry.item_code]['total_buying_amount'] += (entry.actual_qty * (entry.valuation_rate or 0))
-                grouped_items[entry.item_code]['buying_price_count'] += 1
-            elif entry.voucher_type == 'Sales Invoice':
-                # For Sales Invoice, accumulate sales quantities and selling prices
-                grouped_items[entry.item_code]['qty_out'] += entry.actual_qty
-                # Fetch the rate from the Sales Invoice Item
-                sales_invoice_rate = frappe.db.get_value(
-                    'Sales Invoice Item',
-                    {'parent': entry.voucher_no, 'item_code': entry.item_code},
-                    'rate'
-                ) or 0  # Default to 0 if rate is None
-                grouped_items[entry.item_code]['selling_price'] += sales_invoice_rate
-                grouped_items[entry.item_code]['total_selling_amount'] += (entry.actual_qty * sales_invoice_rate)
-                grouped_items[entry.item_code]['selling_price_count'] += 1
-
         # Converting grouped items into the result format
-        for item_code, values in grouped_items.items():
+        for values in grouped_items:
+            buying_price_count = cint(values.buying_price_count)
+            selling_price_count = cint(values.selling_price_count)
+
             # Calculate the average buying price (valuation_rate for Purchase Invoice)
-            avg_buying_price = values['buying_price'] / values['buying_price_count'] if values['buying_price_count'] > 0 else 0
+            avg_buying_price = flt(values.buying_price) / buying_price_count if buying_price_count > 0 else 0
             # Calculate the average selling price (rate for Sales Invoice)
-            avg_selling_price = values['selling_price'] / values['selling_price_count'] if values['selling_price_count'] > 0 else 0
+            avg_selling_price = flt(values.selling_price) / selling_price_count if selling_price_count > 0 else 0
 
             result['Purchase Invoice'].append({
-                'item_code': item_code,
-                'qty_in': values['qty_in'],
+                'item_code': values.item_code,
+                'qty_in': flt(values.qty_in),
                 'buying_price': avg_buying_price,  # Average buying price (valuation_rate)
-                'total_buying_amount': values['total_buying_amount'],
+                'total_buying_amount': flt(values.total_buying_amount),
             })
             result['Sales Invoice'].append({
-                'item_code': item_code,
-                'qty_out': values['qty_out'],
+                'item_code': values.item_code,
+                'qty_out': flt(values.qty_out),
                 'selling_price': avg_selling_price,  # Average selling price (rate)
-                'total_selling_amount': values['total_selling_amount'],
+                'total_selling_amount': flt(values.total_selling_amount),
             })
 
         return result
@@ -0,0 +1,171 @@
+# Copyright (c) 2026, mututa paul and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from gormsolutions_mobile_app.custom_api.transaction_report.stock_report import fetch_stock_entry_ledger_data
+
+FROM_DATE = "2001-01-01"
+TO_DATE = "2001-01-31"
+
+# (voucher_type, voucher_no, item_code, actual_qty, valuation_rate, posting_date)
+STOCK_LEDGER_ENTRIES = [
+	("Purchase Invoice", "_T-PINV-0001", "_Test Stock Report Item A", 10, 50, "2001-01-02"),
+	("Purchase Invoice", "_T-PINV-0002", "_Test Stock Report Item A", 5, 56, "2001-01-05"),
+	("Purchase Invoice", "_T-PINV-0002", "_Test Stock Report Item B", 20, None, "2001-01-05"),
+	("Sales Invoice", "_T-SINV-0001", "_Test Stock Report Item A", -3, 52, "2001-01-06"),
+	("Sales Invoice", "_T-SINV-0002", "_Test Stock Report Item A", -2, 52, "2001-01-07"),
+	("Sales Invoice", "_T-SINV-0002", "_Test Stock Report Item B", -4, 0, "2001-01-07"),
+	("Sales Invoice", "_T-SINV-0003", "_Test Stock Report Item C", -1, 10, "2001-01-08"),
+	("Sales Invoice", "_T-SINV-0004", "_Test Stock Report Item D", -2, 10, "2001-01-09"),
+	# outside the date range
+	("Purchase Invoice", "_T-PINV-0003", "_Test Stock Report Item A", 100, 40, "2001-02-01"),
+]
+
+# (parent, item_code, rate, modified); _T-SINV-0003 has no matching invoice row, and _T-SINV-0004
+# has Item D on two rows, the later one modified last
+SALES_INVOICE_ITEMS = [
+	("_T-SINV-0001", "_Test Stock Report Item A", 70, "2001-01-06 10:00:00"),
+	("_T-SINV-0002", "_Test Stock Report Item A", 72.5, "2001-01-07 10:00:00"),
+	("_T-SINV-0002", "_Test Stock Report Item B", 15, "2001-01-07 10:00:00"),
+	("_T-SINV-0004", "_Test Stock Report Item D", 20, "2001-01-09 10:00:00"),
+	("_T-SINV-0004", "_Test Stock Report Item D", 30, "2001-01-09 11:00:00"),
+]
+
+
+def legacy_fetch_stock_entry_ledger_data(from_date, to_date):
+	"""The original per-row implementation, kept as the reference for the parity test."""
+	stock_entries = frappe.get_all(
+		"Stock Ledger Entry",
+		filters={
+			"is_cancelled": 0,
+			"voucher_type": ["in", ["Purchase Invoice", "Sales Invoice"]],
+			"posting_date": ["between", [from_date, to_date]],
+		},
+		fields=["voucher_no", "voucher_type", "actual_qty", "valuation_rate", "item_code"],
+	)
+
+	grouped_items = {}
+	for entry in stock_entries:
+		values = grouped_items.setdefault(
+			entry.item_code,
+			{
+				"qty_in": 0,
+				"qty_out": 0,
+				"buying_price": 0,
+				"selling_price": 0,
+				"total_buying_amount": 0,
+				"total_selling_amount": 0,
+				"buying_price_count": 0,
+				"selling_price_count": 0,
+			},
+		)
+		if entry.voucher_type == "Purchase Invoice":
+			values["qty_in"] += entry.actual_qty
+			values["buying_price"] += entry.valuation_rate or 0
+			values["total_buying_amount"] += entry.actual_qty * (entry.valuation_rate or 0)
+			values["buying_price_count"] += 1
+		else:
+			rate = (
+				frappe.db.get_value(
+					"Sales Invoice Item", {"parent": entry.voucher_no, "item_code": entry.item_code}, "rate"
+				)
+				or 0
+			)
+			values["qty_out"] += entry.actual_qty
+			values["selling_price"] += rate
+			values["total_selling_amount"] += entry.actual_qty * rate
+			values["selling_price_count"] += 1
+
+	result = {"Purchase Invoice": [], "Sales Invoice": []}
+	for item_code, values in grouped_items.items():
+		result["Purchase Invoice"].append(
+			{
+				"item_code": item_code,
+				"qty_in": values["qty_in"],
+				"buying_price": values["buying_price"] / values["buying_price_count"]
+				if values["buying_price_count"]
+				else 0,
+				"total_buying_amount": values["total_buying_amount"],
+			}
+		)
+		result["Sales Invoice"].append(
+			{
+				"item_code": item_code,
+				"qty_out": values["qty_out"],
+				"selling_price": values["selling_price"] / values["selling_price_count"]
+				if values["selling_price_count"]
+				else 0,
+				"total_selling_amount": values["total_selling_amount"],
+			}
+		)
+	return result
+
+
+class TestStockReport(FrappeTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		for voucher_type, voucher_no, item_code, actual_qty, valuation_rate, posting_date in STOCK_LEDGER_ENTRIES:
+			frappe.get_doc(
+				{
+					"doctype": "Stock Ledger Entry",
+					"name": frappe.generate_hash(length=10),
+					"voucher_type": voucher_type,
+					"voucher_no": voucher_no,
+					"item_code": item_code,
+					"actual_qty": actual_qty,
+					"valuation_rate": valuation_rate,
+					"posting_date": posting_date,
+					"is_cancelled": 0,
+					"docstatus": 1,
+				}
+			).db_insert()
+
+		for idx, (parent, item_code, rate, modified) in enumerate(SALES_INVOICE_ITEMS, start=1):
+			frappe.get_doc(
+				{
+					"doctype": "Sales Invoice Item",
+					"name": frappe.generate_hash(length=10),
+					"parent": parent,
+					"parenttype": "Sales Invoice",
+					"parentfield": "items",
+					"idx": idx,
+					"item_code": item_code,
+					"rate": rate,
+					"creation": modified,
+					"modified": modified,
+				}
+			).db_insert()
+
+	def test_matches_legacy_implementation(self):
+		expected = legacy_fetch_stock_entry_ledger_data(FROM_DATE, TO_DATE)
+		actual = fetch_stock_entry_ledger_data(FROM_DATE, TO_DATE)
+
+		for voucher_type in ("Purchase Invoice", "Sales Invoice"):
+			expected_rows = {row["item_code"]: row for row in expected[voucher_type]}
+			actual_rows = {row["item_code"]: row for row in actual[voucher_type]}
+			self.assertEqual(set(actual_rows), set(expected_rows))
+
+			for item_code, expected_row in expected_rows.items():
+				for key, value in expected_row.items():
+					if key == "item_code":
+						continue
+					self.assertAlmostEqual(actual_rows[item_code][key], value, places=6, msg=f"{item_code} {key}")
+
+	def test_fixture_totals(self):
+		result = fetch_stock_entry_ledger_data(FROM_DATE, TO_DATE)
+		purchases = {row["item_code"]: row for row in result["Purchase Invoice"]}
+		sales = {row["item_code"]: row for row in result["Sales Invoice"]}
+
+		self.assertEqual(purchases["_Test Stock Report Item A"]["qty_in"], 15)
+		self.assertEqual(purchases["_Test Stock Report Item A"]["buying_price"], 53)
+		self.assertEqual(purchases["_Test Stock Report Item A"]["total_buying_amount"], 780)
+		self.assertEqual(sales["_Test Stock Report Item A"]["qty_out"], -5)
+		self.assertEqual(sales["_Test Stock Report Item A"]["selling_price"], 71.25)
+		self.assertEqual(sales["_Test Stock Report Item A"]["total_selling_amount"], -355)
+		self.assertEqual(sales["_Test Stock Report Item C"]["selling_price"], 0)
+		# Item D is on two rows of its invoice: the rate of the last modified row is used
+		self.assertEqual(sales["_Test Stock Report Item D"]["selling_price"], 30)
+		self.assertEqual(sales["_Test Stock Report Item D"]["total_selling_amount"], -60)
@@ -1,6 +1,11 @@
 import frappe
 from frappe import _
 
+ITEM_FEED_EVENT = "item_changes"
+ITEM_FEED_CHANGES_KEY = "gormsolutions_item_feed_changes"
+ITEM_FEED_FLUSH_JOB_ID = "gormsolutions_item_feed_flush"
+ITEM_FEED_FIELDS = ["item_name", "item_group", "stock_uom", "disabled", "image"]
+
 @frappe.whitelist()
 def create_item(item_data):
     """
@@ -21,7 +26,7 @@ def create_item(item_data):
         item_doc.insert()
         frappe.db.commit()
 
-        # After creating the item, send a real-time update
+        # Kept for app builds that listen for it; newer builds follow the item_changes feed
         frappe.publish_realtime(
             event='item_data_update',  # Event name
             message={'items': [item_doc.as_dict()]},  # Send newly created item in real-time
@@ -43,13 +48,13 @@ def create_item(item_data):
 
 
 @frappe.whitelist()
-def fetch_items():
+def fetch_items(item_group="Oils"):
     """
-    Fetch items from the Item DocType and send to WebSocket clients in real-time
+    Fetch items of `item_group` from the Item DocType and send to WebSocket clients in real-time
     """
     try:
-        # Fetch items from the Item DocType with a filter for item group 'Oils'
-        items = frappe.get_all('Item', fields=['item_code', 'item_name', 'item_group', 'stock_uom'], filters={'item_group': 'Oils'})
+        # Fetch items from the Item DocType with a filter for the item group
+        items = frappe.get_all('Item', fields=['item_code', 'item_name', 'item_group', 'stock_uom'], filters={'item_group': item_group})
         
         # Publish the event to real-time WebSocket listeners
         frappe.publish_realtime(
@@ -74,3 +79,179 @@ def fetch_items():
             "status": "error",
             "message": str(e)
         }
+
+
+def queue_item_change(doc, method=None):
+    """
+    doc_events handler feeding the item change feed.
+
+    Changes are collected per transaction as "kind|scope|item_code[|field]" markers and written to
+    a Redis hash once it commits; `flush_item_feed` reads the current values when it runs, so a
+    voucher touching the same item many times, and any change committed while a flush is waiting
+    in the queue, produce one update. A rolled back transaction records nothing.
+
+        Item                    item|<item_code>|<field> for each changed ITEM_FEED_FIELDS field
+        Item Price              price|<price_list>|<item_code>
+        Bin, Stock Ledger Entry bin|<warehouse>|<item_code>
+    """
+    if doc.doctype == "Item":
+        if method == "on_trash":
+            changes = [f"item|{doc.name}|"]
+        else:
+            changes = [f"item|{doc.name}|{field}" for field in ITEM_FEED_FIELDS if doc.has_value_changed(field)]
+    elif doc.doctype == "Item Price":
+        changes = [f"price|{doc.price_list}|{doc.item_code}"]
+    else:
+        # Bin quantities are updated after the Stock Ledger Entry is submitted, so only the key is recorded here
+        changes = [f"bin|{doc.warehouse}|{doc.item_code}"]
+
+    if not changes:
+        return
+
+    if frappe.flags.item_feed_changes is None:
+        frappe.flags.item_feed_changes = set()
+        frappe.db.after_commit.add(record_item_changes)
+        frappe.db.after_rollback.add(discard_item_changes)
+    frappe.flags.item_feed_changes.update(changes)
+
+
+def record_item_changes():
+    """after_commit callback: store the changes of the committed transaction and schedule a flush."""
+    changes = frappe.flags.pop("item_feed_changes", None)
+    if not changes:
+        return
+
+    cache = frappe.cache()
+    pipe = cache.pipeline()
+    for change in changes:
+        pipe.hset(cache.make_key(ITEM_FEED_CHANGES_KEY), change, 1)
+    pipe.execute()
+
+    # A flush already waiting in the queue picks these up; deduplicate skips enqueueing another
+    frappe.enqueue(
+        "gormsolutions_mobile_app.custom_api.web_socket.item.flush_item_feed",
+        queue="short",
+        job_id=ITEM_FEED_FLUSH_JOB_ID,
+        deduplicate=True
+    )
+
+
+def discard_item_changes():
+    frappe.flags.pop("item_feed_changes", None)
+
+
+def flush_item_feed():
+    """
+    Background job: publish the changes recorded by `queue_item_change` as compact diffs.
+
+        Item changes      -> doctype room "Item":            {"items": [{"item_code", <changed fields>}]}
+        Price changes     -> doc room of the Price List:     {"prices": [{"item_code", "price_list_rate"}]}
+        Stock changes     -> doc room of the Warehouse:      {"stock": [{"item_code", "actual_qty"}]}
+
+    Drains until the hash is empty, since a commit made while this job runs is deduplicated
+    against it. A change recorded just as the job finishes is sent by the scheduler's run of this
+    job on its next tick.
+    """
+    while True:
+        changes = drain_item_changes()
+        if not changes:
+            break
+        publish_changes(changes)
+
+
+def drain_item_changes():
+    cache = frappe.cache()
+    pipe = cache.pipeline()
+    pipe.hkeys(cache.make_key(ITEM_FEED_CHANGES_KEY))
+    pipe.delete(cache.make_key(ITEM_FEED_CHANGES_KEY))
+    return pipe.execute()[0]
+
+
+def publish_changes(changes):
+    item_fields = {}
+    prices = {}
+    bins = {}
+    for change in changes:
+        kind, scope, rest = frappe.safe_decode(change).split("|", 2)
+        if kind == "item":
+            item_fields.setdefault(scope, set()).update([rest] if rest else [])
+        elif kind == "price":
+            prices.setdefault(scope, set()).add(rest)
+        elif kind == "bin":
+            bins.setdefault(scope, set()).add(rest)
+
+    if item_fields:
+        publish_item_changes(item_fields)
+    if prices:
+        publish_price_changes(prices)
+    if bins:
+        publish_stock_changes(bins)
+
+
+def publish_item_changes(item_fields):
+    items = {
+        item.item_code: item
+        for item in frappe.get_all(
+            "Item",
+            filters={"name": ["in", list(item_fields)]},
+            fields=["name as item_code"] + ITEM_FEED_FIELDS
+        )
+    }
+
+    diffs = []
+    for item_code, fields in item_fields.items():
+        item = items.get(item_code)
+        if not item:
+            diffs.append({"item_code": item_code, "removed": 1})
+        elif fields:
+            diffs.append({"item_code": item_code, **{field: item.get(field) for field in sorted(fields)}})
+
+    if diffs:
+        frappe.publish_realtime(ITEM_FEED_EVENT, {"items": diffs}, doctype="Item")
+
+
+def publish_price_changes(prices):
+    item_codes = set().union(*prices.values())
+    rates = {}
+    for price in frappe.get_all(
+        "Item Price",
+        filters={"price_list": ["in", list(prices)], "item_code": ["in", list(item_codes)]},
+        fields=["price_list", "item_code", "price_list_rate"],
+        order_by="modified desc"
+    ):
+        # Latest price wins, as in get_item_details
+        rates.setdefault((price.price_list, price.item_code), price.price_list_rate)
+
+    for price_list, codes in prices.items():
+        frappe.publish_realtime(
+            ITEM_FEED_EVENT,
+            {"prices": [
+                {"item_code": item_code, "price_list_rate": rates.get((price_list, item_code))}
+                for item_code in sorted(codes)
+            ]},
+            doctype="Price List",
+            docname=price_list
+        )
+
+
+def publish_stock_changes(bins):
+    item_codes = set().union(*bins.values())
+    quantities = {
+        (row.warehouse, row.item_code): row.actual_qty
+        for row in frappe.get_all(
+            "Bin",
+            filters={"warehouse": ["in", list(bins)], "item_code": ["in", list(item_codes)]},
+            fields=["warehouse", "item_code", "actual_qty"]
+        )
+    }
+
+    for warehouse, codes in bins.items():
+        frappe.publish_realtime(
+            ITEM_FEED_EVENT,
+            {"stock": [
+                {"item_code": item_code, "actual_qty": quantities.get((warehouse, item_code), 0)}
+                for item_code in sorted(codes)
+            ]},
+            doctype="Warehouse",
+            docname=warehouse
+        )
@@ -0,0 +1,14 @@
+# Copyright (c) 2026, mututa paul and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class GLDailyBalance(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("GL Daily Balance", ["account", "posting_date"])
+	frappe.db.add_index("GL Daily Balance", ["cost_center", "posting_date"])
@@ -0,0 +1,8 @@
+// Copyright (c) 2026, mututa paul and contributors
+// For license information, please see license.txt
+
+// frappe.ui.form.on("Party Balance Checkpoint", {
+// 	refresh(frm) {
+
+// 	},
+// });
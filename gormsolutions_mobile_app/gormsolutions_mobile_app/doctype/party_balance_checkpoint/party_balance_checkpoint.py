@@ -0,0 +1,13 @@
+# Copyright (c) 2026, mututa paul and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class PartyBalanceCheckpoint(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Party Balance Checkpoint", ["party_type", "party", "checkpoint_date"])
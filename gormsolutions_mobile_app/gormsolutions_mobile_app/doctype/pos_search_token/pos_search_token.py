@@ -0,0 +1,14 @@
+# Copyright (c) 2026, mututa paul and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class POSSearchToken(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("POS Search Token", ["reference_doctype", "token"])
+	frappe.db.add_index("POS Search Token", ["reference_doctype", "reference_name"])
@@ -145,6 +145,100 @@ app_license = "mit"
 # 	}
 # }
 
+doc_events = {
+	"User Permission": {
+		"on_update": "gormsolutions_mobile_app.custom_api.pos_context.clear_pos_context",
+		"on_trash": "gormsolutions_mobile_app.custom_api.pos_context.clear_pos_context",
+	},
+	"POS Profile": {
+		"on_update": "gormsolutions_mobile_app.custom_api.pos_context.clear_all_pos_contexts",
+		"on_trash": "gormsolutions_mobile_app.custom_api.pos_context.clear_all_pos_contexts",
+	},
+	"Item Group": {
+		"on_update": "gormsolutions_mobile_app.custom_api.pos_context.clear_all_pos_contexts",
+		"on_trash": "gormsolutions_mobile_app.custom_api.pos_context.clear_all_pos_contexts",
+	},
+	"Customer": {
+		"on_update": [
+			"gormsolutions_mobile_app.custom_api.customer.clear_customer_pricing_snapshot",
+			"gormsolutions_mobile_app.custom_api.search_index.update_search_tokens",
+		],
+		"on_trash": [
+			"gormsolutions_mobile_app.custom_api.customer.clear_customer_pricing_snapshot",
+			"gormsolutions_mobile_app.custom_api.search_index.delete_search_tokens",
+		],
+		"after_rename": "gormsolutions_mobile_app.custom_api.search_index.rename_search_tokens",
+	},
+	"Pricing Rule": {
+		"on_update": "gormsolutions_mobile_app.custom_api.customer.clear_customer_pricing_snapshot",
+		"on_trash": "gormsolutions_mobile_app.custom_api.customer.clear_customer_pricing_snapshot",
+	},
+	"GL Entry": {
+		"on_submit": [
+			"gormsolutions_mobile_app.custom_api.statement.transaction_report.clear_daily_totals",
+			"gormsolutions_mobile_app.custom_api.statement.gl_daily_balance.update_gl_daily_balance",
+			"gormsolutions_mobile_app.custom_api.statement.party_balance.clear_party_balance_checkpoints",
+		],
+		"on_cancel": "gormsolutions_mobile_app.custom_api.statement.party_balance.clear_party_balance_checkpoints",
+	},
+	"Repost Item Valuation": {
+		# The repost job marks completion with db_set, which runs on_change but not on_update
+		"on_change": "gormsolutions_mobile_app.custom_api.statement.gl_daily_balance.rebuild_reposted_gl_daily_balance",
+	},
+	"Sales Invoice": {
+		"on_submit": [
+			"gormsolutions_mobile_app.custom_api.statement.transaction_report.clear_daily_totals",
+			"gormsolutions_mobile_app.custom_api.invoice.clear_sales_payment_summary",
+		],
+		"on_cancel": [
+			"gormsolutions_mobile_app.custom_api.statement.transaction_report.clear_daily_totals",
+			"gormsolutions_mobile_app.custom_api.invoice.clear_sales_payment_summary",
+		],
+	},
+	"Item": {
+		"on_update": [
+			"gormsolutions_mobile_app.custom_api.web_socket.item.queue_item_change",
+			"gormsolutions_mobile_app.custom_api.search_index.update_search_tokens",
+			"gormsolutions_mobile_app.custom_api.item.bump_item_lookup_version",
+		],
+		"on_trash": [
+			"gormsolutions_mobile_app.custom_api.web_socket.item.queue_item_change",
+			"gormsolutions_mobile_app.custom_api.search_index.delete_search_tokens",
+			"gormsolutions_mobile_app.custom_api.item.bump_item_lookup_version",
+		],
+		"after_rename": [
+			"gormsolutions_mobile_app.custom_api.search_index.rename_search_tokens",
+			"gormsolutions_mobile_app.custom_api.item.bump_item_lookup_version",
+		],
+	},
+	"Item Price": {
+		"on_update": [
+			"gormsolutions_mobile_app.custom_api.web_socket.item.queue_item_change",
+			"gormsolutions_mobile_app.custom_api.item.bump_item_lookup_version",
+		],
+		"on_trash": [
+			"gormsolutions_mobile_app.custom_api.web_socket.item.queue_item_change",
+			"gormsolutions_mobile_app.custom_api.item.bump_item_lookup_version",
+		],
+	},
+	"Bin": {
+		"on_update": [
+			"gormsolutions_mobile_app.custom_api.web_socket.item.queue_item_change",
+			"gormsolutions_mobile_app.custom_api.item.bump_item_lookup_version",
+		],
+	},
+	"Stock Ledger Entry": {
+		"on_submit": [
+			"gormsolutions_mobile_app.custom_api.web_socket.item.queue_item_change",
+			"gormsolutions_mobile_app.custom_api.item.bump_item_lookup_version",
+		],
+	},
+	"Payment Entry": {
+		"on_submit": "gormsolutions_mobile_app.custom_api.invoice.clear_sales_payment_summary",
+		"on_cancel": "gormsolutions_mobile_app.custom_api.invoice.clear_sales_payment_summary",
+	},
+}
+
 # Scheduled Tasks
 # ---------------
 
@@ -166,6 +260,18 @@ app_license = "mit"
 # 	],
 # }
 
+scheduler_events = {
+	"all": [
+		"gormsolutions_mobile_app.custom_api.web_socket.item.flush_item_feed"
+	],
+	"hourly": [
+		"gormsolutions_mobile_app.custom_api.statement.gl_daily_balance.reconcile_gl_daily_balance"
+	],
+	"daily": [
+		"gormsolutions_mobile_app.custom_api.idempotency.clear_expired_idempotency_keys"
+	],
+}
+
 # Testing
 # -------
 
@@ -201,6 +307,9 @@ override_whitelisted_methods = {
 # before_request = ["gormsolutions_mobile_app.utils.before_request"]
 # after_request = ["gormsolutions_mobile_app.utils.after_request"]
 
+before_request = ["gormsolutions_mobile_app.custom_api.metrics.before_request"]
+after_request = ["gormsolutions_mobile_app.custom_api.metrics.after_request"]
+
 # Job Events
 # ----------
 # before_job = ["gormsolutions_mobile_app.utils.before_job"]
@@ -0,0 +1,8 @@
+import frappe
+
+from gormsolutions_mobile_app.custom_api.statement.gl_daily_balance import rebuild_gl_daily_balance
+
+
+def execute():
+	"""Fill the GL Daily Balance rollup from the existing GL Entries."""
+	rebuild_gl_daily_balance()
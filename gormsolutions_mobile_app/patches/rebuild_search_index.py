@@ -0,0 +1,6 @@
+from gormsolutions_mobile_app.custom_api.search_index import rebuild_search_index
+
+
+def execute():
+	"""Index the existing items and customers for the POS search."""
+	rebuild_search_index()